@@ -3,6 +3,14 @@ ASGI config for bisht project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server to enable the live slot stream
+(/api/slot-events/), e.g.:
+
+    gunicorn bisht.asgi:application -k uvicorn.workers.UvicornWorker
+
+With more than one worker process, set SLOT_EVENTS_BACKEND to
+'pankaj.slot_events.RedisBackend' so every worker sees every booking change.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'pankaj.middleware.PaymentDebugMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'pankaj.middleware.JsonExceptionMiddleware',
+    'pankaj.middleware.QueryCountDebugMiddleware',
 ]
 
 ROOT_URLCONF = 'bisht.urls'
@@ -84,10 +85,32 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file-backed test database: the in-memory one cannot be shared by
+        # the threads of the concurrent reservation test
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# File-based so every worker process sees the same availability entries and
+# invalidations. Switch to Redis/Memcached when running on several hosts.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},  # Room for per-date generation tokens
+    }
+}
+AVAILABILITY_CACHE_TIMEOUT = 60 * 60 * 6  # Upper bound for cached availability (seconds)
+SLOT_HOLD_MINUTES = 10  # How long a selected time stays reserved while the form is filled in
+BOOKING_BUFFER_MINUTES = 15  # Gap kept free after every booking (applies to bookings saved from now on)
+BOOKING_LEAD_MINUTES = 0  # Minimum notice between now and a bookable start
+AVAILABILITY_PREWARM_MONTHS = 0  # Months of availability cached on the first request after start-up (0 disables)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
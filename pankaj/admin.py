@@ -2,9 +2,14 @@
 # admin.py - Updated version with TestimonialSubmission commented out
 
 from traceback import format_tb
+from django import forms
 from django.contrib import admin
+from django.db import transaction
 from flask import redirect
-from .models import BlogPost, Testimonial, ConsultationBooking, AvailableSlot
+from .models import BlogPost, Testimonial, ConsultationBooking, AvailableSlot, BlackoutPeriod, Consultant
+from .models import AdminNotification, ExternalBusy, ExternalCalendar, OutboxMessage
+from .ics_import import ICSError, import_calendar
+from . import admin_digest, outbox
 # Comment out TestimonialSubmission since we're disabling user submissions
 # from .models import TestimonialSubmission
 from django.utils import timezone
@@ -389,10 +394,10 @@ KP RegTech''',
 @admin.register(ConsultationBooking)
 class ConsultationBookingAdmin(admin.ModelAdmin):
     list_display = ('booking_id_short', 'name', 'email', 'phone', 'appointment_date', 
-                   'appointment_time', 'duration_display', 'mode_display', 'status', 
+                   'appointment_time', 'duration_display', 'mode_display', 'consultant', 'status', 
                    'created_at', 'cancellable_badge')  # Removed 'is_paid' from display
     
-    list_filter = ('status', 'duration', 'mode', 'appointment_date', 'created_at')  # Removed 'is_paid'
+    list_filter = ('status', 'duration', 'mode', 'consultant', 'appointment_date', 'created_at')  # Removed 'is_paid'
     search_fields = ('name', 'email', 'phone', 'company', 'booking_id', 'topic')
     readonly_fields = ('booking_id', 'created_at', 'updated_at', 'confirmed_at', 
                       'cancelled_at', 'pending_at', 'completed_at', 'booking_details', 
@@ -418,7 +423,7 @@ class ConsultationBookingAdmin(admin.ModelAdmin):
             'fields': ('booking_id', 'duration', 'price', 'status')  # Removed 'is_paid', 'payment_id'
         }),
         ('Appointment Details', {
-            'fields': ('appointment_date', 'appointment_time', 'mode')
+            'fields': ('appointment_date', 'appointment_time', 'mode', 'consultant')
         }),
         ('Client Information', {
             'fields': ('name', 'email', 'phone', 'company', 'designation')
@@ -484,85 +489,79 @@ class ConsultationBookingAdmin(admin.ModelAdmin):
     booking_details.short_description = 'Booking Details'
     booking_details.allow_tags = True
     
-    def mark_as_confirmed(self, request, queryset):
-        """Mark selected bookings as confirmed"""
-        from django.utils import timezone
+    def _bulk_status_change(self, request, queryset, new_status, timestamp_field, done):
+        """
+        Apply a status change to the selected bookings with one UPDATE and
+        queue their notification emails in one INSERT batch.
+
+        Bookings already in ``new_status`` are left alone, and cancelled
+        bookings whose time was booked since stay cancelled. Delivery happens
+        in the run_outbox worker over a single SMTP connection; the message
+        links to the outbox so the admin can follow its progress.
+        """
+        from django.urls import reverse
+        from django.utils.html import format_html
+        from . import scheduling
         from .views import send_status_change_email
         
-        updated_count = 0
-        emails_sent = 0
-        
-        for booking in queryset:
-            old_status = booking.status
-            booking.status = 'confirmed'
-            booking.confirmed_at = timezone.now()
-            booking.save()
+        now = timezone.now()
+        with transaction.atomic():
+            changing = queryset.exclude(status=new_status).order_by()
+            previous = {pk: (status, day) for pk, status, day in
+                        changing.values_list('pk', 'status', 'appointment_date')}
+            skipped = queryset.count() - len(previous)
             
-            # Send status change email
-            try:
-                send_status_change_email(booking, 'confirmed', old_status)
-                emails_sent += 1
-            except Exception as e:
-                self.message_user(request, f"Error sending email for booking {booking.booking_id}: {str(e)}", level='ERROR')
+            # Cancelled bookings only get their time back if it is still free
+            conflicts = []
+            if new_status != 'cancelled':
+                conflicts = scheduling.reinstate_bookings(ConsultationBooking.objects.filter(
+                    pk__in=[pk for pk, (status, day) in previous.items() if status == 'cancelled']
+                ), new_status)
+                for booking in conflicts:
+                    del previous[booking.pk]
             
-            updated_count += 1
+            ConsultationBooking.objects.filter(pk__in=previous).update(
+                status=new_status, updated_at=now, **{timestamp_field: now}
+            )
+            
+            # queryset.update() sends no signals: refresh the dates whose
+            # bookings started or stopped blocking time
+            scheduling.availability_changed(
+                day for status, day in previous.values() if 'cancelled' in (status, new_status)
+            )
+            
+            # Render every notification; the rows (and buffered digest
+            # events) are inserted together
+            with outbox.batch() as queued, admin_digest.batch():
+                for booking in ConsultationBooking.objects.filter(pk__in=previous):
+                    send_status_change_email(booking, new_status, previous[booking.pk][0])
         
-        self.message_user(request, 
-            f"Marked {updated_count} booking(s) as confirmed. {emails_sent} notification email(s) sent.")
+        progress_url = reverse('admin:pankaj_outboxmessage_changelist') + '?status__exact=pending'
+        self.message_user(request, format_html(
+            '{} {} booking(s); {} notification email(s) queued. <a href="{}">Follow delivery in the outbox</a>.',
+            done, len(previous), len(queued), progress_url,
+        ))
+        if skipped:
+            self.message_user(request, f"{skipped} booking(s) were already {new_status} and were left unchanged.",
+                              level='WARNING')
+        if conflicts:
+            self.message_user(request, f"{len(conflicts)} cancelled booking(s) were left cancelled because their time "
+                              f"has been booked since: {', '.join(str(booking.booking_id) for booking in conflicts)}.",
+                              level='WARNING')
+    
+    def mark_as_confirmed(self, request, queryset):
+        """Mark selected bookings as confirmed"""
+        self._bulk_status_change(request, queryset, 'confirmed', 'confirmed_at', 'Confirmed')
     mark_as_confirmed.short_description = "Mark as confirmed"
     
     def mark_as_completed(self, request, queryset):
         """Mark selected bookings as completed"""
-        from django.utils import timezone
-        from .views import send_status_change_email
-        
-        updated_count = 0
-        emails_sent = 0
-        
-        for booking in queryset:
-            old_status = booking.status
-            booking.status = 'completed'
-            booking.completed_at = timezone.now()
-            booking.save()
-            
-            # Send status change email
-            try:
-                send_status_change_email(booking, 'completed', old_status)
-                emails_sent += 1
-            except Exception as e:
-                self.message_user(request, f"Error sending email for booking {booking.booking_id}: {str(e)}", level='ERROR')
-            
-            updated_count += 1
-        
-        self.message_user(request, 
-            f"Marked {updated_count} booking(s) as completed. {emails_sent} notification email(s) sent.")
+        self._bulk_status_change(request, queryset, 'completed', 'completed_at', 'Marked as completed')
     mark_as_completed.short_description = "Mark as completed"
     
     def cancel_selected_bookings(self, request, queryset):
         """Admin action to cancel selected bookings"""
-        from django.utils import timezone
-        from .views import send_status_change_email
-        
-        cancelled_count = 0
-        emails_sent = 0
-        
-        for booking in queryset:
-            old_status = booking.status
-            booking.status = 'cancelled'
-            booking.cancelled_at = timezone.now()
-            booking.save()
-            
-            # Send status change email
-            try:
-                send_status_change_email(booking, 'cancelled', old_status)
-                emails_sent += 1
-            except Exception as e:
-                self.message_user(request, f"Error sending email for booking {booking.booking_id}: {str(e)}", level='ERROR')
-            
-            cancelled_count += 1
-        
-        self.message_user(request, 
-            f"Successfully cancelled {cancelled_count} booking(s). {emails_sent} notification email(s) sent.")
+        self._bulk_status_change(request, queryset, 'cancelled', 'cancelled_at', 'Cancelled')
     cancel_selected_bookings.short_description = "Cancel selected bookings"
     
     def save_model(self, request, obj, form, change):
@@ -595,7 +594,7 @@ class ConsultationBookingAdmin(admin.ModelAdmin):
                         email_sent = send_status_change_email(obj, new_status, old_status)
                         if email_sent:
                             self.message_user(request, 
-                                f"Status changed from '{old_status}' to '{new_status}'. Notification email sent to {obj.email}.")
+                                f"Status changed from '{old_status}' to '{new_status}'. Notification email queued for {obj.email}.")
                     except Exception as e:
                         self.message_user(request, 
                             f"Error sending status change email: {str(e)}", 
@@ -618,6 +617,142 @@ class AvailableSlotAdmin(admin.ModelAdmin):
         return super().get_queryset(request).order_by('day', 'start_time')
 
 
+@admin.register(Consultant)
+class ConsultantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'email', 'is_active', 'created_at')
+    list_filter = ('is_active',)
+    list_editable = ('is_active',)
+    search_fields = ('name', 'email')
+
+
+@admin.register(BlackoutPeriod)
+class BlackoutPeriodAdmin(admin.ModelAdmin):
+    list_display = ('name', 'start_date', 'end_date', 'start_time', 'end_time', 'repeats_yearly', 'is_active')
+    list_filter = ('repeats_yearly', 'is_active')
+    list_editable = ('is_active',)
+    search_fields = ('name',)
+    date_hierarchy = 'start_date'
+    
+    fieldsets = (
+        ('Closure', {
+            'fields': ('name', 'start_date', 'end_date', 'repeats_yearly', 'is_active')
+        }),
+        ('Partial Day', {
+            'fields': ('start_time', 'end_time'),
+            'description': 'Leave both blank to close the whole day.'
+        }),
+    )
+
+
+class ExternalCalendarForm(forms.ModelForm):
+    """Calendar form with an optional .ics upload that is imported on save."""
+
+    ics_file = forms.FileField(
+        required=False, label='ICS file',
+        help_text='Upload an .ics export to import (or re-import) its busy times.'
+    )
+
+    class Meta:
+        model = ExternalCalendar
+        fields = ('name', 'consultant', 'is_active')
+
+    def clean_ics_file(self):
+        """Decode the upload to text; unreadable files are rejected here."""
+        upload = self.cleaned_data.get('ics_file')
+        if not upload:
+            return None
+        try:
+            return upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise forms.ValidationError('The file is not UTF-8 encoded text.')
+
+
+@admin.register(ExternalCalendar)
+class ExternalCalendarAdmin(admin.ModelAdmin):
+    form = ExternalCalendarForm
+    list_display = ('name', 'consultant', 'is_active', 'imported_at')
+    list_filter = ('is_active', 'consultant')
+    list_editable = ('is_active',)
+    search_fields = ('name',)
+
+    def save_model(self, request, obj, form, change):
+        """Save the calendar, then import the uploaded file into it."""
+        super().save_model(request, obj, form, change)
+        text = form.cleaned_data.get('ics_file')
+        if not text:
+            return
+        try:
+            stats = import_calendar(obj, text)
+        except ICSError as e:
+            self.message_user(request, f"Could not import {obj.name}: {e}", level='ERROR')
+            return
+        self.message_user(
+            request,
+            f"Imported {obj.name}: {stats['created']} new, {stats['updated']} changed, "
+            f"{stats['unchanged']} unchanged and {stats['deleted']} removed events; "
+            f"{len(stats['dates'])} dates refreshed."
+        )
+
+
+@admin.register(ExternalBusy)
+class ExternalBusyAdmin(admin.ModelAdmin):
+    list_display = ('calendar', 'consultant', 'date', 'start_time', 'end_time')
+    list_filter = ('calendar',)
+    date_hierarchy = 'date'
+
+    # Rebuilt by every import; edit the calendar instead
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to', 'last_error')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('subject', 'from_email', 'to', 'cc', 'bcc', 'reply_to', 'headers', 'content_subtype',
+                       'booking', 'status', 'attempts', 'last_error', 'next_attempt_at', 'claimed_by',
+                       'claimed_at', 'created_at', 'sent_at', 'body')
+    actions = ['replay_dead_messages']
+
+    def recipients(self, obj):
+        return ', '.join(obj.to)
+    recipients.short_description = 'To'
+
+    # Messages are written by the booking code and the outbox worker only
+    def has_add_permission(self, request):
+        return False
+
+    def replay_dead_messages(self, request, queryset):
+        """Queue dead-lettered messages again with a fresh attempt budget."""
+        replayed = outbox.replay(queryset)
+        skipped = queryset.count() - replayed
+        self.message_user(request, f"{replayed} dead message(s) queued for delivery again."
+                          + (f" {skipped} message(s) were not dead-lettered and were left alone." if skipped else ""))
+    replay_dead_messages.short_description = "Replay selected dead messages"
+
+
+@admin.register(AdminNotification)
+class AdminNotificationAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'kind', 'booking', 'created_at', 'digest')
+    list_filter = ('kind', ('digest', admin.EmptyFieldListFilter), 'created_at')
+    search_fields = ('subject', 'body')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('kind', 'booking', 'subject', 'body', 'created_at', 'digest')
+
+    # Events are written by the booking code and digested by the outbox worker only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+
 
 '''Payment Admin Configuration'''
 '''
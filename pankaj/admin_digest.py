@@ -0,0 +1,139 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              ADMIN NOTIFICATION DIGEST
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Admin notifications (new bookings, cancellations, status changes) are not
+# mailed one by one. notify() renders them as before but stores them as
+# AdminNotification rows, in the caller's transaction, and the run_outbox
+# worker queues one digest email per interval holding every buffered event.
+#
+# Urgent events bypass the digest and are queued at once: those about an
+# appointment on or before today + settings.ADMIN_DIGEST_URGENT_DAYS (0, so
+# same-day appointments, by default), which the admin may need to act on
+# before the next digest goes out.
+#
+# Settings:
+#   - ADMIN_DIGEST_INTERVAL: minutes an event may wait for its digest
+#     (default 60; 0 sends every notification at once, as before)
+#   - ADMIN_DIGEST_URGENT_DAYS: see above (default 0)
+
+import threading  # Per-thread batch() buffers
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings  # Access Django settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import emails, outbox
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+DEFAULT_INTERVAL = 60  # Minutes between digests
+DEFAULT_URGENT_DAYS = 0  # Appointments this many days ahead (or fewer) are urgent
+MAX_EVENTS = 200  # Events per digest email; a larger backlog is split
+
+
+_batch = threading.local()  # Rows collected by an open batch() block
+
+
+def interval():
+    """Longest wait of a buffered event, or None when digests are disabled."""
+    minutes = getattr(settings, 'ADMIN_DIGEST_INTERVAL', DEFAULT_INTERVAL)
+    return timedelta(minutes=minutes) if minutes > 0 else None
+
+
+def is_urgent(booking, today=None):
+    """Whether a notification about ``booking`` must skip the digest."""
+    today = today or timezone.localdate()
+    days = getattr(settings, 'ADMIN_DIGEST_URGENT_DAYS', DEFAULT_URGENT_DAYS)
+    return booking.appointment_date <= today + timedelta(days=days)
+
+
+@contextmanager
+def batch():
+    """
+    Collect notify() calls and insert the buffered events with one
+    bulk_create on exit (the digest counterpart of outbox.batch()).
+    """
+    from .models import AdminNotification
+
+    if getattr(_batch, 'rows', None) is not None:
+        yield _batch.rows
+        return
+
+    _batch.rows = []
+    try:
+        yield _batch.rows
+        AdminNotification.objects.bulk_create(_batch.rows, batch_size=500)
+    finally:
+        _batch.rows = None
+
+
+def notify(kind, booking, message):
+    """
+    Send an admin notification through the digest.
+
+    Args:
+        kind: One of AdminNotification.KIND_CHOICES
+        booking: ConsultationBooking the notification is about
+        message: The rendered EmailMessage (its subject and body are kept)
+
+    Returns:
+        bool: True when the message was queued at once, False when it was
+        buffered for the next digest
+    """
+    from .models import AdminNotification
+
+    if interval() is None or is_urgent(booking):
+        outbox.enqueue(message, booking=booking)
+        return True
+
+    row = AdminNotification(kind=kind, booking=booking, subject=message.subject[:255], body=message.body)
+    if getattr(_batch, 'rows', None) is not None:
+        _batch.rows.append(row)
+    else:
+        with transaction.atomic():
+            row.save()
+    return False
+
+
+def flush(now=None, force=False):
+    """
+    Queue a digest of the buffered events once the oldest has waited a
+    full interval (at once with ``force``, or when digests are disabled).
+
+    Events are claimed by pointing them at the digest's outbox row; when
+    another worker claimed any of them first, the digest is rolled back.
+
+    Returns:
+        int: Number of events in the queued digest (0 when none was due)
+    """
+    from .models import AdminNotification
+
+    now = now or timezone.now()
+    wait = interval()
+    with transaction.atomic():
+        pending = AdminNotification.objects.filter(digest__isnull=True).order_by('created_at', 'pk')
+        events = list(pending[:MAX_EVENTS])
+        if not events:
+            return 0
+        # Events left over from before digests were disabled are due at once
+        if not force and wait is not None and events[0].created_at > now - wait:
+            return 0
+
+        row = outbox.enqueue(emails.admin_digest(events, now))
+        claimed = AdminNotification.objects.filter(pk__in=[event.pk for event in events], digest__isnull=True)
+        if claimed.update(digest=row) != len(events):
+            transaction.set_rollback(True)
+            return 0
+    return len(events)
+
+
+def flush_due(now=None):
+    """Queue every digest that is due (a backlog over MAX_EVENTS takes several)."""
+    total = 0
+    while True:
+        count = flush(now)
+        total += count
+        if count < MAX_EVENTS:
+            return total
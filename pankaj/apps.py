@@ -4,4 +4,10 @@ class PankajConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pankaj'
     
- 
\ No newline at end of file
+    def ready(self):
+        # Register booking signal receivers (availability summaries)
+        from . import signals  # noqa: F401
+        
+        # Optionally pre-warm the availability cache on the first request
+        from .availability_prewarm import install_startup_hook
+        install_startup_hook()
@@ -0,0 +1,251 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              AVAILABILITY CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Caches the computed slot lists of /api/available-slots/ (per date and
+# duration) and the per-day flags of /api/date-availability/ (per month and
+# duration).
+#
+# Every date and every month has a generation token. Cache keys embed the
+# token, so invalidating a date only needs a new token for that date and its
+# month: entries for other dates stay warm, and entries for the touched date
+# become unreachable whatever duration they were stored for.
+#
+# The same tokens act as per-date version counters for HTTP validators:
+# a response's ETag is derived from the tokens it was built from, so an
+# unchanged token lets the API answer 304 without recomputing anything.
+
+import hashlib  # ETag digests
+import time  # Token timestamps
+import uuid  # Generation tokens
+from datetime import datetime, timedelta, timezone  # Date/time manipulation
+
+from django.conf import settings  # Access Django settings
+from django.core.cache import cache  # Configured cache backend
+from django.db import transaction  # Invalidate after commit
+
+from . import schedule_rules, scheduling
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+KEY_PREFIX = 'availability'
+DEFAULT_TIMEOUT = getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 60 * 60 * 6)  # Seconds
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              KEYS & GENERATIONS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _month_label(day):
+    """'YYYY-MM' label for the month containing ``day``."""
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def _new_token():
+    """Fresh generation token: '<unix time>-<random>'; the time is the Last-Modified value."""
+    return f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+
+def _generation(scope):
+    """
+    Current generation token for a date or month scope.
+
+    A missing token (never set or evicted) is replaced by a fresh random one,
+    so entries written under an older token can never be served again.
+    """
+    return cache.get_or_set(f"{KEY_PREFIX}:gen:{scope}", _new_token, None)
+
+
+def _token_time(token):
+    """Unix time a generation token was issued at (0 for tokens without one)."""
+    stamp = token.split('-', 1)[0]
+    return int(stamp) if stamp.isdigit() else 0
+
+
+def _day_key(day, duration_minutes):
+    """Cache key for a date's slot list."""
+    return f"{KEY_PREFIX}:slots:{day.isoformat()}:{_generation(day.isoformat())}:{duration_minutes}"
+
+
+def _month_key(year, month, duration_minutes):
+    """Cache key for a month's per-day availability flags."""
+    label = f"{year:04d}-{month:02d}"
+    return f"{KEY_PREFIX}:month:{label}:{_generation(label)}:{duration_minutes}"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EXPIRY RULES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _day_timeout(day, now=None):
+    """
+    Seconds a date's slot list stays valid.
+
+    On the booking-horizon date (today, unless the lead time pushes it
+    later) the list loses its earliest start every 15 minutes, so it expires
+    on the next 15-minute boundary of the horizon. Later lists stay valid
+    until the horizon reaches that date's opening time; past dates never
+    change.
+    """
+    horizon = scheduling.booking_horizon(now)
+    if day == horizon.date():
+        step = scheduling.SLOT_STEP * 60
+        elapsed = (horizon.minute * 60 + horizon.second) % step
+        return max(step - elapsed, 1)
+    if day > horizon.date():
+        hours = schedule_rules.get_rules().hours(day)
+        if hours is None:
+            return DEFAULT_TIMEOUT  # Closed: nothing to offer whatever the time
+        opens_at = datetime.combine(day, scheduling.to_time(hours[0]))
+        return max(min(DEFAULT_TIMEOUT, int((opens_at - horizon).total_seconds())), 1)
+    return DEFAULT_TIMEOUT
+
+
+def _month_timeout(year, month, now=None):
+    """Seconds a month's flags stay valid (until midnight while the month is current)."""
+    now = now or datetime.now()
+    if (year, month) < (now.year, now.month):
+        return DEFAULT_TIMEOUT
+    # Today becomes a past day at midnight
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(min(DEFAULT_TIMEOUT, int((midnight - now).total_seconds())), 1)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              READ / WRITE API
+# ══════════════════════════════════════════════════════════════════════════════
+
+def get_day(day, duration_minutes, compute):
+    """
+    Cached slot list for a date, computing and storing it on a miss.
+
+    Args:
+        day: Date being viewed
+        duration_minutes: Requested appointment length
+        compute: Zero-argument callable producing the slot list
+
+    Returns:
+        list: Slot dictionaries for the date
+    """
+    key = _day_key(day, duration_minutes)
+    slots = cache.get(key)
+    if slots is None:
+        slots = compute()
+        cache.set(key, slots, _day_timeout(day))
+    return slots
+
+
+def get_month(year, month, duration_minutes, compute):
+    """
+    Cached per-day availability list for a month, computing it on a miss.
+
+    Args:
+        year: Calendar year
+        month: Calendar month (1-12)
+        duration_minutes: Requested appointment length
+        compute: Zero-argument callable producing the list of date dicts
+
+    Returns:
+        list: One dict per date of the month
+    """
+    key = _month_key(year, month, duration_minutes)
+    dates = cache.get(key)
+    if dates is None:
+        dates = compute()
+        cache.set(key, dates, _month_timeout(year, month))
+    return dates
+
+
+def get_calendar(year, month, duration_minutes, selected_date, compute):
+    """
+    Cached combined calendar payload (month flags plus one day's slots).
+
+    Keyed by the month's generation token, so any booking change inside the
+    month evicts it. Expires with the shorter of the month and slot-list rules.
+
+    Args:
+        year: Calendar year
+        month: Calendar month (1-12)
+        duration_minutes: Requested appointment length
+        selected_date: Requested slot date, or None for first available
+        compute: Zero-argument callable producing the payload
+
+    Returns:
+        dict: Calendar payload
+    """
+    now = datetime.now()
+    slots_scope = selected_date.isoformat() if selected_date else 'first'
+    key = f"{_month_key(year, month, duration_minutes)}:calendar:{slots_scope}"
+    if selected_date and _month_label(selected_date) != f"{year:04d}-{month:02d}":
+        key += f":{_generation(selected_date.isoformat())}"
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = compute()
+        timeout = _month_timeout(year, month, now)
+        if selected_date or (year, month) == (now.year, now.month):
+            timeout = min(timeout, _day_timeout(selected_date or scheduling.booking_horizon(now).date(), now))
+        cache.set(key, payload, timeout)
+    return payload
+
+
+def validators(scopes, variant, since=None):
+    """
+    ETag and Last-Modified for a response built from the given scopes.
+
+    Args:
+        scopes: Date (``date``) and month (``(year, month)``) scopes the response reads
+        variant: Everything else the response body depends on (query string,
+            today's date, the current minute for time-dependent payloads)
+        since: Aware datetime the time-dependent part of the body changed at
+
+    Returns:
+        tuple: (etag, last_modified) where last_modified is an aware UTC datetime
+    """
+    tokens = [
+        _generation(scope.isoformat() if hasattr(scope, 'isoformat') else f"{scope[0]:04d}-{scope[1]:02d}")
+        for scope in scopes
+    ]
+    etag = hashlib.sha1('|'.join([*tokens, *map(str, variant)]).encode()).hexdigest()[:24]
+    last_modified = datetime.fromtimestamp(max(_token_time(token) for token in tokens), tz=timezone.utc)
+    if since is not None:
+        last_modified = max(last_modified, since.astimezone(timezone.utc))
+    return etag, last_modified
+
+
+def invalidate_dates(dates, hold_expiries=None):
+    """
+    Evict cached availability for the given dates (and their months).
+
+    Tokens are rotated after the surrounding transaction commits, so any
+    reader that sees the new token also sees the committed bookings.
+
+    Args:
+        dates: Dates whose bookings or holds changed
+        hold_expiries: Date -> earliest hold expiry for held dates in the
+            touched months; the new tokens of those dates and months expire
+            then, so responses built while a hold was active lapse with it
+    """
+    scopes = set()
+    for day in dates:
+        scopes.add(day.isoformat())
+        scopes.add(_month_label(day))
+
+    expiries = {}
+    for day, expires_at in (hold_expiries or {}).items():
+        for scope in (day.isoformat(), _month_label(day)):
+            if scope in scopes:
+                expiries[scope] = min(expiries.get(scope, expires_at), expires_at)
+
+    def rotate():
+        now = time.time()
+        tokens_by_timeout = {}
+        for scope in scopes:
+            timeout = None  # Valid until the next change
+            if scope in expiries:
+                timeout = max(int(expiries[scope].timestamp() - now) + 1, 1)
+            tokens_by_timeout.setdefault(timeout, {})[f"{KEY_PREFIX}:gen:{scope}"] = _new_token()
+        for timeout, tokens in tokens_by_timeout.items():
+            cache.set_many(tokens, timeout)
+
+    if scopes:
+        transaction.on_commit(rotate)
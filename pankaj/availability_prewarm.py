@@ -0,0 +1,145 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              AVAILABILITY PRE-WARMING
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Computes and caches the month payloads booking.html asks for first (the
+# date-availability flags and the calendar with its first available day)
+# for the coming months and every standard duration, so the first visitors
+# after a deploy or cache flush are served warm.
+#
+# Missing day summaries are stored up front in one pass, so the per-month
+# work that follows only reads and can run in a process pool. Months run in
+# parallel only when the cache is shared between processes (not LocMemCache).
+#
+# Enabled at startup with AVAILABILITY_PREWARM_MONTHS: the first request
+# after start-up pre-warms that many months in a background thread.
+
+import threading  # Start-up pre-warm runs off the request path
+import time  # Per-month timing
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Parallel months
+from datetime import datetime
+
+from django.conf import settings  # Access Django settings
+from django.core.cache import caches  # Configured cache backends
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import request_started
+from django.db import close_old_connections, connections
+
+from . import availability_cache, scheduling
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+STARTUP_MONTHS = getattr(settings, 'AVAILABILITY_PREWARM_MONTHS', 0)  # 0 disables the start-up hook
+
+
+def upcoming_months(months, now=None):
+    """(year, month) pairs from the booking-horizon month on."""
+    first = scheduling.booking_horizon(now or datetime.now()).date()
+    index = first.year * 12 + first.month - 1
+    return [(year, month + 1) for year, month in (divmod(index + offset, 12) for offset in range(months))]
+
+
+def prewarm_month(year_month):
+    """
+    Cache one month's flags and calendar payload for every standard duration.
+
+    Args:
+        year_month: (year, month) pair
+
+    Returns:
+        tuple: (year, month, seconds taken)
+    """
+    from .views import build_calendar_payload
+
+    year, month = year_month
+    started = time.perf_counter()
+    start_date, end_date = scheduling.month_bounds(year, month)
+    now = datetime.now()
+
+    for duration_minutes in scheduling.STANDARD_DURATIONS:
+        availability_cache.get_month(
+            year, month, duration_minutes,
+            lambda: scheduling.month_availability(start_date, end_date, duration_minutes)
+        )
+        # booking.js asks for its duration first, then the other standard ones
+        others = [minutes for minutes in scheduling.STANDARD_DURATIONS if minutes != duration_minutes]
+        availability_cache.get_calendar(
+            year, month, ','.join(map(str, [duration_minutes, *others])), None,
+            lambda: build_calendar_payload(year, month, duration_minutes, None, now, others)
+        )
+    close_old_connections()
+    return year, month, time.perf_counter() - started
+
+
+def _init_worker():
+    """Pool initializer: Django is set up in the worker, connections are its own."""
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+def prewarm(months, workers=None, on_month=None):
+    """
+    Pre-warm the availability cache for the next ``months`` months.
+
+    Args:
+        months: Number of months from the booking-horizon month on
+        workers: Worker processes (1 runs inline; default: one per month,
+            up to the CPU count)
+        on_month: Optional callable receiving (year, month, seconds) as
+            each month finishes
+
+    Returns:
+        list: (year, month, seconds) per month, in completion order
+    """
+    year_months = upcoming_months(months)
+    if not year_months:
+        return []
+
+    # Store every missing day summary once, so the months below only read
+    first_date = scheduling.month_bounds(*year_months[0])[0]
+    last_date = scheduling.month_bounds(*year_months[-1])[1]
+    scheduling.get_range_summaries(first_date, last_date)
+
+    # A per-process cache would be warmed in the workers only
+    if isinstance(caches['default'], LocMemCache):
+        workers = 1
+
+    results = []
+    if workers == 1 or len(year_months) == 1:
+        for year_month in year_months:
+            results.append(prewarm_month(year_month))
+            if on_month:
+                on_month(*results[-1])
+        return results
+
+    connections.close_all()  # Never share a connection with forked workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for future in as_completed([pool.submit(prewarm_month, year_month) for year_month in year_months]):
+            results.append(future.result())
+            if on_month:
+                on_month(*results[-1])
+    return results
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              START-UP HOOK
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _prewarm_on_first_request(sender, **kwargs):
+    """Pre-warm in a background thread once, when the first request arrives."""
+    request_started.disconnect(dispatch_uid='availability-prewarm')
+
+    def run():
+        try:
+            prewarm(STARTUP_MONTHS, workers=1)
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=run, name='availability-prewarm', daemon=True).start()
+
+
+def install_startup_hook():
+    """Connect the first-request pre-warm when AVAILABILITY_PREWARM_MONTHS is set."""
+    if STARTUP_MONTHS > 0:
+        request_started.connect(_prewarm_on_first_request, dispatch_uid='availability-prewarm')
@@ -0,0 +1,318 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EMAIL RENDERING
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Every booking email is rendered from templates/emails/<name>.txt (the plain
+# text body) and, for client-facing messages, <name>.html (the HTML
+# alternative). The builders below return ready EmailMultiAlternatives for
+# outbox.enqueue().
+#
+# Templates are compiled once per process by a dedicated engine with a cached
+# loader. HTML templates get emails/styles.css inlined into their style
+# attributes as they are loaded, so sending a message never touches CSS.
+# Only plain "tag", ".class" and "tag.class" selectors are inlined; other
+# rules are left in a <style> block.
+
+import re  # CSS parsing and tag rewriting
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings  # Access Django settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context, Engine, TemplateDoesNotExist
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+from django.utils import timezone
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+TEMPLATE_DIR = Path(__file__).resolve().parent / 'templates'
+STYLESHEET = 'emails/styles.css'  # Inlined into every emails/*.html template
+SITE_URL = getattr(settings, 'SITE_URL', 'https://anjali-bansal.com')
+SUPPORT_EMAIL = getattr(settings, 'SUPPORT_EMAIL', 'kpregtech@gmail.com')
+
+STATUS_LABELS = {
+    'pending': 'Pending Review',
+    'confirmed': 'Confirmed',
+    'completed': 'Completed',
+    'cancelled': 'Cancelled',
+}
+
+# Header colour, icon, title and lead sentence of each status-change email
+STATUS_STYLES = {
+    'pending': {'color': '#ffc107', 'icon': '⏳', 'title': 'Booking Under Review',
+                'message': 'Your booking is now <strong>Under Review</strong>.'},
+    'confirmed': {'color': '#28a745', 'icon': '✅', 'title': 'Booking Confirmed!',
+                  'message': 'Your booking has been <strong>Confirmed</strong>.'},
+    'completed': {'color': '#17a2b8', 'icon': '🏁', 'title': 'Consultation Completed',
+                  'message': 'Your consultation has been marked as <strong>Completed</strong>.'},
+    'cancelled': {'color': '#dc3545', 'icon': '❌', 'title': 'Booking Cancelled',
+                  'message': 'Your booking has been <strong>Cancelled</strong>.'},
+}
+
+SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$')
+RULE_RE = re.compile(r'([^{}@]+)\{([^{}]*)\}')
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)\b((?:[^<>"\']|"[^"]*"|\'[^\']*\')*?)(/?)>')
+CLASS_RE = re.compile(r'\sclass\s*=\s*"([^"]*)"')
+STYLE_ATTR_RE = re.compile(r'\sstyle\s*=\s*"([^"]*)"')
+SKIP_TAGS = {'html', 'head', 'meta', 'title', 'style', 'link', 'br'}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              CSS INLINING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _declarations(text):
+    """Ordered (property, value) pairs of a declaration block."""
+    pairs = []
+    for part in text.split(';'):
+        prop, _, value = part.partition(':')
+        if prop.strip() and value.strip():
+            pairs.append((prop.strip().lower(), value.strip()))
+    return pairs
+
+
+def parse_css(css):
+    """
+    Split a stylesheet into inlinable rules and the CSS that must stay in <style>.
+
+    Returns:
+        tuple: ([(tag or None, classes, specificity, order, declarations)], leftover CSS)
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    rules, leftover = [], []
+
+    # At-rules (@media, @font-face, ...) are never inlined
+    for match in re.finditer(r'@[^{;]+(\{(?:[^{}]|\{[^{}]*\})*\}|;)', css):
+        leftover.append(match.group(0))
+    css = re.sub(r'@[^{;]+(\{(?:[^{}]|\{[^{}]*\})*\}|;)', '', css)
+
+    for order, match in enumerate(RULE_RE.finditer(css)):
+        declarations = _declarations(match.group(2))
+        for selector in (part.strip() for part in match.group(1).split(',')):
+            parsed = SELECTOR_RE.match(selector)
+            if not parsed or not selector:
+                leftover.append(f'{selector} {{ {match.group(2).strip()} }}')
+                continue
+            tag = parsed.group(1).lower() if parsed.group(1) else None
+            classes = frozenset(name for name in parsed.group(2).split('.') if name)
+            rules.append((tag, classes, (len(classes), 1 if tag else 0), order, declarations))
+    return rules, '\n'.join(leftover)
+
+
+def inline_css(html, css):
+    """
+    Copy the stylesheet's declarations into the style attributes of ``html``.
+
+    Works on template source: attribute values holding template tags are
+    left as they are, and an element's own style attribute wins over the
+    stylesheet.
+    """
+    rules, leftover = parse_css(css)
+    rules.sort(key=lambda rule: (rule[2], rule[3]))  # Later, more specific rules win
+
+    def rewrite(match):
+        tag, attrs, closing = match.group(1).lower(), match.group(2), match.group(3)
+        if tag in SKIP_TAGS:
+            return match.group(0)
+        class_match = CLASS_RE.search(attrs)
+        classes = set(class_match.group(1).split()) if class_match else set()
+
+        merged = {}
+        for rule_tag, rule_classes, _, _, declarations in rules:
+            if (rule_tag is None or rule_tag == tag) and rule_classes <= classes:
+                merged.update(declarations)
+        if not merged:
+            return match.group(0)
+
+        style_match = STYLE_ATTR_RE.search(attrs)
+        if style_match:
+            merged.update(_declarations(style_match.group(1)))
+            attrs = attrs[:style_match.start()] + attrs[style_match.end():]
+        style = '; '.join(f'{prop}: {value}' for prop, value in merged.items())
+        return f'<{match.group(1)}{attrs.rstrip()} style="{style};"{" /" if closing else ""}>'
+
+    html = TAG_RE.sub(rewrite, html)
+    if leftover and '</head>' in html:
+        html = html.replace('</head>', f'<style>\n{leftover}\n</style>\n</head>', 1)
+    return html
+
+
+class InliningLoader(FilesystemLoader):
+    """Filesystem loader that inlines the email stylesheet into HTML templates."""
+
+    _stylesheet = None
+
+    def stylesheet(self):
+        if self._stylesheet is None:
+            self._stylesheet = (TEMPLATE_DIR / STYLESHEET).read_text(encoding='utf-8')
+        return self._stylesheet
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.template_name.endswith('.html'):
+            contents = inline_css(contents, self.stylesheet())
+        return contents
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              RENDERING
+# ══════════════════════════════════════════════════════════════════════════════
+
+_engine = None
+
+
+def engine():
+    """The email template engine (built once; its cached loader keeps compiled templates)."""
+    global _engine
+    if _engine is None:
+        _engine = Engine(
+            dirs=[str(TEMPLATE_DIR)],
+            loaders=[('django.template.loaders.cached.Loader', ['pankaj.emails.InliningLoader'])],
+        )
+    return _engine
+
+
+def render(name, context):
+    """
+    Render one message type.
+
+    Args:
+        name: Template name under emails/, without extension
+        context: Template context
+
+    Returns:
+        tuple: (plain-text body, HTML body or None)
+    """
+    context = Context({
+        'site_url': SITE_URL,
+        'support_email': SUPPORT_EMAIL,
+        'now': timezone.now(),
+        'year': datetime.now().year,
+        **context,
+    })
+    text = engine().get_template(f'emails/{name}.txt').render(context).strip() + '\n'
+    try:
+        html = engine().get_template(f'emails/{name}.html').render(context)
+    except TemplateDoesNotExist:
+        html = None  # Admin notifications are plain text only
+    return text, html
+
+
+def build(name, subject, to, context):
+    """An EmailMultiAlternatives for one message type (text body, HTML alternative)."""
+    text, html = render(name, {'subject': subject, **context})
+    message = EmailMultiAlternatives(subject=subject, body=text, from_email=settings.DEFAULT_FROM_EMAIL, to=to)
+    if html is not None:
+        message.attach_alternative(html, 'text/html')
+    return message
+
+
+def _end_time(booking):
+    """Appointment end (without the booking buffer)."""
+    start = datetime.combine(booking.appointment_date, booking.appointment_time)
+    return (start + timedelta(minutes=booking.duration_minutes)).time()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              MESSAGE TYPES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def booking_confirmation(booking):
+    """Client email for a new booking, with the manual payment instructions."""
+    return build('booking_confirmation', f'Booking Confirmation - {booking.booking_id}', [booking.email], {
+        'booking': booking,
+    })
+
+
+def admin_new_booking(booking):
+    """Admin notification for a new booking."""
+    return build('admin_new_booking', f'📅 New Booking: {booking.name} - {booking.booking_id}', [settings.ADMIN_EMAIL], {
+        'booking': booking,
+        'end_time': _end_time(booking),
+    })
+
+
+def booking_cancelled(booking, reason):
+    """Client email for a cancelled booking."""
+    return build('booking_cancelled', f'Consultation Booking Cancelled - {booking.booking_id}', [booking.email], {
+        'booking': booking,
+        'reason': reason,
+        'end_time': _end_time(booking),
+        'header_color': STATUS_STYLES['cancelled']['color'],
+    })
+
+
+def admin_booking_cancelled(booking, reason):
+    """Admin notification for a cancelled booking."""
+    return build('admin_booking_cancelled', f'⚠️ Booking Cancelled: {booking.name} - {booking.booking_id}',
+                 [settings.ADMIN_EMAIL], {'booking': booking, 'reason': reason})
+
+
+def status_change(booking, new_status, old_status=None):
+    """Client email for a status change."""
+    style = STATUS_STYLES[new_status]
+    return build('status_change', f'Booking Status Update - {STATUS_LABELS[new_status]} - {booking.booking_id}',
+                 [booking.email], {
+                     'booking': booking,
+                     'new_status': new_status,
+                     'old_status': old_status,
+                     'new_label': STATUS_LABELS[new_status],
+                     'old_label': STATUS_LABELS.get(old_status, ''),
+                     'style': style,
+                     'header_color': style['color'],
+                     'end_time': _end_time(booking),
+                 })
+
+
+def admin_status_change(booking, new_status, old_status):
+    """Admin notification for a status change."""
+    new_label = STATUS_LABELS[new_status].replace(' Review', '')
+    return build('admin_status_change', f'📊 Status Changed: {booking.name} - {new_label}', [settings.ADMIN_EMAIL], {
+        'booking': booking,
+        'new_label': new_label,
+        'old_label': STATUS_LABELS.get(old_status, old_status or '').replace(' Review', ''),
+    })
+
+
+def admin_digest(events, now=None):
+    """Admin digest of buffered AdminNotification events (oldest first)."""
+    counts = {}
+    for event in events:
+        label = event.get_kind_display()
+        counts[label] = counts.get(label, 0) + 1
+    summary = ', '.join(f'{count} {label.lower()}(s)' for label, count in counts.items())
+    # Each body ends with the notification footer; the digest has its own
+    entries = [(event, event.body.rsplit('\n---\n', 1)[0].strip()) for event in events]
+    return build('admin_digest', f'🗂️ Booking digest: {len(events)} update(s) ({summary})', [settings.ADMIN_EMAIL], {
+        'events': events,
+        'entries': entries,
+        'counts': counts,
+        'since': events[0].created_at if events else now,
+        'until': now or timezone.now(),
+    })
+
+
+def _sample_digest(booking):
+    """Digest of one event of each kind (for bench_email_render)."""
+    from .models import AdminNotification
+
+    now = timezone.now()
+    messages = [
+        ('new_booking', admin_new_booking(booking)),
+        ('cancelled', admin_booking_cancelled(booking, 'Consultant unavailable')),
+        ('status_change', admin_status_change(booking, 'confirmed', 'pending')),
+    ]
+    events = [AdminNotification(kind=kind, booking=booking, subject=message.subject, body=message.body,
+                                created_at=now) for kind, message in messages]
+    return admin_digest(events, now)
+
+
+# Message types with the arguments of a representative call (used by bench_email_render)
+MESSAGE_TYPES = {
+    'booking_confirmation': lambda booking: booking_confirmation(booking),
+    'admin_new_booking': lambda booking: admin_new_booking(booking),
+    'booking_cancelled': lambda booking: booking_cancelled(booking, 'Consultant unavailable'),
+    'admin_booking_cancelled': lambda booking: admin_booking_cancelled(booking, 'Consultant unavailable'),
+    'status_change': lambda booking: status_change(booking, 'confirmed', 'pending'),
+    'admin_status_change': lambda booking: admin_status_change(booking, 'confirmed', 'pending'),
+    'admin_digest': _sample_digest,
+}
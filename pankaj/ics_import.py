@@ -0,0 +1,425 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              ICS IMPORT
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Imports busy times from iCalendar (.ics) files into ExternalCalendar rows.
+#
+# Every VEVENT that is neither cancelled nor transparent becomes busy time.
+# Recurring events are expanded (DAILY, WEEKLY with BYDAY, MONTHLY and
+# YEARLY on the start's day, with INTERVAL, COUNT, UNTIL and EXDATE) up to
+# HORIZON_DAYS ahead; overridden occurrences (RECURRENCE-ID) replace the
+# occurrence they name. Times are converted to the site's local time, the
+# same naive wall-clock time bookings use.
+#
+# Imports are incremental. Events are keyed by UID and RECURRENCE-ID; one
+# whose SEQUENCE and upcoming times are unchanged (and whose recurrences
+# were expanded far enough) is skipped. Only the dates touched by new,
+# changed or removed events get their ExternalBusy rows rebuilt (merged
+# intervals per date) and their availability refreshed.
+
+import re  # DURATION values
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError  # TZID parameters
+
+from django.db import transaction
+from django.utils import timezone  # Site time zone
+
+from . import scheduling
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+HORIZON_DAYS = 365  # How far ahead recurrences are expanded
+MAX_OCCURRENCES = 2000  # Per-event expansion guard
+WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+DURATION_RE = re.compile(r'^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+
+class ICSError(ValueError):
+    """The uploaded file is not a usable iCalendar file."""
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              PARSING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _unfold(text):
+    """Content lines with RFC 5545 line folding undone."""
+    lines = []
+    for line in text.replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        if line[:1] in (' ', '\t') and lines:
+            lines[-1] += line[1:]
+        elif line.strip():
+            lines.append(line)
+    return lines
+
+
+def _parse_line(line):
+    """(NAME, {PARAM: value}, value) of a content line, or None."""
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ':' and not in_quotes:
+            break
+    else:
+        return None
+
+    name, *params = line[:index].split(';')
+    parsed = {}
+    for param in params:
+        key, _, value = param.partition('=')
+        parsed[key.upper()] = value.strip('"')
+    return name.upper(), parsed, line[index + 1:]
+
+
+def _read_events(text):
+    """Property dicts (NAME -> [(params, value), ...]) of every top-level VEVENT."""
+    lines = _unfold(text)
+    if not lines or lines[0].strip().upper() != 'BEGIN:VCALENDAR':
+        raise ICSError('Not an iCalendar file (missing BEGIN:VCALENDAR)')
+
+    events, current, nested = [], None, 0
+    for line in lines:
+        parsed = _parse_line(line)
+        if parsed is None:
+            continue
+        name, params, value = parsed
+        if name == 'BEGIN':
+            if current is not None:
+                nested += 1  # VALARM and friends: their properties are not the event's
+            elif value.strip().upper() == 'VEVENT':
+                current = {}
+        elif name == 'END':
+            if nested:
+                nested -= 1
+            elif current is not None and value.strip().upper() == 'VEVENT':
+                events.append(current)
+                current = None
+        elif current is not None and not nested:
+            current.setdefault(name, []).append((params, value.strip()))
+    return events
+
+
+def _parse_value(value, params):
+    """A DATE (date) or DATE-TIME (aware, or naive when floating) property value."""
+    try:
+        if params.get('VALUE') == 'DATE' or len(value) == 8:
+            return datetime.strptime(value[:8], '%Y%m%d').date()
+        moment = datetime.strptime(value[:15], '%Y%m%dT%H%M%S')
+    except ValueError:
+        raise ICSError(f'Unreadable date value: {value}')
+
+    if value.endswith('Z'):
+        return moment.replace(tzinfo=dt_timezone.utc)
+    if params.get('TZID'):
+        try:
+            return moment.replace(tzinfo=ZoneInfo(params['TZID']))
+        except (ZoneInfoNotFoundError, ValueError):
+            pass  # Unknown zone name: read it as local time
+    return moment
+
+
+def _to_local(value):
+    """Naive site-local datetime for a date, aware or floating datetime."""
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time.min)
+    if value.tzinfo is not None:
+        return timezone.localtime(value, timezone.get_default_timezone()).replace(tzinfo=None)
+    return value
+
+
+def _parse_duration(value):
+    """timedelta of an RFC 5545 DURATION value."""
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        raise ICSError(f'Unreadable duration: {value}')
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0),
+    )
+    return -delta if sign == '-' else delta
+
+
+def _first(props, name):
+    """(params, value) of a property's first occurrence, or (None, None)."""
+    values = props.get(name)
+    return values[0] if values else (None, None)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              RECURRENCE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _shift_months(value, months):
+    """``value`` moved by whole months, or None when that day does not exist."""
+    index = value.year * 12 + value.month - 1 + months
+    try:
+        return value.replace(year=index // 12, month=index % 12 + 1)
+    except ValueError:
+        return None  # e.g. the 31st in a 30-day month
+
+
+def _candidates(start, rule):
+    """Occurrence starts of an RRULE in order (unbounded; the caller stops)."""
+    freq = rule.get('FREQ')
+    interval = max(int(rule.get('INTERVAL', 1) or 1), 1)
+    byday = [code for code in rule.get('BYDAY', '').split(',') if code]
+
+    supported = freq in ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY') and not any(
+        key in rule for key in ('BYSETPOS', 'BYMONTHDAY', 'BYMONTH', 'BYYEARDAY', 'BYWEEKNO', 'BYHOUR')
+    ) and all(code in WEEKDAY_CODES for code in byday) and (not byday or freq in ('DAILY', 'WEEKLY'))
+    if not supported:
+        yield start  # Rules beyond these are not expanded: the first occurrence still counts
+        return
+
+    step = 0
+    while True:
+        if freq == 'DAILY':
+            candidate = start + timedelta(days=step * interval)
+            if not byday or WEEKDAY_CODES[candidate.weekday()] in byday:
+                yield candidate
+        elif freq == 'WEEKLY':
+            week_start = start - timedelta(days=start.weekday()) + timedelta(weeks=step * interval)
+            weekdays = sorted(WEEKDAY_CODES.index(code) for code in byday) or [start.weekday()]
+            for weekday in weekdays:
+                candidate = week_start + timedelta(days=weekday)
+                if candidate >= start:
+                    yield candidate
+        else:
+            candidate = _shift_months(start, step * interval * (12 if freq == 'YEARLY' else 1))
+            if candidate is not None:
+                yield candidate
+        step += 1
+
+
+def _expand(start, rrule, exdates, window_end):
+    """Starts of a recurring event up to window_end (naive local datetime)."""
+    rule = {}
+    for part in rrule.split(';'):
+        key, _, value = part.partition('=')
+        rule[key.upper()] = value.upper()
+    count = int(rule['COUNT']) if rule.get('COUNT', '').isdigit() else None
+    until = _to_local(_parse_value(rule['UNTIL'], {})) if rule.get('UNTIL') else None
+
+    starts = []
+    for number, candidate in enumerate(_candidates(start, rule)):
+        local = _to_local(candidate)
+        if (count is not None and number >= count) or (until is not None and local > until):
+            break
+        if local >= window_end or number >= MAX_OCCURRENCES:
+            break
+        if local not in exdates:
+            starts.append(candidate)
+    return starts
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EVENTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def parse_ics(text, window_start, window_end):
+    """
+    Busy occurrences of every VEVENT in an iCalendar file.
+
+    Args:
+        text: File contents
+        window_start: Occurrences ending before this naive local datetime are dropped
+        window_end: Recurrences are expanded up to this naive local datetime
+
+    Returns:
+        dict: (UID, RECURRENCE-ID or '') -> {'sequence', 'recurring',
+        'occurrences': [(local start, local end), ...]}
+
+    Raises:
+        ICSError: The file cannot be read
+    """
+    events = {}
+    overridden = {}  # UID -> local starts replaced by RECURRENCE-ID events
+
+    for props in _read_events(text):
+        _, uid = _first(props, 'UID')
+        start_params, start_value = _first(props, 'DTSTART')
+        if not uid or start_value is None:
+            continue  # Nothing to key or place it by
+
+        recurrence_id = ''
+        params, value = _first(props, 'RECURRENCE-ID')
+        if value:
+            recurrence_id = _to_local(_parse_value(value, params)).isoformat()
+            overridden.setdefault(uid, set()).add(_to_local(_parse_value(value, params)))
+
+        _, sequence = _first(props, 'SEQUENCE')
+        _, status = _first(props, 'STATUS')
+        _, transparency = _first(props, 'TRANSP')
+        _, rrule = _first(props, 'RRULE')
+        start = _parse_value(start_value, start_params)
+
+        # Length from DTEND, else DURATION, else one day for all-day events
+        end_params, end_value = _first(props, 'DTEND')
+        _, duration_value = _first(props, 'DURATION')
+        if end_value:
+            length = _to_local(_parse_value(end_value, end_params)) - _to_local(start)
+        elif duration_value:
+            length = _parse_duration(duration_value)
+        else:
+            length = timedelta(days=1) if not isinstance(start, datetime) else timedelta(0)
+
+        starts = [start]
+        if rrule and not recurrence_id:
+            exdates = {
+                _to_local(_parse_value(part, params))
+                for params, value in props.get('EXDATE', [])
+                for part in value.split(',') if part
+            }
+            starts = _expand(start, rrule, exdates, window_end)
+
+        occurrences = []
+        if (status or '').upper() != 'CANCELLED' and (transparency or '').upper() != 'TRANSPARENT' and length > timedelta(0):
+            occurrences = [(_to_local(value), _to_local(value) + length) for value in starts]
+
+        events[(uid, recurrence_id)] = {
+            'sequence': int(sequence) if (sequence or '').lstrip('-').isdigit() else 0,
+            'recurring': bool(rrule) and not recurrence_id,
+            'occurrences': occurrences,
+        }
+
+    # Overridden occurrences belong to their RECURRENCE-ID event, not the series
+    for (uid, recurrence_id), event in events.items():
+        if not recurrence_id and uid in overridden:
+            event['occurrences'] = [
+                (start, end) for start, end in event['occurrences'] if start not in overridden[uid]
+            ]
+    for event in events.values():
+        event['occurrences'] = [(start, end) for start, end in event['occurrences'] if end > window_start]
+    return events
+
+
+def _busy_by_date(occurrences):
+    """Date -> [(start minute, end minute)] for local (start, end) pairs, split at midnight."""
+    by_date = {}
+    for start, end in occurrences:
+        day = start.date()
+        while datetime.combine(day, time.min) < end:
+            day_start = datetime.combine(day, time.min)
+            first = max(start, day_start) - day_start
+            last = min(end, day_start + timedelta(days=1)) - day_start
+            by_date.setdefault(day, []).append((int(first.total_seconds()) // 60, -(-int(last.total_seconds()) // 60)))
+            day += timedelta(days=1)
+    return by_date
+
+
+def _stored(occurrences):
+    """JSON form of (start, end) pairs."""
+    return [[start.isoformat(), end.isoformat()] for start, end in occurrences]
+
+
+def _loaded(occurrences):
+    """(start, end) pairs from their JSON form."""
+    return [(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in occurrences]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              IMPORT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def import_calendar(calendar, text, today=None, horizon_days=HORIZON_DAYS):
+    """
+    Incrementally import an .ics file into an ExternalCalendar.
+
+    Args:
+        calendar: ExternalCalendar receiving the events
+        text: File contents
+        today: First date that matters (defaults to the local date)
+        horizon_days: How far ahead recurrences are expanded
+
+    Returns:
+        dict: Counts of 'created', 'updated', 'unchanged' and 'deleted'
+        events, plus 'dates' (dates whose busy time was rebuilt)
+
+    Raises:
+        ICSError: The file cannot be read (nothing is changed)
+    """
+    from .models import ExternalEvent
+
+    today = today or timezone.localdate()
+    window_start = datetime.combine(today, time.min)
+    window_end = window_start + timedelta(days=horizon_days)
+    parsed = parse_ics(text, window_start, window_end)
+
+    stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    touched = set()
+
+    with transaction.atomic():
+        existing = {(event.uid, event.recurrence_id): event for event in calendar.events.all()}
+        to_create, to_update = [], []
+
+        for (uid, recurrence_id), data in parsed.items():
+            expanded_until = window_end.date() if data['recurring'] else date.max
+            occurrences = _stored(data['occurrences'])
+            event = existing.pop((uid, recurrence_id), None)
+            # Same SEQUENCE and the same upcoming times (a new RECURRENCE-ID
+            # override changes the series without bumping its SEQUENCE)
+            if (event is not None and event.sequence == data['sequence']
+                    and event.expanded_until >= expanded_until
+                    and [pair for pair in event.occurrences if pair[1] > window_start.isoformat()] == occurrences):
+                stats['unchanged'] += 1
+                continue
+
+            touched.update(_busy_by_date(data['occurrences']))
+            if event is None:
+                to_create.append(ExternalEvent(
+                    calendar=calendar, uid=uid, recurrence_id=recurrence_id, sequence=data['sequence'],
+                    expanded_until=expanded_until, occurrences=occurrences,
+                ))
+                stats['created'] += 1
+            else:
+                touched.update(_busy_by_date(_loaded(event.occurrences)))
+                event.sequence, event.expanded_until, event.occurrences = data['sequence'], expanded_until, occurrences
+                to_update.append(event)
+                stats['updated'] += 1
+
+        # Events no longer in the file
+        for event in existing.values():
+            touched.update(_busy_by_date(_loaded(event.occurrences)))
+        ExternalEvent.objects.filter(pk__in=[event.pk for event in existing.values()]).delete()
+        stats['deleted'] = len(existing)
+
+        ExternalEvent.objects.bulk_create(to_create, batch_size=500)
+        ExternalEvent.objects.bulk_update(to_update, ['sequence', 'expanded_until', 'occurrences'], batch_size=500)
+
+        touched = {day for day in touched if day >= today}
+        if touched:
+            rebuild_busy(calendar, touched)
+
+        calendar.imported_at = timezone.now()
+        calendar.save(update_fields=['imported_at'])
+        scheduling.availability_changed(touched)
+
+    stats['dates'] = sorted(touched)
+    return stats
+
+
+def rebuild_busy(calendar, dates):
+    """
+    Replace a calendar's ExternalBusy rows on the given dates.
+
+    Every event's occurrences on those dates are merged, so each date holds
+    one row per separate busy interval.
+    """
+    from .models import ExternalBusy
+
+    intervals = {}
+    for occurrences in calendar.events.values_list('occurrences', flat=True):
+        for day, busy in _busy_by_date(_loaded(occurrences)).items():
+            if day in dates:
+                intervals.setdefault(day, []).extend(busy)
+
+    ExternalBusy.objects.filter(calendar=calendar, date__in=dates).delete()
+    ExternalBusy.objects.bulk_create([
+        ExternalBusy(
+            calendar=calendar, consultant_id=calendar.consultant_id, date=day,
+            start_time=scheduling.to_time(start), end_time=scheduling.end_time_for(scheduling.to_time(start), end - start),
+        )
+        for day, busy in intervals.items()
+        for start, end in scheduling.merge_intervals(busy)
+    ], batch_size=500)
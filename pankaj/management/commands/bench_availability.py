@@ -0,0 +1,218 @@
+# pankaj/management/commands/bench_availability.py
+import io
+import json
+import platform
+import random
+import statistics
+import time as timer
+from datetime import date, datetime, time, timedelta
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+
+from pankaj import scheduling
+from pankaj.models import Consultant, ConsultationBooking, DayAvailability, TimeSlotManager
+
+DURATIONS = ('30-min', '45-min', '60-min')
+STATUSES = ('pending', 'pending', 'confirmed', 'confirmed', 'confirmed', 'cancelled')
+
+
+def seed_bookings(start, days, per_day, consultants, rng):
+    """
+    Bulk-insert ``per_day`` synthetic bookings on each of ``days`` dates.
+
+    Starts fall on the quarter hour between 8:00 and 18:00, overlaps
+    included; bulk_create skips save(), so the derived columns are set here.
+    """
+    batch = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for index in range(per_day):
+            duration = rng.choice(DURATIONS)
+            minutes = scheduling.parse_duration(duration)
+            start_time = time(rng.randint(8, 17), rng.choice((0, 15, 30, 45)))
+            batch.append(ConsultationBooking(
+                duration=duration,
+                price=0,
+                appointment_date=day,
+                appointment_time=start_time,
+                duration_minutes=minutes,
+                appointment_end=scheduling.end_time_for(start_time, minutes, scheduling.BOOKING_BUFFER),
+                mode='video',
+                status=rng.choice(STATUSES),
+                consultant=rng.choice(consultants),
+                name=f'Load {index}',
+                email=f'load{index}@example.com',
+                phone='0000000000',
+                topic='Synthetic load',
+            ))
+        if len(batch) >= 5000:
+            ConsultationBooking.objects.bulk_create(batch)
+            batch = []
+    ConsultationBooking.objects.bulk_create(batch)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the availability APIs against synthetic schedules in a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='0,10,50,100,200',
+                            help='Comma-separated bookings-per-day sizes to seed')
+        parser.add_argument('--days', type=int, default=365, help='Dates seeded from tomorrow on')
+        parser.add_argument('--consultants', type=int, default=4, help='Consultants the bookings are spread over')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint, size and mode')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--label', default='', help='Free-form label stored with the results (e.g. a commit)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Earlier JSON results to compare against; regressions fail the run')
+        parser.add_argument('--max-regression', type=float, default=0.25,
+                            help='Allowed p95 latency growth over the baseline (fraction)')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='p95 growth below this many ms is treated as noise')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read baseline: {exc}')
+
+        sizes = sorted({int(size) for size in options['sizes'].split(',')})
+
+        # ─── Throwaway database and cache ─────────────────────────────────────
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'bench-availability',
+                'OPTIONS': {'MAX_ENTRIES': 10000},
+            }}):
+                results = self.run_suite(sizes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'label': options['label'],
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'settings': {key: options[key] for key in ('days', 'consultants', 'requests', 'seed')},
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        if baseline is not None:
+            self.compare(baseline, report, options['max_regression'], options['min_delta_ms'])
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def run_suite(self, sizes, options):
+        """Seed each size, then time every target uncached and cached."""
+        rng = random.Random(options['seed'])
+        days = options['days']
+        start = date.today() + timedelta(days=1)
+        end = start + timedelta(days=days)
+        for index in range(Consultant.objects.count(), options['consultants']):
+            Consultant.objects.create(name=f'Load consultant {index + 1}')
+        consultants = list(Consultant.objects.filter(is_active=True))
+        call_command('setup_slots', stdout=io.StringIO())  # The default weekly templates
+        client = Client()
+        results = []
+
+        self.stdout.write(
+            f'{"bookings":>8} {"target":<24} {"mode":<9} {"p50 (ms)":>9} {"p95 (ms)":>9} {"queries":>8}'
+        )
+        seeded = 0
+        for per_day in sizes:
+            # Sizes only grow, so each one tops up the previous schedule
+            seed_bookings(start, days, per_day - seeded, consultants, rng)
+            seeded = per_day
+            DayAvailability.objects.all().delete()
+            scheduling.get_range_summaries(start, end)  # Steady state: every summary stored
+
+            dates = [start + timedelta(days=rng.randrange(days)) for _ in range(options['requests'])]
+            targets = [
+                ('available-slots', lambda day: client.get(
+                    '/api/available-slots/', {'date': day.isoformat(), 'duration': 45})),
+                ('date-availability', lambda day: client.get(
+                    '/api/date-availability/', {'year': day.year, 'month': day.month, 'duration': 45})),
+                ('calendar', lambda day: client.get(
+                    '/api/calendar/', {'year': day.year, 'month': day.month, 'duration': 45})),
+                ('next-available', lambda day: client.get(
+                    '/api/next-available/', {'duration': 45, 'count': 5})),
+                ('TimeSlotManager', lambda day: TimeSlotManager.get_available_times(day, 45)),
+            ]
+
+            for target, request in targets:
+                for mode in ('uncached', 'cached'):
+                    latencies, queries = [], []
+                    for day in dates:
+                        if mode == 'uncached':
+                            cache.clear()
+                        with CaptureQueriesContext(connection) as captured:
+                            started = timer.perf_counter()
+                            response = request(day)
+                            latencies.append((timer.perf_counter() - started) * 1000)
+                        queries.append(len(captured.captured_queries))
+                        if getattr(response, 'status_code', 200) != 200:
+                            raise CommandError(f'{target} answered {response.status_code} for {day}')
+
+                    row = {
+                        'bookings_per_day': per_day,
+                        'target': target,
+                        'mode': mode,
+                        'p50_ms': round(statistics.median(latencies), 3),
+                        'p95_ms': round(percentile(latencies, 0.95), 3),
+                        'max_ms': round(max(latencies), 3),
+                        'queries_mean': round(statistics.mean(queries), 2),
+                        'queries_max': max(queries),
+                    }
+                    results.append(row)
+                    self.stdout.write(
+                        f'{per_day:>8} {target:<24} {mode:<9} {row["p50_ms"]:>9.2f} '
+                        f'{row["p95_ms"]:>9.2f} {row["queries_max"]:>8}'
+                    )
+        return results
+
+    def compare(self, baseline, report, max_regression, min_delta_ms):
+        """Fail when a p95 latency or a query count grew past the baseline."""
+        def key(row):
+            return row['bookings_per_day'], row['target'], row['mode']
+
+        previous = {key(row): row for row in baseline.get('results', [])}
+        regressions = []
+        for row in report['results']:
+            before = previous.get(key(row))
+            if before is None:
+                continue  # New case: nothing to compare with
+            label = '{} bookings/day, {} ({})'.format(*key(row))
+            delta = row['p95_ms'] - before['p95_ms']
+            if delta > min_delta_ms and row['p95_ms'] > before['p95_ms'] * (1 + max_regression):
+                regressions.append(f'{label}: p95 {before["p95_ms"]:.2f} -> {row["p95_ms"]:.2f} ms')
+            if row['queries_max'] > before['queries_max']:
+                regressions.append(f'{label}: queries {before["queries_max"]} -> {row["queries_max"]}')
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f'{len(regressions)} regression(s) against {baseline.get("label") or "the baseline"}')
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
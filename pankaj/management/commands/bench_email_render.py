@@ -0,0 +1,69 @@
+# pankaj/management/commands/bench_email_render.py
+import statistics
+import time as timer
+import uuid
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pankaj import emails
+from pankaj.models import ConsultationBooking
+
+
+def sample_booking():
+    """An unsaved booking with every field the email templates read."""
+    now = timezone.now()
+    return ConsultationBooking(
+        booking_id=uuid.uuid4(),
+        duration='45-min',
+        duration_minutes=45,
+        price=Decimal('2999.00'),
+        appointment_date=date.today() + timedelta(days=3),
+        appointment_time=time(11, 0),
+        mode='video',
+        status='confirmed',
+        name='Benchmark Client',
+        email='client@example.com',
+        phone='9999999999',
+        company='Example Pvt Ltd',
+        designation='Director',
+        topic='Compliance review of a new lending product ' * 4,
+        created_at=now,
+        pending_at=now,
+        confirmed_at=now,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Benchmark email rendering per message type (first render and warm renders)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=500, help='Warm renders per message type')
+
+    def handle(self, *args, **options):
+        booking = sample_booking()
+        repeat = options['repeat']
+
+        self.stdout.write(f'{"message type":<26} {"first (ms)":>10} {"p50 (ms)":>9} {"p95 (ms)":>9} {"bytes":>7}')
+        for name, build in emails.MESSAGE_TYPES.items():
+            # First render loads, inlines and compiles the templates
+            started = timer.perf_counter()
+            message = build(booking)
+            first = (timer.perf_counter() - started) * 1000
+
+            samples = []
+            for _ in range(repeat):
+                started = timer.perf_counter()
+                build(booking)
+                samples.append((timer.perf_counter() - started) * 1000)
+            samples.sort()
+
+            size = len(message.body) + sum(len(content) for content, _ in message.alternatives)
+            self.stdout.write(
+                f'{name:<26} {first:>10.2f} {statistics.median(samples):>9.3f} '
+                f'{samples[int(0.95 * (len(samples) - 1))]:>9.3f} {size:>7}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered each message type {repeat + 1} times'))
@@ -0,0 +1,67 @@
+# pankaj/management/commands/bench_next_available.py
+import time as timer
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from pankaj import scheduling
+from pankaj.models import DayAvailability
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the next-available search over the booking horizon, warm and cold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Dates searched ahead')
+        parser.add_argument('--duration', type=int, default=45, help='Requested duration in minutes')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per case (best time is reported)')
+
+    def measure(self, run, repeat, setup=None):
+        """Best wall time in ms, queries issued and result of ``run``."""
+        best, queries, result = None, 0, None
+        for _ in range(repeat):
+            with transaction.atomic():
+                if setup:
+                    setup()
+                with CaptureQueriesContext(connection) as captured:
+                    started = timer.perf_counter()
+                    result = run()
+                    elapsed = (timer.perf_counter() - started) * 1000
+                if setup:
+                    transaction.set_rollback(True)  # Put the deleted summaries back
+            queries = len(captured.captured_queries)
+            best = elapsed if best is None else min(best, elapsed)
+        return best, queries, result
+
+    def handle(self, *args, **options):
+        days = options['days']
+        duration = options['duration']
+        repeat = options['repeat']
+        now = datetime.now()
+        first = scheduling.booking_horizon(now).date()
+        end = first + timedelta(days=days)
+
+        def search(count):
+            return lambda: scheduling.next_available(duration, count=count, days=days, now=now)
+
+        def drop_summaries():
+            DayAvailability.objects.filter(date__gte=first, date__lt=end).delete()
+
+        # Store every summary in the horizon once so the warm cases are warm
+        scheduling.get_range_summaries(first, end)
+
+        cases = [
+            ('first slot (warm)', search(1), None),
+            ('20 slots (warm)', search(20), None),
+            ('full horizon (warm)', search(days * 24 * 60), None),
+            ('full horizon (cold)', search(days * 24 * 60), drop_summaries),
+        ]
+
+        self.stdout.write(f'{"case":<22} {"best (ms)":>10} {"queries":>8} {"slots":>7}')
+        for label, run, setup in cases:
+            best, queries, result = self.measure(run, max(repeat // 5, 1) if setup else repeat, setup)
+            self.stdout.write(f'{label:<22} {best:>10.2f} {queries:>8} {len(result):>7}')
+
+        self.stdout.write(self.style.SUCCESS(f'Searched {days} days for {duration}-minute slots'))
@@ -0,0 +1,171 @@
+# pankaj/management/commands/bench_scheduling.py
+import random
+import timeit
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pankaj import scheduling
+
+
+def legacy_free_starts(date_obj, bookings, duration_minutes):
+    """The previous 15-minute scan, kept here only as a comparison baseline."""
+    starts = []
+    current = datetime.combine(date_obj, time(9, 0))
+    end = datetime.combine(date_obj, time(17, 0))
+    duration_td = timedelta(minutes=duration_minutes)
+    while current <= end:
+        slot_end = current + duration_td
+        if slot_end <= end:
+            is_available = True
+            for start, duration in bookings:
+                booking_start = datetime.combine(date_obj, start)
+                booking_end = booking_start + timedelta(minutes=int(duration.replace('-min', ''))) + timedelta(minutes=15)
+                if current < booking_end and slot_end > booking_start:
+                    is_available = False
+                    break
+            if is_available:
+                starts.append(current.hour * 60 + current.minute)
+        current += timedelta(minutes=15)
+    return starts
+
+
+def busy_intervals(bookings):
+    """Merged busy intervals (buffer included) for synthetic (start, duration) pairs."""
+    return scheduling.merge_intervals(
+        (scheduling.to_minutes(start),
+         scheduling.to_minutes(start) + scheduling.parse_duration(duration) + scheduling.BOOKING_BUFFER)
+        for start, duration in bookings
+    )
+
+
+def growth(label, timings, sizes, unit='bookings'):
+    """One line saying whether a column stayed flat between the smallest and largest size."""
+    ratio = timings[-1] / timings[0] if timings[0] else float('inf')
+    verdict = 'flat' if ratio < 2 else f'grows with {unit}'
+    return f'{label}: {ratio:.1f}x from {sizes[0]} to {sizes[-1]} {unit} ({verdict})'
+
+
+def per_consultant_starts(window, busy, consultants, duration_minutes):
+    """One erosion per consultant, ORed in a loop; the baseline for packed lanes."""
+    starts = 0
+    for consultant in consultants:
+        free_bits = window & ~scheduling.busy_mask(busy.get(consultant, ()))
+        starts |= scheduling.erode(free_bits, duration_minutes)
+    return starts
+
+
+class Command(BaseCommand):
+    help = 'Benchmark free-start lookups (stored summary read vs rebuild) as bookings per day and consultants grow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='0,10,50,100,200,500',
+                            help='Comma-separated bookings-per-day sizes to measure')
+        parser.add_argument('--consultants', default='1,4,16,64',
+                            help='Comma-separated consultant counts to measure (20 bookings each)')
+        parser.add_argument('--duration', type=int, default=45, help='Requested duration in minutes')
+        parser.add_argument('--repeat', type=int, default=200, help='Runs per size')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        duration = options['duration']
+        repeat = options['repeat']
+        day = date.today() + timedelta(days=1)
+        now = datetime.combine(date.today(), time(0, 0))
+        earliest = scheduling.earliest_start_for(day, now)
+
+        # ─── Request path: stored summary vs rebuilding it vs the old scan ───
+        # "read" is what the availability views run: one DayAvailability
+        # fetch by primary key plus an erosion of its stored bitmap.
+        # "rebuild" is what a booking change (and a refused reservation)
+        # runs: merge the day's intervals, then consultant_free_mask() and
+        # the erosion in starts_for_busy().
+        self.stdout.write(f'{"bookings":>9} {"read (µs)":>10} {"rebuild (µs)":>13} {"legacy (µs)":>12}')
+        timings = {'read': [], 'rebuild': []}
+        with transaction.atomic():
+            for size in sizes:
+                # Synthetic bookings spread across the whole day, overlaps included;
+                # left unassigned so they block every consultant like the old scan
+                bookings = [
+                    (time(rng.randint(0, 23), rng.choice([0, 15, 30, 45])), rng.choice(['30-min', '45-min', '60-min']))
+                    for _ in range(size)
+                ]
+                scheduling.build_day_summary(day, {None: busy_intervals(bookings)}).save()
+
+                read = lambda: scheduling.get_free_starts(day, duration, now)
+                rebuild = lambda: scheduling.starts_for_busy(day, {None: busy_intervals(bookings)}, duration, earliest)
+                legacy = lambda: legacy_free_starts(day, bookings, duration)
+
+                if read() != rebuild():
+                    self.stdout.write(self.style.ERROR(f'Result mismatch at {size} bookings'))
+                    transaction.set_rollback(True)
+                    return
+
+                read_us = min(timeit.repeat(read, number=1, repeat=repeat)) * 1e6
+                rebuild_us = min(timeit.repeat(rebuild, number=1, repeat=repeat)) * 1e6
+                legacy_us = min(timeit.repeat(legacy, number=1, repeat=max(repeat // 10, 1))) * 1e6
+                timings['read'].append(read_us)
+                timings['rebuild'].append(rebuild_us)
+                self.stdout.write(f'{size:>9} {read_us:>10.1f} {rebuild_us:>13.1f} {legacy_us:>12.1f}')
+            transaction.set_rollback(True)  # Leave the stored summary as it was
+
+        for label, column in timings.items():
+            self.stdout.write(growth(label, column, sizes))
+
+        # ─── Capacity: packed consultant lanes vs one erosion per consultant ───
+        window = scheduling.interval_mask(scheduling.WORKDAY_START, scheduling.WORKDAY_END)
+        grid = scheduling.erode(window, duration) & scheduling.grid_mask(scheduling.WORKDAY_START, scheduling.WORKDAY_END)
+
+        self.stdout.write(f'\n{"consultants":>11} {"packed (µs)":>12} {"loop (µs)":>12}')
+        counts = [int(count) for count in options['consultants'].split(',')]
+        timings = {'packed': [], 'loop': []}
+        for count in counts:
+            consultants = list(range(1, count + 1))
+            busy = {
+                consultant: busy_intervals(
+                    (time(rng.randint(9, 16), rng.choice([0, 15, 30, 45])), rng.choice(['30-min', '45-min', '60-min']))
+                    for _ in range(20)
+                )
+                for consultant in consultants
+            }
+            packed_bits = scheduling.consultant_free_mask(window, busy, consultants)
+
+            packed = lambda: scheduling.fold_lanes(scheduling.erode(packed_bits, duration)) & grid
+            loop = lambda: per_consultant_starts(window, busy, consultants, duration) & grid
+
+            if packed() != loop():
+                self.stdout.write(self.style.ERROR(f'Result mismatch at {count} consultants'))
+                return
+
+            packed_us = min(timeit.repeat(packed, number=1, repeat=repeat)) * 1e6
+            loop_us = min(timeit.repeat(loop, number=1, repeat=repeat)) * 1e6
+            timings['packed'].append(packed_us)
+            timings['loop'].append(loop_us)
+            self.stdout.write(f'{count:>11} {packed_us:>12.1f} {loop_us:>12.1f}')
+
+        # Both grow with consultants: every shift-and touches each lane's
+        # bits, so the packed path is linear too, just with a smaller constant
+        for label, column in timings.items():
+            self.stdout.write(growth(label, column, counts, 'consultants'))
+
+        # ─── Durations: one chained erosion vs one erosion per duration ───
+        durations = (30, 45, 60)
+        self.stdout.write(f'\n{"consultants":>11} {"3 durations, one pass (µs)":>27} {"one per duration (µs)":>22}')
+        for count in [int(count) for count in options['consultants'].split(',')]:
+            packed_bits = scheduling.consultant_free_mask(window, {}, list(range(1, count + 1)))
+
+            chained = lambda: scheduling.erode_many(packed_bits, durations)
+            separate = lambda: {minutes: scheduling.erode(packed_bits, minutes) for minutes in durations}
+
+            if chained() != separate():
+                self.stdout.write(self.style.ERROR(f'Result mismatch at {count} consultants'))
+                return
+
+            chained_us = min(timeit.repeat(chained, number=1, repeat=repeat)) * 1e6
+            separate_us = min(timeit.repeat(separate, number=1, repeat=repeat)) * 1e6
+            self.stdout.write(f'{count:>11} {chained_us:>27.1f} {separate_us:>22.1f}')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
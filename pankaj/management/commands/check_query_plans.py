@@ -0,0 +1,26 @@
+# pankaj/management/commands/check_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from pankaj.query_plans import query_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot ConsultationBooking queries and fail if any falls back to a full table scan'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Query plan checks use SQLite EXPLAIN QUERY PLAN output')
+
+        failures = []
+        for label, details, full_scans in query_plans():
+            style = self.style.ERROR if full_scans else self.style.SUCCESS
+            self.stdout.write(style(f'{label}:'))
+            for detail in details:
+                self.stdout.write(f'    {detail}')
+            if full_scans:
+                failures.append(label)
+
+        if failures:
+            raise CommandError(f'Full table scan in: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('Every hot query uses an index'))
@@ -0,0 +1,53 @@
+# pankaj/management/commands/import_ics.py
+from django.core.management.base import BaseCommand, CommandError
+
+from pankaj.ics_import import HORIZON_DAYS, ICSError, import_calendar
+from pankaj.models import Consultant, ExternalCalendar
+
+
+class Command(BaseCommand):
+    help = 'Import (or re-import) busy times from an .ics file into an external calendar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('calendar', help='External calendar ID or name')
+        parser.add_argument('path', help='Path to the .ics file')
+        parser.add_argument('--create', action='store_true', help='Create the calendar when it does not exist')
+        parser.add_argument('--consultant', type=int, help='Consultant ID owning a newly created calendar')
+        parser.add_argument('--horizon-days', type=int, default=HORIZON_DAYS,
+                            help='How far ahead recurring events are expanded')
+
+    def handle(self, *args, **options):
+        calendar = self.get_calendar(options)
+        try:
+            with open(options['path'], encoding='utf-8-sig') as handle:
+                text = handle.read()
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f'Cannot read {options["path"]}: {exc}')
+
+        try:
+            stats = import_calendar(calendar, text, horizon_days=options['horizon_days'])
+        except ICSError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f'{stats["created"]} new, {stats["updated"]} changed, {stats["unchanged"]} unchanged, '
+            f'{stats["deleted"]} removed events'
+        )
+        self.stdout.write(self.style.SUCCESS(f'Imported {calendar}: {len(stats["dates"])} dates refreshed'))
+
+    def get_calendar(self, options):
+        """The calendar named on the command line, created when asked to."""
+        name = options['calendar']
+        lookup = {'pk': int(name)} if name.isdigit() else {'name': name}
+        calendar = ExternalCalendar.objects.filter(**lookup).first()
+        if calendar is not None:
+            return calendar
+        if not options['create'] or name.isdigit():
+            raise CommandError(f'No external calendar {name!r} (use --create with a name to add one)')
+
+        consultant = None
+        if options['consultant'] is not None:
+            consultant = Consultant.objects.filter(pk=options['consultant']).first()
+            if consultant is None:
+                raise CommandError(f'No consultant with ID {options["consultant"]}')
+        return ExternalCalendar.objects.create(name=name, consultant=consultant)
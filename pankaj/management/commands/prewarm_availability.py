@@ -0,0 +1,32 @@
+# pankaj/management/commands/prewarm_availability.py
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pankaj import availability_prewarm
+
+
+class Command(BaseCommand):
+    help = 'Compute and cache the availability payloads for the next N months and every duration'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=3, help='Months to pre-warm, from the current one')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per month, up to the CPU count)')
+
+    def handle(self, *args, **options):
+        months = options['months']
+        if months < 1:
+            raise CommandError('--months must be at least 1')
+        workers = options['workers'] or min(months, os.cpu_count() or 1)
+        if workers < 1:
+            raise CommandError('--workers must be at least 1')
+
+        def report(year, month, seconds):
+            self.stdout.write(f'  {year:04d}-{month:02d}: {seconds * 1000:.1f} ms')
+
+        started = time.perf_counter()
+        results = availability_prewarm.prewarm(months, workers, on_month=report)
+        self.stdout.write(self.style.SUCCESS(
+            f'Pre-warmed {len(results)} month(s) in {(time.perf_counter() - started) * 1000:.1f} ms'
+        ))
@@ -0,0 +1,49 @@
+# pankaj/management/commands/rebuild_availability.py
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pankaj import availability_cache, scheduling
+from pankaj.models import DayAvailability
+from pankaj.schedule_rules import get_rules
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the materialized per-day availability summaries for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD, default: today)')
+        parser.add_argument('--end', help='Last date to rebuild, inclusive (YYYY-MM-DD, default: start + 180 days)')
+        parser.add_argument('--batch-size', type=int, default=90, help='Dates refreshed per bookings query')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start'] else date.today()
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else start + timedelta(days=180)
+        except ValueError:
+            raise CommandError('Dates must use the YYYY-MM-DD format')
+        if end < start:
+            raise CommandError('--end must not be before --start')
+
+        rules = get_rules()
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        closed = [day for day in dates if rules.is_closed(day)]
+        open_dates = [day for day in dates if not rules.is_closed(day)]
+        batch_size = max(options['batch_size'], 1)
+
+        # Closed dates get no row, exactly as on the read path
+        deleted, _ = DayAvailability.objects.filter(date__in=closed).delete()
+        if closed:
+            availability_cache.invalidate_dates(closed)
+
+        # Each batch goes through availability_changed(), so cached responses
+        # for those dates and months are evicted and live clients get events
+        for offset in range(0, len(open_dates), batch_size):
+            with transaction.atomic():
+                scheduling.availability_changed(open_dates[offset:offset + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt availability for {len(open_dates)} open date(s) from {start} to {end} '
+            f'({len(closed)} closed date(s) skipped, {deleted} stale row(s) removed)'
+        ))
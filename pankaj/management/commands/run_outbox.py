@@ -0,0 +1,64 @@
+# pankaj/management/commands/run_outbox.py
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from pankaj import admin_digest, outbox
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails (and due admin digests) over a pooled SMTP connection, with retries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send what is due, then exit')
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE, help='Messages claimed at a time')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to wait when nothing is due')
+
+    def handle(self, *args, **options):
+        worker = outbox.worker_name()
+        connection = get_connection(fail_silently=False)
+        outages = 0  # Consecutive batches stopped by a mail server outage
+        self.stdout.write(f'Outbox worker {worker} started')
+
+        try:
+            while True:
+                digested = admin_digest.flush_due()
+                if digested:
+                    self.stdout.write(f'Queued admin digest of {digested} event(s)')
+
+                rows = outbox.claim_batch(worker, options['batch_size'])
+                if rows:
+                    result = outbox.deliver(rows, connection)
+                    self.stdout.write(
+                        f'Sent {result["sent"]}, retrying {result["retrying"]}, '
+                        f'dead-lettered {result["dead"]}, released {result["released"]}'
+                    )
+                    if not result['outage']:
+                        outages = 0
+                        continue  # More may be due: claim again right away
+
+                    # The server is down: wait before probing it again
+                    outages += 1
+                    if options['once']:
+                        break
+                    delay = outbox.backoff_delay(outages, base=options['interval'], cap=300)
+                    self.stdout.write(self.style.WARNING(f'Mail server unavailable, pausing {delay:.0f}s'))
+                    close_old_connections()
+                    time.sleep(delay)
+                    continue
+
+                # Idle: do not hold the SMTP connection (or a stale DB one) open
+                connection.close()
+                close_old_connections()
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS('Outbox worker stopped'))
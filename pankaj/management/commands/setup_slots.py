@@ -1,110 +1,155 @@
-# Update your setup_slots.py command
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import time, timedelta
+# pankaj/management/commands/setup_slots.py
+from collections import Counter
+from datetime import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pankaj import schedule_rules, scheduling
 from pankaj.models import AvailableSlot
-from datetime import datetime
+
+BATCH_SIZE = 500
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday')
+
+
+def every(first, last, step):
+    """Start times from ``first`` to ``last`` (both 'H:MM', inclusive) every ``step`` minutes."""
+    start = scheduling.to_minutes(time.fromisoformat(first.zfill(5)))
+    end = scheduling.to_minutes(time.fromisoformat(last.zfill(5)))
+    return [time(minute // 60, minute % 60) for minute in range(start, end + 1, step)]
+
+
+def at(*starts):
+    """Explicit start times ('H:MM')."""
+    return [time.fromisoformat(start.zfill(5)) for start in starts]
+
+
+# ─── Weekly Templates ─────────────────────────────────────────────────────────
+# Each rule is (days, duration, start times, max bookings per start)
+TEMPLATES = {
+    # Monday to Friday: 9 AM to 6 PM
+    'weekdays': [
+        (WEEKDAYS, '30', every('9:00', '17:00', 30), 3),
+        (WEEKDAYS, '45', at('9:00', '11:00', '14:00', '16:00'), 2),
+        (WEEKDAYS, '60', every('9:00', '16:00', 60), 1),
+    ],
+    # Saturday: 10 AM to 4 PM
+    'saturday': [
+        (('saturday',), '30', every('10:00', '15:00', 30), 2),
+        (('saturday',), '45', at('10:00', '12:30', '14:00'), 2),
+        (('saturday',), '60', every('10:00', '14:00', 60), 1),
+    ],
+}
+DEFAULT_TEMPLATES = ('weekdays', 'saturday')
+
+
+def desired_slots(template_names):
+    """
+    Expand weekly templates into the slot rows they describe.
+
+    Returns:
+        dict: (day, start_time, duration) -> {'end_time', 'max_bookings'};
+        when templates overlap, the later one wins
+    """
+    slots = {}
+    for name in template_names:
+        for days, duration, starts, max_bookings in TEMPLATES[name]:
+            minutes = int(duration)
+            for day in days:
+                for start in starts:
+                    end = scheduling.to_minutes(start) + minutes
+                    slots[(day, start, duration)] = {
+                        'end_time': time(end // 60, end % 60) if end < 24 * 60 else time.max,
+                        'max_bookings': max_bookings,
+                    }
+    return slots
+
+
+def plan_changes(desired, existing, prune, reactivate=False):
+    """
+    Diff the desired slots against existing rows in memory.
+
+    Existing rows keep their is_active flag, so slots deactivated in the
+    admin stay off unless ``reactivate`` is set.
+
+    Args:
+        desired: Output of desired_slots()
+        existing: AvailableSlot instances
+        prune: Also delete rows the templates do not describe (and duplicates)
+        reactivate: Also switch deactivated template slots back on
+
+    Returns:
+        tuple: (rows to create, rows to update, pks to delete)
+    """
+    to_update, to_delete, seen = [], [], set()
+    for slot in sorted(existing, key=lambda slot: slot.pk):
+        key = (slot.day, slot.start_time, slot.duration)
+        target = desired.get(key)
+        if target is None or key in seen:
+            if prune:
+                to_delete.append(slot.pk)
+            continue
+        seen.add(key)
+        is_active = True if reactivate else slot.is_active
+        if (slot.end_time, slot.max_bookings, slot.is_active) != (target['end_time'], target['max_bookings'], is_active):
+            slot.end_time = target['end_time']
+            slot.max_bookings = target['max_bookings']
+            slot.is_active = is_active
+            to_update.append(slot)
+
+    to_create = [
+        AvailableSlot(day=day, start_time=start, duration=duration, is_active=True, **values)
+        for (day, start, duration), values in desired.items()
+        if (day, start, duration) not in seen
+    ]
+    return to_create, to_update, to_delete
+
 
 class Command(BaseCommand):
-    help = 'Sets up initial consultation time slots with different durations'
-    
-    def handle(self, *args, **kwargs):
-        # Define working hours
-        slots = []
-        
-        # Monday to Friday: 9 AM to 6 PM
-        for day in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday']:
-            # 30-minute slots
-            for hour in range(9, 18):  # 9 AM to 6 PM
-                for minute in [0, 30]:
-                    if hour == 17 and minute == 30:  # Skip 5:30 PM slot (ends at 6 PM)
-                        continue
-                    slots.append({
-                        'day': day,
-                        'start_time': time(hour, minute),
-                        'duration': '30',
-                        'max_bookings': 3,
-                    })
-            
-            # 45-minute slots (at specific times)
-            for time_slot in [(9,0), (11,0), (14,0), (16,0)]:
-                slots.append({
-                    'day': day,
-                    'start_time': time(time_slot[0], time_slot[1]),
-                    'duration': '45',
-                    'max_bookings': 2,
-                })
-            
-            # 60-minute slots
-            for hour in range(9, 17):  # 9 AM to 5 PM
-                slots.append({
-                    'day': day,
-                    'start_time': time(hour, 0),
-                    'duration': '60',
-                    'max_bookings': 1,
-                })
-        
-        # Saturday: 10 AM to 4 PM
-        for day in ['saturday']:
-            # 30-minute slots
-            for hour in range(10, 16):  # 10 AM to 4 PM
-                for minute in [0, 30]:
-                    if hour == 15 and minute == 30:  # Skip 3:30 PM slot
-                        continue
-                    slots.append({
-                        'day': day,
-                        'start_time': time(hour, minute),
-                        'duration': '30',
-                        'max_bookings': 2,
-                    })
-            
-            # 45-minute slots
-            for time_slot in [(10,0), (12,30), (14,0)]:
-                slots.append({
-                    'day': day,
-                    'start_time': time(time_slot[0], time_slot[1]),
-                    'duration': '45',
-                    'max_bookings': 2,
-                })
-            
-            # 60-minute slots
-            for hour in range(10, 15):  # 10 AM to 3 PM
-                slots.append({
-                    'day': day,
-                    'start_time': time(hour, 0),
-                    'duration': '60',
-                    'max_bookings': 1,
-                })
-        
-        # Create slots with calculated end times
-        created_count = 0
-        for slot_data in slots:
-            start_time = slot_data['start_time']
-            duration = int(slot_data['duration'])
-            
-            # Calculate end time
-            start_datetime = datetime.combine(datetime.today(), start_time)
-            end_datetime = start_datetime + timedelta(minutes=duration)
-            end_time = end_datetime.time()
-            
-            slot, created = AvailableSlot.objects.get_or_create(
-                day=slot_data['day'],
-                start_time=start_time,
-                duration=slot_data['duration'],
-                defaults={
-                    'end_time': end_time,
-                    'max_bookings': slot_data['max_bookings'],
-                    'is_active': True
-                }
+    help = 'Sets up consultation time slots from weekly templates (idempotent)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', action='append', dest='templates', choices=sorted(TEMPLATES),
+                            help=f'Weekly template to apply (repeatable, default: {", ".join(DEFAULT_TEMPLATES)})')
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete slots the selected templates do not describe')
+        parser.add_argument('--reactivate', action='store_true',
+                            help='Re-enable template slots that were deactivated in the admin')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without applying them')
+
+    def handle(self, *args, **options):
+        template_names = options['templates'] or DEFAULT_TEMPLATES
+        desired = desired_slots(template_names)
+
+        with transaction.atomic():
+            existing = list(AvailableSlot.objects.select_for_update().order_by())
+            to_create, to_update, to_delete = plan_changes(
+                desired, existing, options['prune'], options['reactivate']
+            )
+
+            self.stdout.write(
+                f'Templates {", ".join(template_names)}: {len(desired)} slots, '
+                f'{len(to_create)} to create, {len(to_update)} to update, {len(to_delete)} to delete'
             )
-            if created:
-                created_count += 1
-        
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully set up {created_count} consultation slots with various durations')
-        )
-        
-        # Show summary by duration
-        for duration in ['30', '45', '60']:
-            count = AvailableSlot.objects.filter(duration=duration).count()
-            self.stdout.write(f'  - {duration}-minute slots: {count}')
\ No newline at end of file
+            created = Counter(slot.duration for slot in to_create)
+            for duration, _ in AvailableSlot.DURATION_CHOICES:
+                self.stdout.write(f'  - {duration}-minute slots: {created[duration]} new')
+
+            if options['dry_run']:
+                self.stdout.write(self.style.WARNING('Dry run: nothing was changed'))
+                return
+            if not (to_create or to_update or to_delete):
+                self.stdout.write(self.style.SUCCESS('Slots already match the templates'))
+                return
+
+            AvailableSlot.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+            AvailableSlot.objects.bulk_update(to_update, ['end_time', 'max_bookings', 'is_active'],
+                                              batch_size=BATCH_SIZE)
+            for offset in range(0, len(to_delete), BATCH_SIZE):
+                AvailableSlot.objects.filter(pk__in=to_delete[offset:offset + BATCH_SIZE]).delete()
+
+            # Bulk writes send no signals: rebuild the rules once, on commit
+            schedule_rules.rules_changed_on_commit()
+
+        self.stdout.write(self.style.SUCCESS('Slots set up from the weekly templates'))
@@ -0,0 +1,99 @@
+# pankaj/management/commands/stress_reservations.py
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from pankaj import scheduling
+from pankaj.models import ConsultationBooking
+
+
+class Command(BaseCommand):
+    help = 'Fire parallel booking submissions at one slot and check that one wins per free consultant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=50, help='Parallel submissions')
+        parser.add_argument('--date', help='Appointment date (YYYY-MM-DD, default: 60 days ahead)')
+        parser.add_argument('--time', help='Appointment start (HH:MM, default: first bookable start)')
+        parser.add_argument('--duration', default='45-min', choices=['30-min', '45-min', '60-min'])
+        parser.add_argument('--keep', action='store_true', help='Keep the created booking')
+
+    def handle(self, *args, **options):
+        try:
+            day = (datetime.strptime(options['date'], '%Y-%m-%d').date() if options['date']
+                   else date.today() + timedelta(days=60))
+            start = datetime.strptime(options['time'], '%H:%M').time() if options['time'] else None
+        except ValueError:
+            raise CommandError('Use YYYY-MM-DD for --date and HH:MM for --time')
+
+        duration = options['duration']
+        duration_minutes = scheduling.parse_duration(duration)
+        offered = scheduling.get_free_starts(day, duration_minutes)
+        if start is None and offered:
+            start = scheduling.to_time(offered[0])
+        if start is None or scheduling.to_minutes(start) not in offered:
+            raise CommandError(f'{day} {options["time"] or ""} has no bookable start; pick a free slot')
+        capacity = scheduling.free_consultants(day, scheduling.to_minutes(start), duration_minutes).count()
+
+        workers = options['workers']
+        url = reverse('submit_booking', args=[duration])
+        barrier = threading.Barrier(workers)
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def submit(index):
+            try:
+                client = Client()
+                barrier.wait()  # Release every submission at once
+                response = client.post(url, {
+                    'selected_date': day.isoformat(),
+                    'selected_time': start.strftime('%H:%M'),
+                    'name': f'Stress {index}',
+                    'email': f'stress{index}@example.com',
+                    'phone': '0000000000',
+                    'topic': 'Reservation stress test',
+                    'mode': 'video',
+                })
+                result = response.json()
+                outcome = 'booked' if result.get('success') else ('conflict' if result.get('conflict') else 'error')
+                if outcome == 'error':
+                    self.stderr.write(f'worker {index}: {result.get("error")}')
+            except Exception as exc:
+                outcome = 'error'
+                self.stderr.write(f'worker {index}: {exc}')
+            finally:
+                connection.close()  # Each thread has its own connection
+            with lock:
+                outcomes[outcome] += 1
+
+        # Confirmation emails stay in memory
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            threads = [threading.Thread(target=submit, args=(index,)) for index in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        created = ConsultationBooking.objects.filter(
+            appointment_date=day, appointment_time=start, email__startswith='stress', email__endswith='@example.com'
+        )
+        stored = created.count()
+        self.stdout.write(
+            f'{workers} submissions: {outcomes["booked"]} booked, {outcomes["conflict"]} conflict, '
+            f'{outcomes["error"]} error; {stored} booking(s) stored'
+        )
+
+        if not options['keep']:
+            for booking in created:
+                booking.delete()  # One by one so the delete signal refreshes availability
+
+        expected = min(capacity, workers)
+        if stored == expected and outcomes['booked'] == expected and outcomes['conflict'] == workers - expected:
+            self.stdout.write(self.style.SUCCESS(f'Exactly {expected} submission(s) reserved the slot'))
+        else:
+            raise CommandError('Reservation race detected')
@@ -1,5 +1,7 @@
 # In your app directory, create a file called middleware.py:
 import logging
+from django.conf import settings
+from django.db import connection
 logger = logging.getLogger(__name__)
 
 class PaymentDebugMiddleware:
@@ -40,4 +42,30 @@ class JsonExceptionMiddleware:
             }, status=500)
         
         # Otherwise let Django handle it
-        return None
\ No newline at end of file
+        return None
+
+# ─── Query Count Debug Header ──────────────────────────────────────────────────
+
+class QueryCountDebugMiddleware:
+    """Adds an X-Query-Count header to API responses when DEBUG is on."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DEBUG or not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        query_count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        # Count every SQL statement the view runs on the default connection
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(query_count)
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0006_remove_refund_payment_remove_refund_approved_by_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DayAvailability',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('free_minutes', models.BinaryField()),
+                ('has_30_min', models.BooleanField(default=False)),
+                ('has_45_min', models.BooleanField(default=False)),
+                ('has_60_min', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Day Availability',
+                'verbose_name_plural': 'Day Availability',
+                'ordering': ['date'],
+            },
+        ),
+    ]
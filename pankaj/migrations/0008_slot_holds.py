@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:45
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0007_dayavailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dayavailability',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('hold_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('duration_minutes', models.PositiveSmallIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Slot Hold',
+                'verbose_name_plural': 'Slot Holds',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['date', 'expires_at'], name='pankaj_slot_date_9eb9b1_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:05
+
+from datetime import time
+
+from django.db import migrations, models
+
+BOOKING_BUFFER = 15  # Minutes kept free after every booking (scheduling.BOOKING_BUFFER)
+
+
+def _end_time(start, duration_minutes):
+    minutes = start.hour * 60 + start.minute + duration_minutes + BOOKING_BUFFER
+    return time.max if minutes >= 24 * 60 else time(minutes // 60, minutes % 60)
+
+
+def _duration_minutes(value):
+    try:
+        minutes = int(str(value).replace('-min', ''))
+    except (TypeError, ValueError):
+        return 45
+    return minutes if minutes > 0 else 45
+
+
+def backfill_booking_times(apps, schema_editor):
+    ConsultationBooking = apps.get_model('pankaj', 'ConsultationBooking')
+    batch = []
+    for booking in ConsultationBooking.objects.only('pk', 'duration', 'appointment_time').iterator(chunk_size=500):
+        booking.duration_minutes = _duration_minutes(booking.duration)
+        booking.appointment_end = _end_time(booking.appointment_time, booking.duration_minutes)
+        batch.append(booking)
+        if len(batch) >= 500:
+            ConsultationBooking.objects.bulk_update(batch, ['duration_minutes', 'appointment_end'])
+            batch = []
+    if batch:
+        ConsultationBooking.objects.bulk_update(batch, ['duration_minutes', 'appointment_end'])
+
+
+def backfill_hold_times(apps, schema_editor):
+    SlotHold = apps.get_model('pankaj', 'SlotHold')
+    for hold in SlotHold.objects.all():
+        hold.end_time = _end_time(hold.start_time, hold.duration_minutes)
+        hold.save(update_fields=['end_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0008_slot_holds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultationbooking',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='consultationbooking',
+            name='appointment_end',
+            field=models.TimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='slothold',
+            name='end_time',
+            field=models.TimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_booking_times, migrations.RunPython.noop),
+        migrations.RunPython(backfill_hold_times, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='consultationbooking',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='consultationbooking',
+            name='appointment_end',
+            field=models.TimeField(editable=False),
+        ),
+        migrations.AlterField(
+            model_name='slothold',
+            name='end_time',
+            field=models.TimeField(editable=False),
+        ),
+    ]
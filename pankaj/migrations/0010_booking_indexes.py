@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0009_booking_duration_minutes_appointment_end'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultationbooking',
+            index=models.Index(condition=models.Q(('status', 'cancelled'), _negated=True), fields=['appointment_date', 'appointment_time', 'appointment_end'], name='booking_active_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationbooking',
+            index=models.Index(fields=['email', 'appointment_date', 'appointment_time', 'created_at'], name='booking_duplicate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationbooking',
+            index=models.Index(fields=['status', '-created_at'], name='booking_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationbooking',
+            index=models.Index(fields=['-created_at'], name='booking_created_idx'),
+        ),
+    ]
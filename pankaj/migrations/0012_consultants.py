@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_default_consultant(apps, schema_editor):
+    """Give existing bookings and holds the consultant who handled them so far."""
+    Consultant = apps.get_model('pankaj', 'Consultant')
+    ConsultationBooking = apps.get_model('pankaj', 'ConsultationBooking')
+    SlotHold = apps.get_model('pankaj', 'SlotHold')
+
+    consultant = Consultant.objects.create(name='Default Consultant')
+    ConsultationBooking.objects.update(consultant=consultant)
+    SlotHold.objects.update(consultant=consultant)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0011_blackout_periods'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Consultant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Consultant',
+                'verbose_name_plural': 'Consultants',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='consultationbooking',
+            name='consultant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='pankaj.consultant'),
+        ),
+        migrations.AddField(
+            model_name='slothold',
+            name='consultant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='pankaj.consultant'),
+        ),
+        migrations.RunPython(assign_default_consultant, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='consultationbooking',
+            name='booking_active_day_idx',
+        ),
+        migrations.AddIndex(
+            model_name='consultationbooking',
+            index=models.Index(condition=models.Q(('status', 'cancelled'), _negated=True), fields=['appointment_date', 'appointment_time', 'appointment_end', 'consultant'], name='booking_active_day_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0012_consultants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('imported_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('consultant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='external_calendars', to='pankaj.consultant')),
+            ],
+            options={
+                'verbose_name': 'External Calendar',
+                'verbose_name_plural': 'External Calendars',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExternalBusy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('consultant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='external_busy', to='pankaj.consultant')),
+                ('calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='busy', to='pankaj.externalcalendar')),
+            ],
+            options={
+                'verbose_name': 'External Busy Time',
+                'verbose_name_plural': 'External Busy Times',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['date', 'start_time'], name='external_busy_day_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExternalEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uid', models.CharField(max_length=255)),
+                ('recurrence_id', models.CharField(blank=True, default='', max_length=32)),
+                ('sequence', models.IntegerField(default=0)),
+                ('expanded_until', models.DateField()),
+                ('occurrences', models.JSONField(default=list)),
+                ('calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='pankaj.externalcalendar')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('calendar', 'uid', 'recurrence_id'), name='external_event_uid_uniq')],
+            },
+        ),
+    ]
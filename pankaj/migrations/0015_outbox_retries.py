@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def dead_letter_failed(apps, schema_editor):
+    """Messages that failed before retries existed wait for a replay."""
+    OutboxMessage = apps.get_model('pankaj', 'OutboxMessage')
+    OutboxMessage.objects.filter(status='failed').update(status='dead')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0014_email_outbox'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxmessage',
+            name='outbox_status_idx',
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead letter')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(dead_letter_failed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ),
+    ]
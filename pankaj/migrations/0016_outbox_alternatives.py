@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0015_outbox_retries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='alternatives',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
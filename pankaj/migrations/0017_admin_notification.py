@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pankaj', '0016_outbox_alternatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('new_booking', 'New booking'), ('cancelled', 'Cancellation'), ('status_change', 'Status change')], max_length=20)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='admin_notifications', to='pankaj.consultationbooking')),
+                ('digest', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='digest_events', to='pankaj.outboxmessage')),
+            ],
+            options={
+                'verbose_name': 'Admin Notification',
+                'verbose_name_plural': 'Admin Notifications',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -436,6 +436,40 @@ class TestimonialSubmission(models.Model):
         verbose_name_plural = "Testimonial Submissions"
 """
 
+# ══════════════════════════════════════════════════════════════════════════════
+#                              CONSULTANT MODEL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class Consultant(models.Model):
+    """
+    A person bookings are assigned to.
+    
+    Every active consultant adds one unit of capacity: a time is available
+    while at least one of them is free. Consultants share the working hours
+    defined by AvailableSlot and BlackoutPeriod.
+    """
+    
+    # ─── Profile Fields ─────────────────────────────────────────────────────────
+    name = models.CharField(max_length=200)  # Consultant's name
+    email = models.EmailField(blank=True)  # Where assignment notices go
+    
+    # ─── Status Fields ──────────────────────────────────────────────────────────
+    is_active = models.BooleanField(default=True)  # Inactive consultants take no new bookings
+    created_at = models.DateTimeField(auto_now_add=True)  # Auto-set on creation
+    
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+    
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return self.name
+    
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['name']  # Order alphabetically
+        verbose_name = "Consultant"  # Singular name for admin
+        verbose_name_plural = "Consultants"  # Plural name for admin
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 #                              CONSULTATION BOOKING MODEL
 # ══════════════════════════════════════════════════════════════════════════════
@@ -472,8 +506,13 @@ class ConsultationBooking(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)  # Consultation fee
     appointment_date = models.DateField()  # Date of appointment
     appointment_time = models.TimeField()  # Time of appointment
+    duration_minutes = models.PositiveSmallIntegerField(editable=False)  # Duration as integer minutes (set on save)
+    appointment_end = models.TimeField(editable=False)  # End time plus the booking buffer (set on save)
     mode = models.CharField(max_length=20, choices=MODE_CHOICES)  # Consultation mode
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')  # Booking status
+    consultant = models.ForeignKey(
+        Consultant, on_delete=models.PROTECT, blank=True, null=True, related_name='bookings'
+    )  # Assigned consultant (unassigned bookings block every consultant)
     
     # ─── Client Information Fields ──────────────────────────────────────────────
     name = models.CharField(max_length=200)  # Client's name
@@ -543,12 +582,22 @@ class ConsultationBooking(models.Model):
     
     def save(self, *args, **kwargs):
         """
-        Override save method to update status timestamps.
+        Override save method to update status timestamps and derived times.
         """
+        from . import scheduling
+        
         # Set pending timestamp for new bookings
         if not self.pk:  # Check if this is a new instance
             self.pending_at = timezone.now()
         
+        # Integer duration and buffered end, so overlap checks can run in SQL
+        start_time = self._meta.get_field('appointment_time').to_python(self.appointment_time)
+        self.duration_minutes = scheduling.parse_duration(self.duration)
+        self.appointment_end = scheduling.end_time_for(start_time, self.duration_minutes, scheduling.BOOKING_BUFFER)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'duration_minutes', 'appointment_end'}
+        
         # Call parent class save method
         super().save(*args, **kwargs)
     
@@ -557,6 +606,23 @@ class ConsultationBooking(models.Model):
         ordering = ['-appointment_date', 'appointment_time']  # Order by date then time
         verbose_name = "Consultation Booking"  # Singular name for admin
         verbose_name_plural = "Consultation Bookings"  # Plural name for admin
+        indexes = [
+            # Availability loaders and the SQL overlap test (covering, active bookings only)
+            models.Index(
+                fields=['appointment_date', 'appointment_time', 'appointment_end', 'consultant'],
+                condition=~models.Q(status='cancelled'),
+                name='booking_active_day_idx',
+            ),
+            # Duplicate-submission check in handle_booking_submission
+            models.Index(
+                fields=['email', 'appointment_date', 'appointment_time', 'created_at'],
+                name='booking_duplicate_idx',
+            ),
+            # Dashboard status counts and status-filtered lists (newest first)
+            models.Index(fields=['status', '-created_at'], name='booking_status_created_idx'),
+            # Booking lists ordered newest first
+            models.Index(fields=['-created_at'], name='booking_created_idx'),
+        ]
 
 # In models.py, COMMENT OUT or REMOVE the entire Payment and Refund model sections:
 
@@ -660,6 +726,370 @@ class BookedSlot(models.Model):
         unique_together = ['slot', 'date']
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+#                              DAY AVAILABILITY MODEL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class DayAvailability(models.Model):
+    """
+    Materialized availability summary for one calendar date.
+    
+    Rows are refreshed whenever a booking on that date is created, changed or
+    deleted, so the availability APIs can answer with a primary-key lookup
+    instead of re-reading ConsultationBooking rows.
+    """
+    
+    # ─── Key Field ──────────────────────────────────────────────────────────────
+    date = models.DateField(primary_key=True)  # Calendar date summarised by this row
+    
+    # ─── Availability Fields ────────────────────────────────────────────────────
+    free_minutes = models.BinaryField()  # Free working minutes, one 1536-bit lane per active consultant (see scheduling)
+    has_30_min = models.BooleanField(default=False)  # At least one free 30-minute start
+    has_45_min = models.BooleanField(default=False)  # At least one free 45-minute start
+    has_60_min = models.BooleanField(default=False)  # At least one free 60-minute start
+    hold_expires_at = models.DateTimeField(null=True, blank=True)  # Earliest expiry among holds in the bitmap
+    
+    # ─── Administrative Fields ──────────────────────────────────────────────────
+    updated_at = models.DateTimeField(auto_now=True)  # Last time this summary was rebuilt
+    
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+    
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return f"Availability {self.date}"
+    
+    @property
+    def free_mask(self):
+        """Packed per-consultant free-minute bitmap as a Python int."""
+        return int.from_bytes(bytes(self.free_minutes), 'little')
+    
+    def is_stale(self, now=None):
+        """True once a slot hold counted in this summary has expired."""
+        return self.hold_expires_at is not None and self.hold_expires_at <= (now or timezone.now())
+    
+    def has_availability(self, duration_minutes):
+        """Stored flag for the standard durations, or None for other lengths."""
+        return {30: self.has_30_min, 45: self.has_45_min, 60: self.has_60_min}.get(duration_minutes)
+    
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['date']  # Order chronologically
+        verbose_name = "Day Availability"  # Singular name for admin
+        verbose_name_plural = "Day Availability"  # Plural name for admin
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              SLOT HOLD MODEL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SlotHold(models.Model):
+    """
+    Temporary reservation of a time while a client fills in the booking form.
+    
+    Active holds block their time exactly like a booking (buffer included)
+    until they expire, are released, or are converted into a booking.
+    Expired rows are deleted lazily, one date at a time, when that date's
+    availability is next read.
+    """
+    
+    # ─── Key Field ──────────────────────────────────────────────────────────────
+    hold_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)  # Token returned to the client
+    
+    # ─── Held Time ──────────────────────────────────────────────────────────────
+    date = models.DateField()  # Held date
+    start_time = models.TimeField()  # Held start time
+    duration_minutes = models.PositiveSmallIntegerField()  # Held length in minutes
+    consultant = models.ForeignKey(
+        Consultant, on_delete=models.CASCADE, blank=True, null=True, related_name='holds'
+    )  # Consultant whose time is held
+    end_time = models.TimeField(editable=False)  # End time plus the booking buffer (set on save)
+    
+    # ─── Expiry ─────────────────────────────────────────────────────────────────
+    expires_at = models.DateTimeField()  # Hold stops blocking at this moment
+    created_at = models.DateTimeField(auto_now_add=True)  # Auto-set on creation
+    
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+    
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return f"Hold {self.date} {self.start_time.strftime('%H:%M')} ({self.duration_minutes} min)"
+    
+    def is_active(self, now=None):
+        """True while the hold still blocks its time."""
+        return self.expires_at > (now or timezone.now())
+    
+    def save(self, *args, **kwargs):
+        """Store the buffered end so holds share the bookings' SQL overlap test."""
+        from . import scheduling
+        
+        self.end_time = scheduling.end_time_for(self.start_time, self.duration_minutes, scheduling.BOOKING_BUFFER)
+        super().save(*args, **kwargs)
+    
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['date', 'start_time']  # Order chronologically
+        verbose_name = "Slot Hold"  # Singular name for admin
+        verbose_name_plural = "Slot Holds"  # Plural name for admin
+        indexes = [
+            models.Index(fields=['date', 'expires_at']),  # Active holds per date / per-date sweep
+        ]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              BLACKOUT PERIOD MODEL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class BlackoutPeriod(models.Model):
+    """
+    Holiday, leave or other closure of the booking calendar.
+
+    Covers every date from start_date to end_date; with start/end times it
+    only blocks that part of each date. Yearly periods repeat on the same
+    month and day every year. Active periods are compiled into the schedule
+    rules (see schedule_rules.py), which are rebuilt whenever a row changes.
+    """
+
+    # ─── Description ────────────────────────────────────────────────────────────
+    name = models.CharField(max_length=100)  # e.g. "Diwali" or "Annual leave"
+
+    # ─── Closed Dates ───────────────────────────────────────────────────────────
+    start_date = models.DateField()  # First closed date
+    end_date = models.DateField(blank=True, null=True)  # Last closed date (inclusive); blank = start date only
+    repeats_yearly = models.BooleanField(default=False)  # Same dates every year
+
+    # ─── Partial-Day Range ──────────────────────────────────────────────────────
+    start_time = models.TimeField(blank=True, null=True)  # Blank = whole day closed
+    end_time = models.TimeField(blank=True, null=True)  # End of the blocked range
+
+    # ─── Status Fields ──────────────────────────────────────────────────────────
+    is_active = models.BooleanField(default=True)  # Inactive periods are ignored
+    created_at = models.DateTimeField(auto_now_add=True)  # Auto-set on creation
+
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        dates = f"{self.start_date}" if not self.end_date else f"{self.start_date} - {self.end_date}"
+        return f"{self.name} ({dates})"
+
+    @property
+    def is_full_day(self):
+        """True when the whole of each date is closed."""
+        return self.start_time is None
+
+    def clean(self):
+        """Validate the date and time ranges."""
+        from django.core.exceptions import ValidationError
+
+        if self.end_date and self.end_date < self.start_date:
+            raise ValidationError({'end_date': 'End date cannot be before the start date'})
+        if (self.start_time is None) != (self.end_time is None):
+            raise ValidationError('Set both start and end time for a partial-day closure, or neither')
+        if self.start_time is not None and self.end_time <= self.start_time:
+            raise ValidationError({'end_time': 'End time must be after the start time'})
+
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['start_date', 'start_time']  # Order chronologically
+        verbose_name = "Blackout Period"  # Singular name for admin
+        verbose_name_plural = "Blackout Periods"  # Plural name for admin
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EXTERNAL CALENDAR MODELS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ExternalCalendar(models.Model):
+    """
+    A personal or office calendar imported from an .ics file.
+
+    Its events count as busy time for its consultant (for everyone when no
+    consultant is set). Re-imports are incremental, see ics_import.py.
+    """
+
+    # ─── Calendar Details ───────────────────────────────────────────────────────
+    name = models.CharField(max_length=100)  # e.g. "Priya - personal"
+    consultant = models.ForeignKey(
+        Consultant, on_delete=models.CASCADE, blank=True, null=True, related_name='external_calendars'
+    )  # Whose time it blocks; blank = every consultant
+
+    # ─── Status Fields ──────────────────────────────────────────────────────────
+    is_active = models.BooleanField(default=True)  # Inactive calendars block nothing
+    imported_at = models.DateTimeField(blank=True, null=True)  # Last successful import
+    created_at = models.DateTimeField(auto_now_add=True)  # Auto-set on creation
+
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return self.name
+
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['name']
+        verbose_name = "External Calendar"  # Singular name for admin
+        verbose_name_plural = "External Calendars"  # Plural name for admin
+
+
+class ExternalEvent(models.Model):
+    """
+    One VEVENT (or one overridden occurrence) of an imported calendar.
+
+    Keyed by UID and RECURRENCE-ID; the stored SEQUENCE lets a re-import
+    skip events that did not change.
+    """
+
+    calendar = models.ForeignKey(ExternalCalendar, on_delete=models.CASCADE, related_name='events')
+    uid = models.CharField(max_length=255)  # VEVENT UID
+    recurrence_id = models.CharField(max_length=32, blank=True, default='')  # Overridden occurrence, if any
+    sequence = models.IntegerField(default=0)  # VEVENT SEQUENCE at the last import
+    expanded_until = models.DateField()  # Recurrences are expanded up to this date
+    occurrences = models.JSONField(default=list)  # [[start, end], ...] local ISO datetimes
+
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return f"{self.uid} ({self.calendar})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['calendar', 'uid', 'recurrence_id'], name='external_event_uid_uniq'),
+        ]
+
+
+class ExternalBusy(models.Model):
+    """
+    Merged busy intervals of one calendar on one date.
+
+    Rebuilt from ExternalEvent occurrences for the dates an import touched;
+    read like bookings by every availability computation.
+    """
+
+    calendar = models.ForeignKey(ExternalCalendar, on_delete=models.CASCADE, related_name='busy')
+    consultant = models.ForeignKey(
+        Consultant, on_delete=models.CASCADE, blank=True, null=True, related_name='external_busy'
+    )  # Copied from the calendar so availability queries need no join
+    date = models.DateField()  # Busy date
+    start_time = models.TimeField()  # Start of the busy interval
+    end_time = models.TimeField()  # End of the busy interval (time.max = midnight)
+
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return f"{self.calendar} busy {self.date} {self.start_time}-{self.end_time}"
+
+    class Meta:
+        ordering = ['date', 'start_time']
+        indexes = [
+            models.Index(fields=['date', 'start_time'], name='external_busy_day_idx'),
+        ]
+        verbose_name = "External Busy Time"  # Singular name for admin
+        verbose_name_plural = "External Busy Times"  # Plural name for admin
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EMAIL OUTBOX MODEL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class OutboxMessage(models.Model):
+    """
+    An email waiting to be sent, written in the same transaction as the
+    change it reports.
+    
+    The request path only inserts the row; the ``run_outbox`` worker sends
+    it later over a pooled SMTP connection (see outbox.py). Failed sends are
+    retried with backoff until MAX_ATTEMPTS, then the row is dead-lettered
+    and waits for a replay from the admin.
+    """
+    
+    # ─── Status Choices ─────────────────────────────────────────────────────────
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead letter'),
+    ]
+    
+    # ─── Message Fields ─────────────────────────────────────────────────────────
+    subject = models.CharField(max_length=255)  # Email subject
+    body = models.TextField()  # Email body
+    content_subtype = models.CharField(max_length=20, default='plain')  # 'plain' or 'html'
+    alternatives = models.JSONField(default=list, blank=True)  # [[content, mimetype], ...] e.g. the HTML part
+    from_email = models.CharField(max_length=254)  # Sender address
+    to = models.JSONField(default=list)  # Recipient addresses
+    cc = models.JSONField(default=list, blank=True)  # Carbon-copy addresses
+    bcc = models.JSONField(default=list, blank=True)  # Blind-copy addresses
+    reply_to = models.JSONField(default=list, blank=True)  # Reply-To addresses
+    headers = models.JSONField(default=dict, blank=True)  # Extra headers
+    booking = models.ForeignKey(
+        ConsultationBooking, on_delete=models.SET_NULL, blank=True, null=True, related_name='emails'
+    )  # Booking the email is about, if any
+    
+    # ─── Delivery Fields ────────────────────────────────────────────────────────
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')  # Delivery status
+    attempts = models.PositiveSmallIntegerField(default=0)  # Delivery attempts so far
+    last_error = models.TextField(blank=True)  # Error of the last failed attempt
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # Not sent before this moment (backoff)
+    claimed_by = models.CharField(max_length=64, blank=True)  # Worker currently sending it
+    claimed_at = models.DateTimeField(blank=True, null=True)  # When that worker claimed it
+    created_at = models.DateTimeField(auto_now_add=True)  # Auto-set on creation
+    sent_at = models.DateTimeField(blank=True, null=True)  # Set once delivered
+    
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+    
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+    
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['-created_at']  # Newest first
+        verbose_name = "Outbox Message"  # Singular name for admin
+        verbose_name_plural = "Outbox Messages"  # Plural name for admin
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),  # Worker's claim query
+        ]
+
+
+class AdminNotification(models.Model):
+    """
+    An admin notification waiting for the next digest email.
+
+    The rendered subject and body are kept, so the digest reports the event
+    as it happened even if the booking has changed since. ``digest`` points
+    at the outbox message that carried the event (see admin_digest.py).
+    """
+
+    # ─── Kind Choices ───────────────────────────────────────────────────────────
+    KIND_CHOICES = [
+        ('new_booking', 'New booking'),
+        ('cancelled', 'Cancellation'),
+        ('status_change', 'Status change'),
+    ]
+
+    # ─── Event Fields ───────────────────────────────────────────────────────────
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)  # What happened
+    booking = models.ForeignKey(
+        ConsultationBooking, on_delete=models.SET_NULL, blank=True, null=True, related_name='admin_notifications'
+    )  # Booking the event is about
+    subject = models.CharField(max_length=255)  # Subject of the stand-alone notification
+    body = models.TextField()  # Plain-text body of the stand-alone notification
+    created_at = models.DateTimeField(auto_now_add=True)  # Auto-set on creation
+    digest = models.ForeignKey(
+        OutboxMessage, on_delete=models.CASCADE, blank=True, null=True, related_name='digest_events'
+    )  # Digest email that carried the event; empty while buffered
+
+    # ─── Model Methods ──────────────────────────────────────────────────────────
+
+    def __str__(self):
+        """String representation for admin interface and debugging."""
+        return f"{self.get_kind_display()}: {self.subject}"
+
+    # ─── Meta Configuration ─────────────────────────────────────────────────────
+    class Meta:
+        ordering = ['-created_at']  # Newest first
+        verbose_name = "Admin Notification"  # Singular name for admin
+        verbose_name_plural = "Admin Notifications"  # Plural name for admin
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 #                              TIME SLOT MANAGER
 # ══════════════════════════════════════════════════════════════════════════════
@@ -682,56 +1112,21 @@ class TimeSlotManager:
         Returns:
             list: List of dictionaries with available time slots
         """
-        # Convert duration to timedelta for calculations
-        duration_td = timedelta(minutes=duration_minutes)
+        from . import scheduling
         
-        # Define working hours (9 AM to 5 PM)
-        start_hour = 9
-        end_hour = 17
-        
-        # Get all existing bookings for the specified date
-        bookings = ConsultationBooking.objects.filter(
-            appointment_date=date_obj
-        ).order_by('appointment_time')
+        # Load the day's bookings once and match them against the day's start grid
+        busy = scheduling.load_busy_intervals(date_obj)
         
         # Initialize list to store available slots
         possible_slots = []
         
-        # Start time calculations at beginning of day
-        current_time = datetime.combine(date_obj, datetime.min.time())
-        current_time = current_time.replace(hour=start_hour, minute=0)  # Set to 9:00 AM
-        end_time = current_time.replace(hour=end_hour, minute=0)  # Set to 5:00 PM
-        
-        # Generate time slots every 15 minutes within working hours
-        while current_time.time() <= end_time.time():
-            slot_end = current_time + duration_td
-            
-            # Check if slot fits within working hours
-            if slot_end.time() <= end_time.time():
-                # Check for overlap with existing bookings
-                is_available = True
-                
-                for booking in bookings:
-                    # Calculate booking start and end times (with 15 min buffer)
-                    booking_start = datetime.combine(date_obj, booking.appointment_time)
-                    booking_duration = timedelta(minutes=int(booking.duration.replace('-min', '')))
-                    booking_end = booking_start + booking_duration + timedelta(minutes=15)
-                    
-                    # Check for time overlap
-                    if (current_time < booking_end and slot_end > booking_start):
-                        is_available = False
-                        break
-                
-                # Add to available slots if no overlap
-                if is_available:
-                    possible_slots.append({
-                        'start_time': current_time.time(),  # Slot start time
-                        'end_time': slot_end.time(),  # Slot end time
-                        'display': f"{current_time.strftime('%H:%M')} - {slot_end.strftime('%H:%M')}"  # User-friendly display
-                    })
-            
-            # Move to next 15-minute interval
-            current_time += timedelta(minutes=15)
+        for start_minute in scheduling.starts_for_busy(date_obj, busy, duration_minutes):
+            current_time, slot_end = scheduling.format_slot(date_obj, start_minute, duration_minutes)
+            possible_slots.append({
+                'start_time': current_time.time(),  # Slot start time
+                'end_time': slot_end.time(),  # Slot end time
+                'display': f"{current_time.strftime('%H:%M')} - {slot_end.strftime('%H:%M')}"  # User-friendly display
+            })
         
         return possible_slots
     
@@ -748,29 +1143,11 @@ class TimeSlotManager:
         Returns:
             bool: True if time slot is available, False otherwise
         """
-        # Convert duration to timedelta
-        duration_td = timedelta(minutes=duration_minutes)
-        
-        # Calculate requested start and end times
-        requested_start = datetime.combine(date_obj, start_time)
-        requested_end = requested_start + duration_td
-        
-        # Get all non-cancelled bookings for the date
-        bookings = ConsultationBooking.objects.filter(
-            appointment_date=date_obj
-        ).exclude(status='cancelled')
-        
-        # Check for overlap with existing bookings
-        for booking in bookings:
-            booking_start = datetime.combine(date_obj, booking.appointment_time)
-            booking_duration = timedelta(minutes=int(booking.duration.replace('-min', '')))
-            booking_end = booking_start + booking_duration + timedelta(minutes=15)  # Add buffer
-            
-            # Check for time overlap
-            if (requested_start < booking_end and requested_end > booking_start):
-                return False  # Time slot is not available
+        from . import scheduling
         
-        return True  # Time slot is available
+        # SQL overlap test: a booking, hold or busy time conflicts when start < :end and
+        # (buffered) end > :start; available while some consultant has no conflict
+        return scheduling.is_time_available(date_obj, start_time, duration_minutes)
 
 '''# ══════════════════════════════════════════════════════════════════════════════
 #                              PAYMENT MODEL
@@ -0,0 +1,271 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EMAIL OUTBOX
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Booking emails are not sent inside the request. enqueue() stores them as
+# OutboxMessage rows in the caller's transaction, so a message exists exactly
+# when the change it reports was committed, and the request returns without
+# waiting for SMTP.
+#
+# The run_outbox worker claims due rows in batches and sends them over one
+# SMTP connection that stays open while there is mail to send. Claims are
+# conditional UPDATEs, so several workers never send the same row; a claim
+# left behind by a crashed worker is taken over after CLAIM_TIMEOUT.
+#
+# Failures are classified:
+#   - permanent (5xx replies, refused recipients): dead-lettered at once
+#   - transient (4xx replies, other errors): retried after an exponential,
+#     jittered delay; dead-lettered after MAX_ATTEMPTS
+#   - outage (cannot connect, disconnected, login refused): the message is
+#     retried like a transient failure, the rest of the batch is released
+#     untried, and the worker itself backs off. After an outage the backlog
+#     drains one batch at a time instead of all at once.
+
+import os  # Worker identity
+import random  # Backoff jitter
+import smtplib  # SMTP error classes
+import socket  # Worker identity
+import threading  # Per-thread batch() buffers
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+BATCH_SIZE = 50  # Rows claimed per round trip
+CLAIM_TIMEOUT = timedelta(minutes=10)  # Claims older than this are taken over
+MAX_ATTEMPTS = 8  # Attempts before a message is dead-lettered
+BACKOFF_BASE = 30  # Seconds before the first retry
+BACKOFF_MAX = 60 * 60  # Longest delay between retries (seconds)
+
+# Errors meaning the mail server cannot be used at all right now
+OUTAGE_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, smtplib.SMTPAuthenticationError)
+
+
+_batch = threading.local()  # Rows collected by an open batch() block
+
+
+@contextmanager
+def batch():
+    """
+    Collect enqueue() calls and insert them with one bulk_create on exit.
+
+    Used by bulk admin actions, which queue hundreds of messages at once.
+    Yields the list of collected rows; nested blocks join the outer one.
+    """
+    from .models import OutboxMessage
+
+    if getattr(_batch, 'rows', None) is not None:
+        yield _batch.rows
+        return
+
+    _batch.rows = []
+    try:
+        yield _batch.rows
+        OutboxMessage.objects.bulk_create(_batch.rows, batch_size=500)
+    finally:
+        _batch.rows = None
+
+
+def enqueue(message, booking=None):
+    """
+    Store an EmailMessage for the outbox worker instead of sending it.
+
+    The row is written in a savepoint of the caller's transaction, so a
+    failed insert never breaks the booking change around it. Inside a
+    batch() block the row is only collected (and returned unsaved).
+
+    Args:
+        message: django.core.mail.EmailMessage (attachments are not supported)
+        booking: ConsultationBooking the email is about, if any
+
+    Returns:
+        OutboxMessage: The stored row
+    """
+    from .models import OutboxMessage
+
+    if message.attachments:
+        raise ValueError('Outbox messages cannot carry attachments')
+
+    row = OutboxMessage(
+        subject=message.subject[:255],
+        body=message.body,
+        content_subtype=message.content_subtype,
+        alternatives=[[content, mimetype] for content, mimetype in getattr(message, 'alternatives', [])],
+        from_email=message.from_email,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        booking=booking,
+    )
+    if getattr(_batch, 'rows', None) is not None:
+        _batch.rows.append(row)
+        return row
+
+    with transaction.atomic():
+        row.save()
+    return row
+
+
+def to_email_message(row, connection=None):
+    """Rebuild the email (with its alternative parts) a stored row describes."""
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        cc=row.cc,
+        bcc=row.bcc,
+        reply_to=row.reply_to,
+        headers=row.headers,
+        alternatives=[tuple(part) for part in row.alternatives],
+        connection=connection,
+    )
+    message.content_subtype = row.content_subtype
+    return message
+
+
+def backoff_delay(attempts, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """
+    Seconds to wait after ``attempts`` failed attempts.
+
+    Exponential with "equal jitter": half the delay is fixed, half random,
+    so messages that failed together do not all come back together.
+    """
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def classify_error(exc):
+    """'permanent', 'outage' or 'transient' for a failed send."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return 'permanent'
+    if isinstance(exc, OUTAGE_ERRORS):
+        return 'outage'
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 'permanent' if exc.smtp_code >= 500 else 'transient'
+    if isinstance(exc, OSError):
+        return 'outage'  # Socket errors: refused, reset, timed out
+    return 'transient'
+
+
+def worker_name():
+    """Identity stored on the rows a worker claims."""
+    return f'{socket.gethostname()}:{os.getpid()}'[:64]
+
+
+def claim_batch(worker, limit=BATCH_SIZE, now=None):
+    """
+    Claim up to ``limit`` due messages, longest waiting first.
+
+    Returns:
+        list: Claimed OutboxMessage rows
+    """
+    from .models import OutboxMessage
+
+    now = now or timezone.now()
+    claimable = Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', claimed_at__lt=now - CLAIM_TIMEOUT)
+    ids = list(OutboxMessage.objects.filter(claimable).order_by('next_attempt_at').values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+
+    # Only rows still claimable when the UPDATE runs are taken
+    OutboxMessage.objects.filter(claimable, pk__in=ids).update(status='sending', claimed_by=worker, claimed_at=now)
+    return list(OutboxMessage.objects.filter(pk__in=ids, status='sending', claimed_by=worker, claimed_at=now)
+                .order_by('next_attempt_at'))
+
+
+def record_failure(row, exc, now=None):
+    """
+    Schedule a retry for a failed row, or dead-letter it.
+
+    Returns:
+        str: The row's new status ('pending' or 'dead')
+    """
+    from .models import OutboxMessage
+
+    now = now or timezone.now()
+    attempts = row.attempts + 1
+    kind = classify_error(exc)
+    status = 'dead' if kind == 'permanent' or attempts >= MAX_ATTEMPTS else 'pending'
+    OutboxMessage.objects.filter(pk=row.pk).update(
+        status=status,
+        attempts=attempts,
+        last_error=f'{kind}: {type(exc).__name__}: {exc}'[:2000],
+        next_attempt_at=now + timedelta(seconds=backoff_delay(attempts)),
+        claimed_by='',
+    )
+    return status
+
+
+def release(rows):
+    """Hand claimed rows back untried (no attempt is counted)."""
+    from .models import OutboxMessage
+
+    OutboxMessage.objects.filter(pk__in=[row.pk for row in rows], status='sending').update(
+        status='pending', claimed_by='', claimed_at=None,
+    )
+
+
+def deliver(rows, connection):
+    """
+    Send claimed rows over one connection and record each outcome.
+
+    The connection is (re)opened as needed and left open for the next
+    batch; a failed send closes it, so the next message reconnects. An
+    outage stops the batch: the remaining rows are released untried.
+
+    Returns:
+        dict: Counts of 'sent', 'retrying', 'dead' and 'released', and
+        'outage' (True when the batch stopped on an outage)
+    """
+    from .models import OutboxMessage
+
+    result = {'sent': 0, 'retrying': 0, 'dead': 0, 'released': 0, 'outage': False}
+    for index, row in enumerate(rows):
+        try:
+            connection.open()  # No-op while the connection is already open
+            connection.send_messages([to_email_message(row, connection)])
+        except Exception as exc:
+            connection.close()
+            status = record_failure(row, exc)
+            result['dead' if status == 'dead' else 'retrying'] += 1
+            if classify_error(exc) == 'outage':
+                release(rows[index + 1:])
+                result['released'] = len(rows) - index - 1
+                result['outage'] = True
+                break
+            continue
+        OutboxMessage.objects.filter(pk=row.pk).update(
+            status='sent', attempts=row.attempts + 1, last_error='', sent_at=timezone.now(), claimed_by='',
+        )
+        result['sent'] += 1
+    return result
+
+
+def replay(queryset, now=None):
+    """
+    Put dead-lettered messages back in the queue with a fresh attempt budget.
+
+    A replay larger than one batch is spread over the first backoff
+    interval, so it is delivered in batches rather than at once.
+
+    Returns:
+        int: Number of messages replayed
+    """
+    now = now or timezone.now()
+    rows = list(queryset.filter(status='dead'))
+    spread = BACKOFF_BASE if len(rows) > BATCH_SIZE else 0
+    for row in rows:
+        row.status = 'pending'
+        row.attempts = 0
+        row.next_attempt_at = now + timedelta(seconds=random.uniform(0, spread))
+        row.claimed_by = ''
+        row.claimed_at = None
+    queryset.model.objects.bulk_update(rows, ['status', 'attempts', 'next_attempt_at', 'claimed_by', 'claimed_at'])
+    return len(rows)
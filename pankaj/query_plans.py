@@ -0,0 +1,82 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              QUERY PLAN CHECKS
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# The hot ConsultationBooking queries, run exactly the way the application
+# runs them, and their SQLite EXPLAIN QUERY PLAN output. The test suite
+# fails when any of them falls back to a full table scan; the
+# check_query_plans command prints the same plans.
+
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import scheduling
+
+
+def hot_queries():
+    """
+    (label, callable) pairs running the hot ConsultationBooking queries
+    exactly the way the application does.
+    """
+    from .models import ConsultationBooking
+
+    day = date.today() + timedelta(days=1)
+    month_start, month_end = scheduling.month_bounds(day.year, day.month)
+    five_minutes_ago = timezone.now() - timedelta(minutes=5)
+
+    return [
+        ('day busy intervals', lambda: scheduling.load_busy_intervals(day)),
+        ('month busy intervals', lambda: scheduling.load_busy_intervals_range(month_start, month_end)),
+        ('dates busy intervals', lambda: scheduling.load_busy_intervals_for([day, day + timedelta(days=7)])),
+        ('SQL overlap test', lambda: scheduling.has_conflict(day, 10 * 60, 45)),
+        ('least-loaded consultant', lambda: scheduling.pick_consultant(day, 10 * 60, 45)),
+        ('duplicate submission check', lambda: ConsultationBooking.objects.filter(
+            email='client@example.com',
+            appointment_date=day,
+            appointment_time=time(10, 0),
+            created_at__gte=five_minutes_ago,
+        ).first()),
+        *[
+            (f'status count ({status})', lambda status=status: ConsultationBooking.objects.filter(status=status).count())
+            for status, _ in ConsultationBooking.STATUS_CHOICES
+        ],
+        ('admin list (newest first)', lambda: list(ConsultationBooking.objects.all().order_by('-created_at')[:25])),
+        ('admin list by status', lambda: list(
+            ConsultationBooking.objects.filter(status='pending').order_by('-created_at')[:25]
+        )),
+    ]
+
+
+def query_plans():
+    """
+    EXPLAIN QUERY PLAN every ConsultationBooking statement of the hot queries
+    (SQLite only).
+
+    Returns:
+        list: (label, plan details, full-scan details) per statement
+    """
+    from .models import ConsultationBooking
+
+    table = ConsultationBooking._meta.db_table
+    plans = []
+    for label, run in hot_queries():
+        with CaptureQueriesContext(connection) as captured:
+            run()
+
+        for query in captured.captured_queries:
+            if table not in query['sql']:
+                continue  # Holds and other tables are not under test here
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                details = [row[-1] for row in cursor.fetchall()]
+
+            # "SCAN <table>" without an index is a full table scan
+            full_scans = [
+                detail for detail in details
+                if detail.startswith(f'SCAN {table}') and 'INDEX' not in detail
+            ]
+            plans.append((label, details, full_scans))
+    return plans
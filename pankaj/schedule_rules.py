@@ -0,0 +1,299 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              SCHEDULE RULES
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Working hours and start grids, compiled from the active AvailableSlot rows.
+#
+# Every active row offers one start time for one duration on one weekday.
+# The rows are compiled once into per-weekday minute bitmaps:
+#   - window: every minute covered by some row (the day's working hours)
+#   - starts: per duration, the minutes an appointment of that length may
+#     start at (only where the whole appointment fits inside the window)
+# Durations without rows of their own may start every SLOT_STEP minutes
+# wherever they fit. With no active rows at all, every day falls back to
+# scheduling.WORKDAY_START - WORKDAY_END.
+#
+# Active BlackoutPeriod rows are compiled alongside: fully closed dates into
+# a set (plus a (month, day) set for yearly closures), partial closures into
+# per-date bitmaps of blocked minutes. A closed date is answered with one
+# set lookup, before any slot computation.
+#
+# The active consultants are part of the rules too: their IDs fix the lane
+# order of the packed per-consultant bitmaps built by scheduling.
+#
+# The compiled rules live in process memory. Saving or deleting an
+# AvailableSlot, BlackoutPeriod or Consultant rotates a version stored in
+# the shared cache; each process notices the new version within
+# RULES_CHECK_SECONDS and recompiles, and the process that made the change
+# also rebuilds the stored day summaries.
+
+import threading  # Guards recompilation
+import time  # Version check throttle
+import uuid  # Rules versions
+from datetime import date, timedelta  # Summaries from today on, blackout ranges
+
+from django.core.cache import cache  # Cross-process rules version
+from django.db import transaction  # Rebuild once per commit
+
+from . import scheduling
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+VERSION_KEY = 'schedule-rules:version'
+RULES_CHECK_SECONDS = 5  # How long a process trusts its compiled rules without checking
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              COMPILED RULES
+# ══════════════════════════════════════════════════════════════════════════════
+
+class Blackouts:
+    """Closed dates as sets and partially blocked dates as minute bitmaps."""
+
+    def __init__(self, closed=(), closed_yearly=(), blocked=None, blocked_yearly=None):
+        self.closed = frozenset(closed)  # Fully closed dates
+        self.closed_yearly = frozenset(closed_yearly)  # Fully closed (month, day) pairs
+        self.blocked = blocked or {}  # Date -> blocked minutes bitmap
+        self.blocked_yearly = blocked_yearly or {}  # (month, day) -> blocked minutes bitmap
+
+    def is_closed(self, day):
+        """True when the whole date is closed."""
+        return day in self.closed or (day.month, day.day) in self.closed_yearly
+
+    def blocked_mask(self, day):
+        """Minutes blocked by partial closures on a date."""
+        return self.blocked.get(day, 0) | self.blocked_yearly.get((day.month, day.day), 0)
+
+
+class ScheduleRules:
+    """Per-weekday working-hour windows and start grids as minute bitmaps."""
+
+    def __init__(self, windows, grids, blackouts=None, consultants=()):
+        self.windows = windows  # Weekday -> window bitmap
+        self.grids = grids  # Weekday -> {duration minutes: start bitmap}
+        self.blackouts = blackouts or Blackouts()
+        self.consultants = tuple(consultants)  # Active consultant IDs in lane order
+
+    def is_closed(self, day):
+        """True when nothing can be booked on a date (blackout or no working hours)."""
+        return self.blackouts.is_closed(day) or not self.windows[day.weekday()]
+
+    def window(self, day):
+        """Working minutes on a date, blackouts removed."""
+        if self.blackouts.is_closed(day):
+            return 0
+        return self.windows[day.weekday()] & ~self.blackouts.blocked_mask(day)
+
+    def start_mask(self, day, duration_minutes):
+        """
+        Minutes an appointment of the given length may start at on a date.
+
+        Durations without explicit rows get a SLOT_STEP grid over the window;
+        the weekday result is memoized alongside the compiled grids, and
+        partial blackouts are cut out per date.
+        """
+        if self.blackouts.is_closed(day):
+            return 0
+        grids = self.grids[day.weekday()]
+        mask = grids.get(duration_minutes)
+        if mask is None:
+            window = self.windows[day.weekday()]
+            mask = grids[duration_minutes] = (
+                scheduling.erode(window, duration_minutes) & _step_grid(window)
+            )
+        blocked = self.blackouts.blocked_mask(day)
+        if blocked:
+            mask &= scheduling.erode(~blocked, duration_minutes)
+        return mask
+
+    def hours(self, day):
+        """(opening minute, closing minute) of a date, or None when closed."""
+        window = self.window(day)
+        if not window:
+            return None
+        return (window & -window).bit_length() - 1, window.bit_length()
+
+    def hours_label(self, day):
+        """Working hours as 'H:MM - H:MM' (or 'Closed')."""
+        hours = self.hours(day)
+        if hours is None:
+            return 'Closed'
+        return ' - '.join(f"{minute // 60}:{minute % 60:02d}" for minute in hours)
+
+
+def _step_grid(window):
+    """SLOT_STEP grid anchored at the start of each run of working minutes."""
+    mask = 0
+    for start, end in scheduling.mask_to_intervals(window):
+        mask |= scheduling.grid_mask(start, end - 1)
+    return mask
+
+
+def compile_rules(rows, blackouts=None, consultants=()):
+    """
+    Compile AvailableSlot rows into ScheduleRules.
+
+    Args:
+        rows: Iterable of (day, start_time, end_time, duration) tuples from
+            active AvailableSlot rows
+        blackouts: Compiled Blackouts applied on top of the weekday rules
+        consultants: Active consultant IDs, one bitmap lane each
+
+    Returns:
+        ScheduleRules: Compiled rules (the 9-17 default when rows is empty)
+    """
+    windows = [0] * 7
+    starts = [{} for _ in range(7)]
+
+    for day, start_time, end_time, duration in rows:
+        if day not in WEEKDAYS:
+            continue
+        weekday = WEEKDAYS.index(day)
+        start = scheduling.to_minutes(start_time)
+        end = scheduling.end_to_minutes(end_time)
+        if end <= start:
+            continue  # Malformed row: offers nothing
+        windows[weekday] |= scheduling.interval_mask(start, end)
+        duration_minutes = scheduling.parse_duration(duration)
+        starts[weekday][duration_minutes] = starts[weekday].get(duration_minutes, 0) | 1 << start
+
+    if not any(windows):
+        default = scheduling.interval_mask(scheduling.WORKDAY_START, scheduling.WORKDAY_END)
+        return ScheduleRules([default] * 7, [{} for _ in range(7)], blackouts, consultants)
+
+    # A start only counts if its whole appointment fits inside the window
+    grids = [
+        {minutes: mask & scheduling.erode(windows[weekday], minutes) for minutes, mask in starts[weekday].items()}
+        for weekday in range(7)
+    ]
+    return ScheduleRules(windows, grids, blackouts, consultants)
+
+
+def compile_blackouts(rows):
+    """
+    Compile BlackoutPeriod rows into Blackouts.
+
+    Args:
+        rows: Iterable of (start_date, end_date, start_time, end_time,
+            repeats_yearly) tuples from active BlackoutPeriod rows
+
+    Returns:
+        Blackouts: Closed-date sets and blocked-minute bitmaps
+    """
+    closed, closed_yearly = set(), set()
+    blocked, blocked_yearly = {}, {}
+
+    for start_date, end_date, start_time, end_time, repeats_yearly in rows:
+        end_date = max(end_date or start_date, start_date)
+        if repeats_yearly:
+            # A yearly range never needs more than one year of (month, day) keys
+            end_date = min(end_date, start_date + timedelta(days=365))
+        mask = None
+        if start_time is not None and end_time is not None:
+            mask = scheduling.interval_mask(scheduling.to_minutes(start_time), scheduling.end_to_minutes(end_time))
+
+        day = start_date
+        while day <= end_date:
+            key = (day.month, day.day) if repeats_yearly else day
+            if mask is None:
+                (closed_yearly if repeats_yearly else closed).add(key)
+            else:
+                target = blocked_yearly if repeats_yearly else blocked
+                target[key] = target.get(key, 0) | mask
+            day += timedelta(days=1)
+
+    return Blackouts(closed, closed_yearly, blocked, blocked_yearly)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              PROCESS CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+_lock = threading.Lock()
+_compiled = None  # (version, ScheduleRules)
+_checked_at = 0.0
+_pending = threading.local()  # Token of the rebuild awaiting this thread's commit
+
+
+def load_rules():
+    """Compile the rules from the database."""
+    from .models import AvailableSlot, BlackoutPeriod, Consultant
+
+    blackouts = compile_blackouts(
+        BlackoutPeriod.objects.filter(is_active=True).order_by()
+        .values_list('start_date', 'end_date', 'start_time', 'end_time', 'repeats_yearly')
+    )
+    return compile_rules(
+        AvailableSlot.objects.filter(is_active=True).order_by()
+        .values_list('day', 'start_time', 'end_time', 'duration'),
+        blackouts,
+        Consultant.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True),
+    )
+
+
+def get_rules():
+    """
+    The compiled rules for this process.
+
+    Recompiles on first use and whenever the shared version has moved on;
+    the version is checked at most once every RULES_CHECK_SECONDS.
+    """
+    global _compiled, _checked_at
+
+    compiled = _compiled
+    now = time.monotonic()
+    if compiled is not None and now - _checked_at < RULES_CHECK_SECONDS:
+        return compiled[1]
+
+    version = cache.get_or_set(VERSION_KEY, lambda: uuid.uuid4().hex, None)
+    if compiled is None or compiled[0] != version:
+        with _lock:
+            if _compiled is None or _compiled[0] != version:
+                _compiled = (version, load_rules())
+            compiled = _compiled
+    _checked_at = now
+    return compiled[1]
+
+
+def rules_changed():
+    """
+    Recompile after AvailableSlot, BlackoutPeriod or Consultant rows changed
+    and rebuild the stored summaries.
+
+    Every summary from today on is rebuilt under the new windows, which also
+    evicts the cached API responses for those dates and their months.
+    """
+    global _compiled
+
+    from .models import DayAvailability
+
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _compiled = None
+
+    dates = DayAvailability.objects.filter(date__gte=date.today()).values_list('date', flat=True)
+    scheduling.availability_changed(list(dates))
+
+
+def rules_changed_on_commit():
+    """
+    Schedule rules_changed() for when the current transaction commits.
+
+    Runs at most once per commit, so saving or deleting many AvailableSlot
+    rows in one transaction rebuilds the summaries once. Every call registers
+    a callback holding the thread's pending token; the first to run clears the
+    token and rebuilds, the rest find it gone and return. A rolled back
+    transaction discards its callbacks, and its token is reused (and cleared)
+    by the next commit on the thread.
+    """
+    token = getattr(_pending, 'token', None)
+    if token is None:
+        token = _pending.token = object()
+
+    def run():
+        if getattr(_pending, 'token', None) is not token:
+            return  # Already rebuilt by an earlier callback of this commit
+        _pending.token = None
+        rules_changed()
+
+    transaction.on_commit(run)
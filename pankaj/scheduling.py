@@ -0,0 +1,1183 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              SCHEDULING ENGINE
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Interval-based availability for consultation bookings.
+#
+# A day's non-cancelled bookings are loaded once and turned into a sorted,
+# merged list of busy intervals (in minutes since midnight, buffer included).
+# Those intervals become minute-resolution bitmaps: a Python int with one
+# bit per minute, where a free start exists wherever the free bits survive
+# an erosion by the requested duration. One query loads every booking in a
+# range, so month-level checks cost the same per date as day-level ones.
+#
+# Those bitmaps are materialized per date in DayAvailability and refreshed
+# from booking signals, so the availability APIs read one row per date.
+#
+# Active SlotHold rows count as busy exactly like bookings. A summary that
+# includes holds remembers the earliest hold expiry; the first read after
+# that moment sweeps the date's expired holds and rebuilds the row.
+#
+# Working hours and start grids are not fixed: schedule_rules compiles the
+# active AvailableSlot rows into per-weekday bitmaps, and free starts are
+# the busy-free minutes eroded by the duration ANDed with that grid.
+#
+# Bookings belong to consultants. A day's free bitmap packs one lane per
+# active consultant into a single int, so one erosion covers every
+# consultant at once and a log2(consultants) OR-fold answers "at least one
+# consultant is free" without looping over consultants or bookings.
+#
+# Busy times imported from consultants' own calendars (ExternalBusy rows,
+# see ics_import.py) are read alongside bookings and holds and block the
+# same way, without a buffer.
+
+from collections import defaultdict  # Grouping bookings by date
+from datetime import date, datetime, time, timedelta  # Date/time manipulation
+
+from django.conf import settings  # Access Django settings
+from django.db import transaction  # Atomic reservations
+from django.db.models import Min  # Earliest hold expiry per date
+from django.utils import timezone  # Lock-row timestamps and hold expiry
+
+# ─── Working Hours & Grid Configuration ───────────────────────────────────────
+WORKDAY_START = 9 * 60  # 9:00 AM; default opening when no AvailableSlot rules exist
+WORKDAY_END = 17 * 60  # 5:00 PM; default closing when no AvailableSlot rules exist
+SLOT_STEP = 15  # Start grid for durations without AvailableSlot rows of their own
+BOOKING_BUFFER = getattr(settings, 'BOOKING_BUFFER_MINUTES', 15)  # Gap kept free after every booking
+LEAD_MINUTES = getattr(settings, 'BOOKING_LEAD_MINUTES', 0)  # Minimum notice before a start
+DEFAULT_DURATION = 45  # Fallback duration in minutes
+HOLD_MINUTES = getattr(settings, 'SLOT_HOLD_MINUTES', 10)  # Lifetime of a slot hold
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              CONVERSION HELPERS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def parse_duration(value, default=DEFAULT_DURATION):
+    """
+    Convert a duration value ('45-min', '45', 45) to integer minutes.
+
+    Args:
+        value: Duration as stored on bookings or passed in query strings
+        default: Minutes to return when the value cannot be parsed
+
+    Returns:
+        int: Duration in minutes
+    """
+    try:
+        minutes = int(str(value).replace('-min', ''))
+    except (TypeError, ValueError):
+        return default
+    return minutes if minutes > 0 else default
+
+
+def parse_durations(value, default=DEFAULT_DURATION):
+    """
+    Convert a comma-separated duration list ('30,45,60') to integer minutes.
+
+    Args:
+        value: Duration list as passed in query strings
+        default: Minutes used for entries that cannot be parsed
+
+    Returns:
+        list: Distinct durations in the order given (at least one)
+    """
+    durations = []
+    for part in str(value or '').split(','):
+        minutes = parse_duration(part.strip(), default)
+        if minutes not in durations:
+            durations.append(minutes)
+    return durations or [default]
+
+
+def to_minutes(t):
+    """Convert a time object to minutes since midnight."""
+    return t.hour * 60 + t.minute
+
+
+def to_time(minutes):
+    """Convert minutes since midnight to a time object."""
+    return time(minutes // 60, minutes % 60)
+
+
+def end_time_for(start_time, duration_minutes, buffer=0):
+    """
+    End of [start, start + duration + buffer) as a time object.
+
+    Ends past midnight are clamped to time.max so they still sort after
+    every start on the same date.
+    """
+    minutes = to_minutes(start_time) + duration_minutes + buffer
+    return time.max if minutes >= 24 * 60 else to_time(minutes)
+
+
+def end_to_minutes(t):
+    """Convert a stored end time to minutes since midnight (time.max -> 1440)."""
+    return 24 * 60 if t == time.max else to_minutes(t)
+
+
+def as_dates(values):
+    """Sorted, de-duplicated date objects from dates or 'YYYY-MM-DD' strings."""
+    from django.db.models import DateField
+
+    return sorted({DateField().to_python(value) for value in values})
+
+
+def booking_horizon(now=None):
+    """Earliest bookable moment: the current naive datetime plus the lead time."""
+    return (now or datetime.now()) + timedelta(minutes=LEAD_MINUTES)
+
+
+def earliest_start_for(date_obj, now=None):
+    """
+    First start minute that respects the lead time on the given date.
+
+    Args:
+        date_obj: Date being scheduled
+        now: Current naive datetime (defaults to datetime.now())
+
+    Returns:
+        int or None: Minute of day for the horizon date, 0 for later dates,
+        None for dates that are already out of reach
+    """
+    now = booking_horizon(now)
+    if date_obj > now.date():
+        return 0
+    if date_obj < now.date():
+        return None
+    # Any start earlier than the current time (seconds included) is past
+    minute = now.hour * 60 + now.minute
+    if now.second or now.microsecond:
+        minute += 1
+    return minute
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              BUSY INTERVALS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def merge_intervals(raw):
+    """
+    Sort and merge (start, end) minute intervals.
+
+    Overlapping or touching intervals are merged so later lookups can stop
+    at the first hit.
+
+    Args:
+        raw: Iterable of (start, end) tuples in minutes
+
+    Returns:
+        list: Sorted, non-overlapping (start, end) tuples in minutes
+    """
+    merged = []
+    for start, end in sorted(raw):
+        if merged and start <= merged[-1][1]:
+            # Extends the previous interval
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def stored_intervals(rows):
+    """Merged busy intervals from stored (start time, buffered end time) rows."""
+    return merge_intervals((to_minutes(start), end_to_minutes(end)) for start, end in rows)
+
+
+def load_busy_intervals(date_obj, exclude_hold=None):
+    """
+    Load a day's bookings, holds and external busy times once and return
+    its busy intervals.
+
+    Args:
+        date_obj: Date to load
+        exclude_hold: Hold ID to leave out (the caller's own hold)
+
+    Returns:
+        dict: Consultant ID (None for unassigned) -> merged busy intervals
+    """
+    from .models import ConsultationBooking, ExternalBusy, SlotHold
+
+    holds = SlotHold.objects.filter(date=date_obj)
+    if exclude_hold is not None:
+        holds = holds.exclude(pk=exclude_hold)
+    return _group_busy_intervals(
+        ConsultationBooking.objects.filter(appointment_date=date_obj),
+        holds,
+        ExternalBusy.objects.filter(date=date_obj),
+    ).get(date_obj, {})
+
+
+def load_busy_intervals_range(start_date, end_date):
+    """
+    Load busy intervals for every date in [start_date, end_date).
+
+    One bookings, one holds and one external busy query cover the whole range.
+
+    Args:
+        start_date: First date (inclusive)
+        end_date: Last date (exclusive)
+
+    Returns:
+        dict: Date -> {consultant ID: merged busy intervals} (dates without
+        bookings or holds omitted)
+    """
+    from .models import ConsultationBooking, ExternalBusy, SlotHold
+
+    return _group_busy_intervals(
+        ConsultationBooking.objects.filter(appointment_date__gte=start_date, appointment_date__lt=end_date),
+        SlotHold.objects.filter(date__gte=start_date, date__lt=end_date),
+        ExternalBusy.objects.filter(date__gte=start_date, date__lt=end_date),
+    )
+
+
+def load_busy_intervals_for(dates):
+    """Load busy intervals for an arbitrary set of dates (one query per source)."""
+    from .models import ConsultationBooking, ExternalBusy, SlotHold
+
+    dates = list(dates)
+    return _group_busy_intervals(
+        ConsultationBooking.objects.filter(appointment_date__in=dates),
+        SlotHold.objects.filter(date__in=dates),
+        ExternalBusy.objects.filter(date__in=dates),
+    )
+
+
+def _group_busy_intervals(bookings, holds, external):
+    """
+    Group active bookings, holds and external busy times into merged busy
+    intervals per date and consultant.
+    """
+    rows = list(
+        bookings.exclude(status='cancelled').order_by()  # Grouped below; no ORDER BY needed
+        .values_list('appointment_date', 'consultant_id', 'appointment_time', 'appointment_end')
+    )
+    rows += holds.filter(expires_at__gt=timezone.now()).order_by().values_list(
+        'date', 'consultant_id', 'start_time', 'end_time'
+    )
+    rows += external.filter(calendar__is_active=True).order_by().values_list(
+        'date', 'consultant_id', 'start_time', 'end_time'
+    )
+
+    # Group intervals by date and consultant in a single pass over the result set
+    by_date = defaultdict(lambda: defaultdict(list))
+    for day, consultant, start, end in rows:
+        by_date[day][consultant].append((start, end))
+
+    return {
+        day: {consultant: stored_intervals(intervals) for consultant, intervals in lanes.items()}
+        for day, lanes in by_date.items()
+    }
+
+
+def free_consultants(date_obj, start_minute, duration_minutes, exclude_hold=None):
+    """
+    Active consultants with nothing overlapping a requested time, in SQL.
+
+    A booking, active hold or external busy time overlaps when
+    ``start < requested end`` and ``(buffered) end > requested start``;
+    unassigned ones block everybody.
+
+    Args:
+        date_obj: Date to check
+        start_minute: Requested start in minutes since midnight
+        duration_minutes: Requested length in minutes
+        exclude_hold: Hold ID to ignore (the caller's own hold)
+
+    Returns:
+        QuerySet: Free Consultant rows
+    """
+    from django.db.models import Exists, OuterRef, Q
+
+    from .models import Consultant, ConsultationBooking, ExternalBusy, SlotHold
+
+    start = to_time(start_minute)
+    end = end_time_for(start, duration_minutes)
+    owner = Q(consultant=OuterRef('pk')) | Q(consultant__isnull=True)
+
+    bookings = ConsultationBooking.objects.filter(
+        owner, appointment_date=date_obj, appointment_time__lt=end, appointment_end__gt=start
+    ).exclude(status='cancelled')
+    holds = SlotHold.objects.filter(
+        owner, date=date_obj, expires_at__gt=timezone.now(), start_time__lt=end, end_time__gt=start
+    )
+    if exclude_hold is not None:
+        holds = holds.exclude(pk=exclude_hold)
+    external = ExternalBusy.objects.filter(
+        owner, date=date_obj, calendar__is_active=True, start_time__lt=end, end_time__gt=start
+    )
+
+    return (
+        Consultant.objects.filter(is_active=True)
+        .exclude(Exists(bookings)).exclude(Exists(holds)).exclude(Exists(external))
+    )
+
+
+def pick_consultant(date_obj, start_minute, duration_minutes, exclude_hold=None, prefer=None):
+    """
+    Least-loaded free consultant for a requested time.
+
+    Load is the consultant's number of active bookings that day; ties go to
+    the longest-serving consultant.
+
+    Args:
+        date_obj: Date to book
+        start_minute: Requested start in minutes since midnight
+        duration_minutes: Requested length in minutes
+        exclude_hold: Hold ID to ignore (the caller's own hold)
+        prefer: Consultant ID to choose whenever it is free (the held one)
+
+    Returns:
+        Consultant or None: None when every consultant is busy
+    """
+    from django.db.models import Case, F, Func, IntegerField, OuterRef, Subquery, Value, When
+
+    from .models import ConsultationBooking
+
+    # Correlated count over that day's active bookings only. Comparing
+    # consultant_id + 0 keeps the planner off the consultant_id index (whose
+    # cost grows with each consultant's booking history) and on the partial
+    # active-day index, which also covers consultant_id.
+    day_load = (
+        ConsultationBooking.objects.filter(appointment_date=date_obj)
+        .exclude(status='cancelled')
+        .alias(owner=F('consultant_id') + 0).filter(owner=OuterRef('pk'))
+        .order_by().values(count=Func('pk', function='COUNT'))  # One row, no GROUP BY
+    )
+    return (
+        free_consultants(date_obj, start_minute, duration_minutes, exclude_hold)
+        .annotate(
+            preferred=Case(When(pk=prefer, then=Value(0)), default=Value(1), output_field=IntegerField()),
+            day_load=Subquery(day_load, output_field=IntegerField()),
+        )
+        .order_by('preferred', 'day_load', 'pk')
+        .first()
+    )
+
+
+def has_conflict(date_obj, start_minute, duration_minutes, exclude_hold=None):
+    """
+    True when no consultant is free for the requested time (SQL overlap test).
+
+    Args:
+        date_obj: Date to check
+        start_minute: Requested start in minutes since midnight
+        duration_minutes: Requested length in minutes
+        exclude_hold: Hold ID to ignore (the caller's own hold)
+
+    Returns:
+        bool: True if every consultant has something overlapping the request
+    """
+    return not free_consultants(date_obj, start_minute, duration_minutes, exclude_hold).exists()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              MINUTE BITMAPS
+# ══════════════════════════════════════════════════════════════════════════════
+# Bit ``m`` of a mask stands for minute ``m`` of the day (0-1439).
+
+def interval_mask(start_minute, end_minute):
+    """Bitmap with every minute in [start, end) set."""
+    if end_minute <= start_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+def busy_mask(busy):
+    """Bitmap of every busy minute for a list of busy intervals."""
+    mask = 0
+    for start, end in busy:
+        mask |= interval_mask(start, end)
+    return mask
+
+
+def grid_mask(first_minute, last_minute, step=SLOT_STEP):
+    """Bitmap with a bit on every ``step`` minutes from first to last (inclusive)."""
+    mask = 0
+    for minute in range(first_minute, last_minute + 1, step):
+        mask |= 1 << minute
+    return mask
+
+
+def erode(mask, length):
+    """
+    Keep only bits that start a run of at least ``length`` set bits.
+
+    Uses log2(length) shift-and steps, so the cost does not depend on how
+    many bookings produced the mask.
+    """
+    covered = 1
+    while covered < length:
+        shift = min(covered, length - covered)
+        mask &= mask >> shift
+        covered += shift
+    return mask
+
+
+def erode_many(mask, lengths):
+    """
+    erode() for several lengths in one pass.
+
+    The lengths are processed in ascending order and each one continues the
+    shift-and steps of the previous, so 30, 45 and 60 minutes together cost
+    about as much as eroding for 60 alone.
+
+    Returns:
+        dict: Length -> eroded mask
+    """
+    eroded = {}
+    covered = 1  # Every set bit starts a run of at least ``covered`` bits
+    for length in sorted(set(lengths)):
+        while covered < length:
+            shift = min(covered, length - covered)
+            mask &= mask >> shift
+            covered += shift
+        eroded[length] = mask
+    return eroded
+
+
+# ─── Consultant Lanes ─────────────────────────────────────────────────────────
+# Lane ``i`` of a packed bitmap holds consultant ``i``'s minutes at bits
+# [i * LANE_BITS, i * LANE_BITS + 1440). Bits 1440-1535 of every lane stay
+# clear, so erode() can never join runs of two neighbouring lanes.
+
+LANE_BITS = 1536  # 1440 minutes plus a clear guard, a multiple of 8
+
+
+def pack_lanes(masks):
+    """Pack per-consultant minute bitmaps into one int, one lane each."""
+    packed = 0
+    for lane, mask in enumerate(masks):
+        packed |= mask << (lane * LANE_BITS)
+    return packed
+
+
+def fold_lanes(packed):
+    """OR every lane of a packed bitmap into one minute bitmap in log2(lanes) steps."""
+    lanes = -(-packed.bit_length() // LANE_BITS)
+    while lanes > 1:
+        half = (lanes + 1) // 2
+        shift = half * LANE_BITS
+        packed = (packed & ((1 << shift) - 1)) | (packed >> shift)
+        lanes = half
+    return packed
+
+
+def consultant_free_mask(window, busy, consultants):
+    """
+    Packed free bitmap for a day: one lane per consultant.
+
+    Args:
+        window: Working minutes of the day
+        busy: Consultant ID (None for unassigned) -> merged busy intervals
+        consultants: Active consultant IDs, one lane each
+
+    Returns:
+        int: Packed bitmap of free working minutes
+    """
+    shared = window & ~busy_mask(busy.get(None, ()))  # Unassigned bookings block every lane
+    return pack_lanes(shared & ~busy_mask(busy.get(consultant, ())) for consultant in consultants)
+
+
+def mask_to_minutes(mask):
+    """List the minutes whose bits are set, in ascending order."""
+    minutes = []
+    while mask:
+        low = mask & -mask
+        minutes.append(low.bit_length() - 1)
+        mask ^= low
+    return minutes
+
+
+def mask_to_intervals(mask):
+    """Runs of set bits as [start, end) minute pairs, in ascending order."""
+    intervals = []
+    while mask:
+        start = (mask & -mask).bit_length() - 1
+        run = ~(mask >> start) & ((mask >> start) + 1)  # Lowest clear bit above the run
+        end = start + run.bit_length() - 1
+        intervals.append([start, end])
+        mask &= ~interval_mask(start, end)
+    return intervals
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              DAY-LEVEL API
+# ══════════════════════════════════════════════════════════════════════════════
+
+def bookable_starts(day, free_bits, duration_minutes, earliest=0):
+    """
+    Bitmap of start minutes offered on a date where some consultant is free
+    for the whole appointment.
+
+    Every consultant lane is eroded at once, then the lanes are OR-folded,
+    so the cost grows with log2(consultants), not with bookings.
+
+    Args:
+        day: Date being scheduled (selects the weekday's rules)
+        free_bits: Packed per-consultant free bitmap
+        duration_minutes: Requested appointment length
+        earliest: Starts before this minute are masked out
+
+    Returns:
+        int: Bitmap with one bit per bookable start minute
+    """
+    from .schedule_rules import get_rules
+
+    starts = fold_lanes(erode(free_bits, duration_minutes)) & get_rules().start_mask(day, duration_minutes)
+    return starts & ~interval_mask(0, earliest)
+
+
+def bookable_starts_many(day, free_bits, durations, earliest=0):
+    """
+    bookable_starts() for several durations from one erosion pass.
+
+    Args:
+        day: Date being scheduled (selects the weekday's rules)
+        free_bits: Packed per-consultant free bitmap
+        durations: Requested appointment lengths
+        earliest: Starts before this minute are masked out
+
+    Returns:
+        dict: Duration minutes -> bitmap of bookable start minutes
+    """
+    from .schedule_rules import get_rules
+
+    rules = get_rules()
+    past = ~interval_mask(0, earliest)
+    return {
+        minutes: fold_lanes(eroded) & rules.start_mask(day, minutes) & past
+        for minutes, eroded in erode_many(free_bits, durations).items()
+    }
+
+
+def starts_for_busy(day, busy, duration_minutes, earliest=0):
+    """Bookable start minutes on a date given its per-consultant busy intervals."""
+    from .schedule_rules import get_rules
+
+    rules = get_rules()
+    free_bits = consultant_free_mask(rules.window(day), busy, rules.consultants)
+    return mask_to_minutes(bookable_starts(day, free_bits, duration_minutes, earliest))
+
+
+def get_free_starts(date_obj, duration_minutes, now=None):
+    """
+    Free start minutes for a date, excluding times already in the past.
+
+    Args:
+        date_obj: Date to check
+        duration_minutes: Requested appointment length
+        now: Current naive datetime (defaults to datetime.now())
+
+    Returns:
+        list: Free start minutes in ascending order
+    """
+    earliest = earliest_start_for(date_obj, now)
+    if earliest is None:
+        return []
+    summary = get_day_summary(date_obj)
+    return mask_to_minutes(bookable_starts(date_obj, summary.free_mask, duration_minutes, earliest))
+
+
+def get_free_starts_many(date_obj, durations, now=None):
+    """
+    get_free_starts() for several durations from one summary read.
+
+    Returns:
+        dict: Duration minutes -> free start minutes in ascending order
+    """
+    earliest = earliest_start_for(date_obj, now)
+    if earliest is None:
+        return {minutes: [] for minutes in durations}
+    summary = get_day_summary(date_obj)
+    starts = bookable_starts_many(date_obj, summary.free_mask, durations, earliest)
+    return {minutes: mask_to_minutes(starts[minutes]) for minutes in durations}
+
+
+def is_time_available(date_obj, start_time, duration_minutes):
+    """
+    Check if a specific start time is free on a date.
+
+    Args:
+        date_obj: Date to check
+        start_time: Time object for the requested start
+        duration_minutes: Requested length in minutes
+
+    Returns:
+        bool: True if the time slot is available
+    """
+    return not has_conflict(date_obj, to_minutes(start_time), duration_minutes)
+
+
+def format_slot(date_obj, start_minute, duration_minutes):
+    """
+    Build start/end datetimes for a free start minute.
+
+    Returns:
+        tuple: (start datetime, end datetime)
+    """
+    start_dt = datetime.combine(date_obj, to_time(start_minute))
+    return start_dt, start_dt + timedelta(minutes=duration_minutes)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              MONTH-LEVEL API
+# ══════════════════════════════════════════════════════════════════════════════
+
+def month_availability(start_date, end_date, duration_minutes, today=None, durations=()):
+    """
+    Availability flag for every date in [start_date, end_date).
+
+    Closed dates (blackouts, days without working hours) are answered from
+    the compiled schedule rules with a set lookup; the others come from the
+    materialized DayAvailability rows (one range query), and dates without
+    a row yet are summarised from a single bookings query.
+
+    Args:
+        start_date: First date (inclusive)
+        end_date: Last date (exclusive)
+        duration_minutes: Requested appointment length
+        today: Reference date for past days (defaults to date.today())
+        durations: Further durations to flag per date (adds 'availability')
+
+    Returns:
+        list: One dict per date with date, day, has_availability, is_past
+        and is_closed
+    """
+    from .schedule_rules import get_rules
+
+    rules = get_rules()
+    today = today or date.today()
+    summaries = get_range_summaries(max(start_date, today), end_date) if end_date > today else {}
+
+    flagged = [duration_minutes, *(minutes for minutes in durations if minutes != duration_minutes)]
+    dates = []
+    current_date = start_date
+    while current_date < end_date:
+        is_past = current_date < today
+        is_closed = rules.is_closed(current_date)
+        availability = dict.fromkeys(flagged, False)
+        if not is_past and not is_closed:
+            summary = summaries[current_date]
+            availability = {minutes: summary.has_availability(minutes) for minutes in flagged}
+            unstored = [minutes for minutes, flag in availability.items() if flag is None]
+            if unstored:
+                # Non-standard durations: answer from the stored free bitmap
+                for minutes, starts in bookable_starts_many(current_date, summary.free_mask, unstored).items():
+                    availability[minutes] = starts != 0
+
+        row = {
+            'date': current_date.strftime('%Y-%m-%d'),
+            'day': current_date.day,
+            'has_availability': availability[duration_minutes],
+            'is_past': is_past,
+            'is_closed': is_closed
+        }
+        if durations:
+            row['availability'] = {str(minutes): flag for minutes, flag in availability.items()}
+        dates.append(row)
+        current_date += timedelta(days=1)
+
+    return dates
+
+
+def month_bounds(year, month):
+    """First day of the month and first day of the following month."""
+    start_date = date(year, month, 1)
+    end_date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start_date, end_date
+
+
+def calendar_month(year, month, duration_minutes, selected_date=None, now=None, slot_durations=()):
+    """
+    Month availability for every standard duration plus one day's free starts.
+
+    Everything is answered from a single DayAvailability range read, so the
+    calendar and its slot list cost one round trip and one query. Each date's
+    durations come from one erosion pass over its free bitmap.
+
+    Args:
+        year: Calendar year
+        month: Calendar month (1-12)
+        duration_minutes: Duration used for the slot list and has_availability
+        selected_date: Date whose slots are wanted (default: first available)
+        now: Current naive datetime (defaults to datetime.now())
+        slot_durations: Further durations to list slots_date's starts for
+
+    Returns:
+        dict: 'dates' (one dict per date), 'slots_date' (date or None),
+        'starts' (free start minutes on slots_date) and 'starts_by_duration'
+        (the same for duration_minutes and every slot duration)
+    """
+    from .schedule_rules import get_rules
+
+    rules = get_rules()
+    now = now or datetime.now()
+    today = now.date()
+    start_date, end_date = month_bounds(year, month)
+    summaries = get_range_summaries(max(start_date, today), end_date) if end_date > today else {}
+
+    durations = sorted(set(STANDARD_DURATIONS) | {duration_minutes})
+    slot_durations = [duration_minutes, *(minutes for minutes in slot_durations if minutes != duration_minutes)]
+    dates = []
+    auto_date, auto_starts = None, {}
+
+    current_date = start_date
+    while current_date < end_date:
+        is_past = current_date < today
+        is_closed = rules.is_closed(current_date)
+        availability = {minutes: False for minutes in durations}
+        if not is_past and not is_closed:
+            free_bits = summaries[current_date].free_mask
+            availability = {
+                minutes: starts != 0
+                for minutes, starts in bookable_starts_many(current_date, free_bits, durations).items()
+            }
+
+            # First date that still has a bookable start for the requested duration
+            if selected_date is None and auto_date is None and availability[duration_minutes]:
+                earliest = earliest_start_for(current_date, now)
+                starts = bookable_starts_many(current_date, free_bits, slot_durations, earliest)
+                if starts[duration_minutes]:
+                    auto_date = current_date
+                    auto_starts = {minutes: mask_to_minutes(starts[minutes]) for minutes in slot_durations}
+
+        dates.append({
+            'date': current_date.strftime('%Y-%m-%d'),
+            'day': current_date.day,
+            'has_availability': availability[duration_minutes],
+            'availability': {str(minutes): availability[minutes] for minutes in STANDARD_DURATIONS},
+            'is_past': is_past,
+            'is_closed': is_closed
+        })
+        current_date += timedelta(days=1)
+
+    if selected_date is None:
+        return {
+            'dates': dates,
+            'slots_date': auto_date,
+            'starts': auto_starts.get(duration_minutes, []),
+            'starts_by_duration': auto_starts,
+        }
+
+    # Requested date: reuse the month's summaries when it falls inside them
+    earliest = earliest_start_for(selected_date, now)
+    starts = {minutes: [] for minutes in slot_durations}
+    if earliest is not None and not rules.is_closed(selected_date):
+        summary = summaries.get(selected_date) or get_day_summary(selected_date)
+        starts = {
+            minutes: mask_to_minutes(mask)
+            for minutes, mask in bookable_starts_many(selected_date, summary.free_mask, slot_durations, earliest).items()
+        }
+    return {
+        'dates': dates,
+        'slots_date': selected_date,
+        'starts': starts[duration_minutes],
+        'starts_by_duration': starts,
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              NEXT AVAILABLE SEARCH
+# ══════════════════════════════════════════════════════════════════════════════
+
+SEARCH_CHUNK_DAYS = 31  # Dates read per summary range query
+
+
+def next_available(duration_minutes, count=5, days=90, now=None):
+    """
+    First ``count`` bookable starts from now on, searching ``days`` dates ahead.
+
+    Summaries are read one SEARCH_CHUNK_DAYS range query at a time (missing
+    rows come from one bookings query per chunk), closed dates are skipped
+    by set lookup, and the search stops as soon as the list is full.
+
+    Args:
+        duration_minutes: Requested appointment length
+        count: Number of starts wanted
+        days: Dates to search, starting with the booking-horizon date
+        now: Current naive datetime (defaults to datetime.now())
+
+    Returns:
+        list: (date, start minute) pairs in chronological order
+    """
+    now = now or datetime.now()
+    first = booking_horizon(now).date()
+    end = first + timedelta(days=days)
+
+    found = []
+    chunk_start = first
+    while chunk_start < end and len(found) < count:
+        chunk_end = min(chunk_start + timedelta(days=SEARCH_CHUNK_DAYS), end)
+        summaries = get_range_summaries(chunk_start, chunk_end)
+
+        day = chunk_start
+        while day < chunk_end and len(found) < count:
+            summary = summaries.get(day)
+            # Closed dates have no summary; a False stored flag rules the date out too
+            if summary is not None and summary.has_availability(duration_minutes) is not False:
+                starts = bookable_starts(day, summary.free_mask, duration_minutes, earliest_start_for(day, now))
+                found.extend((day, minute) for minute in mask_to_minutes(starts)[:count - len(found)])
+            day += timedelta(days=1)
+        chunk_start = chunk_end
+
+    return found
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              MATERIALIZED DAY SUMMARIES
+# ══════════════════════════════════════════════════════════════════════════════
+
+STANDARD_DURATIONS = (30, 45, 60)  # Durations with a stored has-availability flag
+MASK_BYTES = 180  # 1440 minutes / 8 bits (one lane without its guard)
+
+
+def build_day_summary(day, busy, hold_expires_at=None):
+    """
+    Build an (unsaved) DayAvailability row from a day's busy intervals.
+
+    Args:
+        day: Date being summarised
+        busy: Consultant ID -> merged busy intervals for that date
+        hold_expires_at: Earliest expiry among the holds in ``busy``, if any
+
+    Returns:
+        DayAvailability: Row with free bitmap and per-duration flags
+    """
+    from .models import DayAvailability
+    from .schedule_rules import get_rules
+
+    rules = get_rules()
+    free_bits = consultant_free_mask(rules.window(day), busy, rules.consultants)
+    flags = {
+        f'has_{minutes}_min': starts != 0
+        for minutes, starts in bookable_starts_many(day, free_bits, STANDARD_DURATIONS).items()
+    }
+    return DayAvailability(
+        date=day,
+        free_minutes=free_bits.to_bytes(max(MASK_BYTES, (free_bits.bit_length() + 7) // 8), 'little'),
+        hold_expires_at=hold_expires_at,
+        **flags
+    )
+
+
+def refresh_day_availability(dates):
+    """
+    Recompute and store the summaries for the given dates.
+
+    One bookings query covers every date; rows are written with a single
+    upsert so the call is cheap enough to run on every booking change.
+    Expired holds on these dates (and only these dates) are deleted first.
+
+    Args:
+        dates: Iterable of dates to refresh
+
+    Returns:
+        dict: Date -> refreshed DayAvailability
+    """
+    from .models import DayAvailability, SlotHold
+
+    dates = as_dates(dates)
+    if not dates:
+        return {}
+
+    # Lazy hold sweep, limited to the dates being rebuilt
+    SlotHold.objects.filter(date__in=dates, expires_at__lte=timezone.now()).delete()
+    hold_expiries = dict(
+        SlotHold.objects.filter(date__in=dates)
+        .values('date').annotate(first_expiry=Min('expires_at'))
+        .values_list('date', 'first_expiry')
+    )
+
+    busy_by_date = load_busy_intervals_for(dates)
+    rows = [build_day_summary(day, busy_by_date.get(day, {}), hold_expiries.get(day)) for day in dates]
+    DayAvailability.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=['free_minutes', 'has_30_min', 'has_45_min', 'has_60_min', 'hold_expires_at', 'updated_at'],
+    )
+    return {row.date: row for row in rows}
+
+
+def get_day_summary(day):
+    """Fetch a date's summary by primary key, building it on first use."""
+    from .models import DayAvailability
+
+    summary = DayAvailability.objects.filter(pk=day).first()
+    if summary is None:
+        summary = refresh_day_availability([day])[day]
+    elif summary.is_stale():
+        summary = availability_changed([day])[day]  # A hold expired: sweep and rebuild
+    return summary
+
+
+def get_range_summaries(start_date, end_date):
+    """
+    Fetch summaries for every date in [start_date, end_date).
+
+    Returns:
+        dict: Date -> DayAvailability (missing rows are built and stored,
+        rows with an expired hold are rebuilt; closed dates without a row
+        are left out)
+    """
+    from .models import DayAvailability
+    from .schedule_rules import get_rules
+
+    rules = get_rules()
+    summaries = {
+        row.date: row
+        for row in DayAvailability.objects.filter(date__gte=start_date, date__lt=end_date)
+    }
+
+    missing = []
+    current_date = start_date
+    while current_date < end_date:
+        if current_date not in summaries and not rules.is_closed(current_date):
+            missing.append(current_date)
+        current_date += timedelta(days=1)
+
+    summaries.update(refresh_day_availability(missing))
+
+    stale = [day for day, row in summaries.items() if row.is_stale()]
+    if stale:
+        summaries.update(availability_changed(stale))
+    return summaries
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              RESERVATIONS
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# A booking is only created inside a transaction that first writes the date's
+# DayAvailability row. That write is the per-date lock: on PostgreSQL it
+# row-locks just that date, on SQLite it takes the database write lock. A
+# second submission for the same date waits at the lock, then re-validates
+# against the committed booking; submissions for other dates never wait on
+# each other (PostgreSQL).
+
+def lock_date(day):
+    """Take the per-date reservation lock (creating the summary row if needed)."""
+    from .models import DayAvailability
+
+    if not DayAvailability.objects.filter(pk=day).update(updated_at=timezone.now()):
+        refresh_day_availability([day])  # First write for this date: the upsert takes the lock
+
+
+def nearest_starts(day, busy, start_minute, duration_minutes, earliest=0, limit=3):
+    """
+    Free starts closest to a requested start, nearest first.
+
+    Args:
+        day: Date being scheduled
+        busy: Consultant ID -> merged busy intervals for the date
+        start_minute: Requested start in minutes since midnight
+        duration_minutes: Requested length in minutes
+        earliest: First start that may be offered
+        limit: Maximum number of alternatives
+
+    Returns:
+        list: Up to ``limit`` free start minutes
+    """
+    starts = starts_for_busy(day, busy, duration_minutes, earliest)
+    return sorted(starts, key=lambda minute: (abs(minute - start_minute), minute))[:limit]
+
+
+def _is_offered(day, start_minute, duration_minutes, earliest):
+    """Start-grid, working-hours and lead-time checks for one request."""
+    from .schedule_rules import get_rules
+
+    offered = get_rules().start_mask(day, duration_minutes) >> start_minute & 1
+    return bool(offered) and start_minute >= earliest
+
+
+def reserve_booking(day, start_time, duration_minutes, now=None, hold_id=None, **fields):
+    """
+    Atomically re-check a slot and create the booking if it is still free.
+
+    Args:
+        day: Appointment date
+        start_time: Appointment start (time object)
+        duration_minutes: Appointment length in minutes
+        now: Current naive datetime (defaults to datetime.now())
+        hold_id: The client's own slot hold, ignored when checking and
+            consumed on success
+        **fields: Remaining ConsultationBooking fields
+
+    Returns:
+        tuple: (booking, []) on success, or (None, alternatives) where
+        alternatives are the nearest free start minutes that day
+    """
+    from .models import ConsultationBooking, SlotHold
+
+    start_minute = to_minutes(start_time)
+    earliest = earliest_start_for(day, now)
+    if earliest is None:
+        return None, []  # The date is already over
+
+    with transaction.atomic():
+        lock_date(day)
+
+        # Reads after the lock see every committed booking; the held
+        # consultant keeps the booking whenever they are still free
+        consultant = None
+        if _is_offered(day, start_minute, duration_minutes, earliest):
+            held = None
+            if hold_id is not None:
+                held = SlotHold.objects.filter(pk=hold_id).values_list('consultant', flat=True).first()
+            consultant = pick_consultant(day, start_minute, duration_minutes, exclude_hold=hold_id, prefer=held)
+        if consultant is None:
+            busy = load_busy_intervals(day, exclude_hold=hold_id)
+            return None, nearest_starts(day, busy, start_minute, duration_minutes, earliest)
+
+        if hold_id is not None:
+            SlotHold.objects.filter(pk=hold_id, date=day).delete()  # The booking replaces the hold
+        booking = ConsultationBooking.objects.create(
+            appointment_date=day, appointment_time=start_time, consultant=consultant, **fields
+        )
+        return booking, []
+
+
+def reinstate_bookings(bookings, status):
+    """
+    Move cancelled bookings back to ``status`` where their time is still free.
+
+    Each date is locked like reserve_booking and its bookings re-checked in
+    start order, so a slot re-sold after the cancellation is never double
+    booked. A booking whose consultant was booked meanwhile moves to the
+    least-loaded free one; one nobody is free for stays cancelled.
+
+    Args:
+        bookings: Cancelled ConsultationBooking rows
+        status: Status to restore them to
+
+    Returns:
+        list: The bookings that stayed cancelled
+    """
+    from .models import ConsultationBooking
+
+    by_date = defaultdict(list)
+    for booking in bookings:
+        by_date[booking.appointment_date].append(booking)
+
+    conflicts = []
+    with transaction.atomic():
+        for day in sorted(by_date):  # One lock order for every caller
+            lock_date(day)
+            for booking in sorted(by_date[day], key=lambda booking: (booking.appointment_time, booking.pk)):
+                consultant = pick_consultant(
+                    day, to_minutes(booking.appointment_time), booking.duration_minutes, prefer=booking.consultant_id
+                )
+                if consultant is None:
+                    conflicts.append(booking)
+                    continue
+                # Active from here on, so the next booking's check sees it
+                ConsultationBooking.objects.filter(pk=booking.pk).update(status=status, consultant=consultant)
+    return conflicts
+
+
+def place_hold(day, start_time, duration_minutes, now=None):
+    """
+    Hold a free slot for HOLD_MINUTES while the client completes the form.
+
+    Uses the same per-date lock and checks as reserve_booking and assigns the
+    least-loaded free consultant, so a consultant's holds never overlap their
+    bookings or other holds.
+
+    Args:
+        day: Date to hold
+        start_time: Start to hold (time object)
+        duration_minutes: Length to hold in minutes
+        now: Current naive datetime (defaults to datetime.now())
+
+    Returns:
+        tuple: (hold, []) on success, or (None, alternatives) where
+        alternatives are the nearest free start minutes that day
+    """
+    from .models import SlotHold
+
+    start_minute = to_minutes(start_time)
+    earliest = earliest_start_for(day, now)
+    if earliest is None:
+        return None, []
+
+    with transaction.atomic():
+        lock_date(day)
+
+        consultant = None
+        if _is_offered(day, start_minute, duration_minutes, earliest):
+            consultant = pick_consultant(day, start_minute, duration_minutes)
+        if consultant is None:
+            busy = load_busy_intervals(day)
+            return None, nearest_starts(day, busy, start_minute, duration_minutes, earliest)
+
+        hold = SlotHold.objects.create(
+            date=day,
+            start_time=start_time,
+            duration_minutes=duration_minutes,
+            consultant=consultant,
+            expires_at=timezone.now() + timedelta(minutes=HOLD_MINUTES),
+        )
+        availability_changed([day])
+        return hold, []
+
+
+def release_hold(hold_id):
+    """
+    Release a hold before it expires.
+
+    Returns:
+        bool: True if an active hold was released
+    """
+    from .models import SlotHold
+
+    hold = SlotHold.objects.filter(pk=hold_id).first()
+    if hold is None:
+        return False
+
+    with transaction.atomic():
+        hold.delete()
+        availability_changed([hold.date])
+    return hold.is_active()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              CHANGE NOTIFICATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+def availability_changed(dates):
+    """
+    Single entry point for "bookings or holds on these dates changed".
+
+    Refreshes the materialized summaries, evicts cached API responses for
+    exactly the touched dates and pushes slot events to live clients.
+
+    Args:
+        dates: Iterable of dates (or 'YYYY-MM-DD' strings)
+
+    Returns:
+        dict: Date -> refreshed DayAvailability
+    """
+    from . import availability_cache, slot_events
+    from .models import DayAvailability
+
+    dates = as_dates(dates)
+    if not dates:
+        return {}
+
+    previous = {row.date: row.free_mask for row in DayAvailability.objects.filter(date__in=dates)}
+    refreshed = refresh_day_availability(dates)
+
+    # Cached entries for dates/months containing a hold must lapse when it does
+    first_month, _ = month_bounds(dates[0].year, dates[0].month)
+    _, after_last_month = month_bounds(dates[-1].year, dates[-1].month)
+    hold_expiries = dict(
+        DayAvailability.objects.filter(
+            date__gte=first_month, date__lt=after_last_month, hold_expires_at__isnull=False
+        ).values_list('date', 'hold_expires_at')
+    )
+
+    availability_cache.invalidate_dates(dates, hold_expiries)
+    slot_events.publish_changes(previous, refreshed)
+    return refreshed
@@ -0,0 +1,103 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              BOOKING SIGNALS
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Keeps the materialized DayAvailability rows and the availability response
+# cache in step with ConsultationBooking, and the compiled schedule rules in
+# step with AvailableSlot, BlackoutPeriod and Consultant, and the dates an
+# ExternalCalendar covers in step with its active flag and owner.
+# Every save path (views, admin save_model, list_editable and bulk actions)
+# and every delete goes through these receivers.
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import schedule_rules, scheduling
+from .models import AvailableSlot, BlackoutPeriod, Consultant, ConsultationBooking, ExternalBusy, ExternalCalendar
+
+# Fields whose change can alter a day's availability
+AVAILABILITY_FIELDS = ('appointment_date', 'appointment_time', 'duration', 'status', 'consultant_id')
+
+
+def _availability_state(instance):
+    """Snapshot of the availability-relevant fields (deferred fields are skipped)."""
+    return tuple(instance.__dict__.get(field) for field in AVAILABILITY_FIELDS)
+
+
+@receiver(post_init, sender=ConsultationBooking)
+def remember_booking_state(sender, instance, **kwargs):
+    """Remember the loaded values so a later save knows which dates it touched."""
+    instance._availability_snapshot = _availability_state(instance)
+
+
+@receiver(post_save, sender=ConsultationBooking)
+def booking_saved(sender, instance, created, **kwargs):
+    """Refresh availability for the booking's old and new dates."""
+    previous = instance._availability_snapshot
+    current = _availability_state(instance)
+    instance._availability_snapshot = current
+
+    # Saves that only touch client details leave availability as it was
+    if not created and previous == current:
+        return
+
+    dates = {instance.appointment_date}
+    if not created and previous[0]:
+        dates.add(previous[0])  # Rescheduled bookings free their old date
+    scheduling.availability_changed(dates)
+
+
+@receiver(post_delete, sender=ConsultationBooking)
+def booking_deleted(sender, instance, **kwargs):
+    """Refresh availability for a deleted booking's date."""
+    scheduling.availability_changed([instance.appointment_date])
+
+
+@receiver(post_save, sender=AvailableSlot)
+@receiver(post_delete, sender=AvailableSlot)
+@receiver(post_save, sender=BlackoutPeriod)
+@receiver(post_delete, sender=BlackoutPeriod)
+@receiver(post_save, sender=Consultant)
+@receiver(post_delete, sender=Consultant)
+def schedule_rules_changed(sender, **kwargs):
+    """Recompile the schedule rules once the change is committed."""
+    schedule_rules.rules_changed_on_commit()
+
+
+# ─── External Calendars ────────────────────────────────────────────────────────
+
+def _upcoming_busy_dates(calendar):
+    """Dates from today on that hold the calendar's imported busy times."""
+    return set(
+        ExternalBusy.objects.filter(calendar=calendar, date__gte=timezone.localdate())
+        .order_by().values_list('date', flat=True).distinct()
+    )
+
+
+@receiver(post_init, sender=ExternalCalendar)
+def remember_calendar_state(sender, instance, **kwargs):
+    """Remember whether the calendar counted, and for whom."""
+    instance._availability_snapshot = (instance.__dict__.get('is_active'), instance.__dict__.get('consultant_id'))
+
+
+@receiver(post_save, sender=ExternalCalendar)
+def calendar_saved(sender, instance, created, **kwargs):
+    """Re-assign imported busy times and refresh their dates when the owner or active flag changes."""
+    previous = instance._availability_snapshot
+    current = (instance.is_active, instance.consultant_id)
+    instance._availability_snapshot = current
+    if created or previous == current:
+        return
+
+    if previous[1] != current[1]:
+        ExternalBusy.objects.filter(calendar=instance).update(consultant_id=instance.consultant_id)
+    scheduling.availability_changed(_upcoming_busy_dates(instance))
+
+
+@receiver(pre_delete, sender=ExternalCalendar)
+def calendar_deleted(sender, instance, **kwargs):
+    """Free the deleted calendar's dates once its busy rows are gone."""
+    dates = _upcoming_busy_dates(instance)
+    transaction.on_commit(lambda: scheduling.availability_changed(dates))
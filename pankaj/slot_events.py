@@ -0,0 +1,271 @@
+# ══════════════════════════════════════════════════════════════════════════════
+#                              SLOT EVENTS
+# ══════════════════════════════════════════════════════════════════════════════
+#
+# Pushes slot-taken / slot-freed events to browsers over Server-Sent Events.
+#
+# scheduling.availability_changed() hands the before/after free-minute
+# bitmaps of every touched date to publish_changes(). After the transaction
+# commits, the configured backend delivers the events to the broadcaster of
+# every worker process, which fans them out to the subscriptions watching
+# those dates.
+#
+# Each subscription is one asyncio.Queue consumed by an async generator on
+# the ASGI event loop, so an idle connection costs a few objects and no
+# thread.
+#
+# Backends (settings.SLOT_EVENTS_BACKEND):
+#   - 'pankaj.slot_events.InProcessBackend' (default): single worker process
+#   - 'pankaj.slot_events.RedisBackend': Redis pub/sub across worker processes
+#     (needs the optional ``redis`` package and settings.SLOT_EVENTS_REDIS_URL)
+
+import asyncio  # Subscriber queues
+import json  # Event payloads
+import threading  # Guards the subscription registry
+
+from django.conf import settings  # Access Django settings
+from django.core.exceptions import ImproperlyConfigured  # Backend misconfiguration
+from django.db import transaction  # Publish after commit
+from django.utils.module_loading import import_string  # Backend lookup
+
+from . import schedule_rules, scheduling
+
+# ─── Configuration ─────────────────────────────────────────────────────────────
+DEFAULT_BACKEND = 'pankaj.slot_events.InProcessBackend'
+HEARTBEAT_SECONDS = 25  # Comment line sent to idle streams to keep proxies open
+QUEUE_SIZE = 64  # Undelivered events kept per subscription
+MAX_DATES = 62  # Dates one stream may watch
+REDIS_CHANNEL = 'pankaj:slot-events'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              BROADCASTER
+# ══════════════════════════════════════════════════════════════════════════════
+
+class Subscription:
+    """One open event stream: the dates it watches and its event queue."""
+
+    def __init__(self, dates):
+        self.dates = frozenset(day.isoformat() for day in dates)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, event):
+        """Queue an event from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop the backlog and ask it to reload instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'event': 'resync', 'date': event['date']})
+
+
+class Broadcaster:
+    """Per-process registry of subscriptions, indexed by date."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_date = {}
+
+    def subscribe(self, dates):
+        """Register a subscription for the given dates (call on the event loop)."""
+        subscription = Subscription(dates)
+        with self._lock:
+            for day in subscription.dates:
+                self._by_date.setdefault(day, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscription from every date it watched."""
+        with self._lock:
+            for day in subscription.dates:
+                watchers = self._by_date.get(day)
+                if watchers is not None:
+                    watchers.discard(subscription)
+                    if not watchers:
+                        del self._by_date[day]
+
+    def dispatch(self, event):
+        """Deliver an event to every local subscription watching its date."""
+        with self._lock:
+            watchers = list(self._by_date.get(event['date'], ()))
+        for subscription in watchers:
+            subscription.deliver(event)
+
+    def subscriber_count(self):
+        """Number of open local subscriptions."""
+        with self._lock:
+            return len({sub for watchers in self._by_date.values() for sub in watchers})
+
+
+broadcaster = Broadcaster()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              BACKENDS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class InProcessBackend:
+    """Delivers events straight to this process's broadcaster."""
+
+    def publish(self, event):
+        broadcaster.dispatch(event)
+
+    def has_subscribers(self):
+        """Only this process's own streams can receive events."""
+        return broadcaster.subscriber_count() > 0
+
+    def listen(self):
+        """Nothing to start: publish() already reaches every local subscriber."""
+
+
+class RedisBackend:
+    """
+    Relays events through Redis pub/sub so every worker process receives them.
+
+    publish() is synchronous (it runs in request threads); each process runs
+    one asyncio listener task that feeds its own broadcaster.
+    """
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('RedisBackend requires the "redis" package')
+        self.url = getattr(settings, 'SLOT_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+        self.client = redis.Redis.from_url(self.url)
+        self._listener = None
+
+    def publish(self, event):
+        self.client.publish(REDIS_CHANNEL, json.dumps(event))
+
+    def has_subscribers(self):
+        """Streams in other worker processes may be listening."""
+        return True
+
+    def listen(self):
+        """Start this process's listener task once, on the running event loop."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._relay())
+
+    async def _relay(self):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        async with client.pubsub() as pubsub:
+            await pubsub.subscribe(REDIS_CHANNEL)
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    broadcaster.dispatch(json.loads(message['data']))
+
+
+_backend = None
+
+
+def get_backend():
+    """The configured backend instance (created on first use)."""
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'SLOT_EVENTS_BACKEND', DEFAULT_BACKEND))()
+    return _backend
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              PUBLISHING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def build_events(previous, refreshed):
+    """
+    Diff before/after packed free bitmaps into slot events.
+
+    Lanes are compared per consultant, so taking one of several free
+    consultants still reports the minutes it took. Every event carries the
+    date's bookable starts for each standard duration, so a client can
+    rebuild its slot list without another request.
+
+    Args:
+        previous: Date -> packed free bitmap before the change (missing = never stored)
+        refreshed: Date -> refreshed DayAvailability row
+
+    Returns:
+        list: Event dicts with event, date, ranges and starts keys
+    """
+    rules = schedule_rules.get_rules()
+    events = []
+    for day, row in refreshed.items():
+        after = row.free_mask
+        before = previous.get(day)
+        if before is None:
+            before = scheduling.consultant_free_mask(rules.window(day), {}, rules.consultants)
+
+        changes = [(kind, changed) for kind, changed in (
+            ('slot-taken', before & ~after),
+            ('slot-freed', after & ~before),
+        ) if changed]
+        if not changes:
+            continue
+
+        starts = {
+            str(minutes): scheduling.mask_to_minutes(mask)
+            for minutes, mask in scheduling.bookable_starts_many(day, after, scheduling.STANDARD_DURATIONS).items()
+        }
+        for kind, changed in changes:
+            events.append({
+                'event': kind,
+                'date': day.isoformat(),
+                'ranges': scheduling.mask_to_intervals(scheduling.fold_lanes(changed)),  # [start, end) minutes
+                'starts': starts,
+            })
+    return events
+
+
+def publish_changes(previous, refreshed):
+    """Publish slot events for refreshed summaries once the transaction commits."""
+    backend = get_backend()
+    if not backend.has_subscribers():
+        return  # Nobody can receive them (no open stream, or WSGI): skip building events
+
+    events = build_events(previous, refreshed)
+    if not events:
+        return
+
+    def send():
+        for event in events:
+            backend.publish(event)
+
+    transaction.on_commit(send)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              STREAMING
+# ══════════════════════════════════════════════════════════════════════════════
+
+def format_event(event):
+    """Encode an event dict as an SSE message."""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream(dates):
+    """
+    Async SSE body for a client watching the given dates.
+
+    The subscription is created inside the generator so it belongs to the
+    ASGI server's event loop; it is removed when the client disconnects.
+    """
+    subscription = broadcaster.subscribe(dates)
+    get_backend().listen()
+    try:
+        yield 'retry: 5000\n\n'  # Reconnect delay for EventSource (ms)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -684,6 +684,20 @@ document.addEventListener('DOMContentLoaded', function() {
         clearSelection();
     });
     
+    // Jump to the earliest open slot
+    document.getElementById('firstAvailableBtn').addEventListener('click', function() {
+        jumpToFirstAvailable(this);
+    });
+    
+    // Package cards switch the duration in place
+    document.querySelectorAll('.btn-select[data-duration]').forEach(link => {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+            switchPackage(this.dataset.duration);
+            document.querySelector('.booking-container').scrollIntoView({ behavior: 'smooth' });
+        });
+    });
+    
     // Test initial API call
     console.log('Testing API connection...');
     testAPI();
@@ -697,18 +711,42 @@ window.loadAvailableSlots = loadAvailableSlots;
 window.selectDate = selectDate;
 window.selectTime = selectTime;
 window.clearSelection = clearSelection;
+window.jumpToFirstAvailable = jumpToFirstAvailable;
+window.switchPackage = switchPackage;
 window.submitBookingForm = submitBookingForm;
 window.showConfirmationModal = showConfirmationModal;
 window.addToCalendar = addToCalendar;
 window.getEndTime = getEndTime;
 window.validateForm = validateForm;
 
+// Conditional GET for the availability APIs: replays the last body on 304
+const availabilityResponses = new Map();
+
+async function fetchAvailability(url) {
+    const cached = availabilityResponses.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    
+    // Bypass the browser cache so the 304 reaches this code
+    const response = await fetch(url, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (etag) {
+        availabilityResponses.set(url, { etag, data });
+    }
+    return data;
+}
+
 function initCalendar() {
     console.log('Initializing calendar...');
+    // Month flags and the first available day's slots arrive in one request
     updateCalendar();
-    // Load today's slots
-    const today = new Date().toISOString().split('T')[0];
-    loadAvailableSlots(today);
 }
 
 function updateCalendar() {
@@ -827,79 +865,83 @@ async function loadAvailableSlots(dateStr) {
     const durationMinutes = duration.replace('-min', '');
     
     try {
-        const response = await fetch(`/api/available-slots/?date=${dateStr}&duration=${durationMinutes}`);
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const data = await response.json();
+        const data = await fetchAvailability(`/api/available-slots/?date=${dateStr}&duration=${durationList(durationMinutes)}`);
         console.log('Available slots data:', data);
         
-        const timeSlots = document.getElementById('timeSlots');
+        lastSlots = { date: dateStr, data };
+        renderTimeSlots(dateStr, data);
+    } catch (error) {
+        console.error('Error loading slots:', error);
         const noSlotsMessage = document.getElementById('noSlotsMessage');
+        noSlotsMessage.style.display = 'block';
+        noSlotsMessage.innerHTML = `
+            <i class="fas fa-exclamation-triangle"></i>
+            <p>Error loading time slots. Please try again.</p>
+        `;
+    }
+}
+
+// Render the slot list for a date from an available-slots or calendar response
+function renderTimeSlots(dateStr, data) {
+    const timeSlots = document.getElementById('timeSlots');
+    const noSlotsMessage = document.getElementById('noSlotsMessage');
+    
+    timeSlots.innerHTML = '';
+    const slots = withHeldSlot(dateStr, (data.available_slots || []).slice());
+    
+    if (slots.length > 0) {
+        noSlotsMessage.style.display = 'none';
         
-        timeSlots.innerHTML = '';
+        // Sort slots by time
+        slots.sort((a, b) => a.start_time.localeCompare(b.start_time));
         
-        if (data.available_slots && data.available_slots.length > 0) {
-            noSlotsMessage.style.display = 'none';
+        slots.forEach(slot => {
+            const slotButton = document.createElement('button');
+            slotButton.type = 'button';
+            slotButton.className = 'time-slot';
+            slotButton.innerHTML = `
+                <div class="slot-content">
+                    <span class="time-display">${slot.display || `${slot.start_time} - ${slot.end_time}`}</span>
+                    <span class="duration-badge">${slot.duration} min</span>
+                </div>
+            `;
+            slotButton.dataset.time = slot.start_time;
+            slotButton.dataset.slotId = slot.id;
+            slotButton.dataset.duration = slot.duration;
             
-            // Sort slots by time
-            data.available_slots.sort((a, b) => a.start_time.localeCompare(b.start_time));
+            // Check if time is in the past for today
+            const now = new Date();
+            const today = now.toISOString().split('T')[0];
+            const [hours, minutes] = slot.start_time.split(':');
+            const slotTime = new Date();
+            slotTime.setHours(parseInt(hours), parseInt(minutes), 0, 0);
             
-            data.available_slots.forEach(slot => {
-                const slotButton = document.createElement('button');
-                slotButton.type = 'button';
-                slotButton.className = 'time-slot';
-                slotButton.innerHTML = `
-                    <div class="slot-content">
-                        <span class="time-display">${slot.display || `${slot.start_time} - ${slot.end_time}`}</span>
-                        <span class="duration-badge">${slot.duration} min</span>
-                    </div>
-                `;
-                slotButton.dataset.time = slot.start_time;
-                slotButton.dataset.slotId = slot.id;
-                slotButton.dataset.duration = slot.duration;
-                
-                // Check if time is in the past for today
-                const now = new Date();
-                const today = now.toISOString().split('T')[0];
-                const [hours, minutes] = slot.start_time.split(':');
-                const slotTime = new Date();
-                slotTime.setHours(parseInt(hours), parseInt(minutes), 0, 0);
-                
-                if (dateStr === today && slotTime < now) {
-                    slotButton.classList.add('past-slot');
-                    slotButton.disabled = true;
-                    slotButton.title = 'This time has already passed';
-                } else {
-                    if (selectedTime === slot.start_time && selectedDate === dateStr) {
-                        slotButton.classList.add('selected');
-                    }
-                    
-                    slotButton.addEventListener('click', function() {
-                        selectTime(dateStr, slot.start_time, slot.id);
-                    });
+            if (dateStr === today && slotTime < now) {
+                slotButton.classList.add('past-slot');
+                slotButton.disabled = true;
+                slotButton.title = 'This time has already passed';
+            } else {
+                if (selectedTime === slot.start_time && selectedDate === dateStr) {
+                    slotButton.classList.add('selected');
                 }
                 
-                timeSlots.appendChild(slotButton);
-            });
-        } else {
-            noSlotsMessage.style.display = 'block';
-            noSlotsMessage.innerHTML = `
-                <i class="fas fa-calendar-times"></i>
-                <p>${data.is_today && data.current_time ? `No available slots for today (${data.current_time}).` : 'No available slots for this date.'} Please select another date.</p>
-            `;
-        }
-    } catch (error) {
-        console.error('Error loading slots:', error);
-        const noSlotsMessage = document.getElementById('noSlotsMessage');
+                slotButton.addEventListener('click', function() {
+                    selectTime(dateStr, slot.start_time, slot.id);
+                });
+            }
+            
+            timeSlots.appendChild(slotButton);
+        });
+    } else {
         noSlotsMessage.style.display = 'block';
         noSlotsMessage.innerHTML = `
-            <i class="fas fa-exclamation-triangle"></i>
-            <p>Error loading time slots. Please try again.</p>
+            <i class="fas fa-calendar-times"></i>
+            <p>${data.is_today && data.current_time ? `No available slots for today (${data.current_time}).` : 'No available slots for this date.'} Please select another date.</p>
         `;
     }
 }
 // Update checkMonthAvailability function
+// Uses the combined calendar endpoint: month flags plus one day's slots
 async function checkMonthAvailability(year, month) {
     console.log(`Checking availability for ${year}-${month + 1}`);
     
@@ -907,14 +949,18 @@ async function checkMonthAvailability(year, month) {
     const duration = document.querySelector('[name="duration"]').value;
     const durationMinutes = duration.replace('-min', '');
     
+    // Keep the current selection if it belongs to this month
+    const monthPrefix = `${year}-${String(month + 1).padStart(2, '0')}`;
+    let url = `/api/calendar/?year=${year}&month=${month + 1}&duration=${durationList(durationMinutes)}`;
+    if (selectedDate && selectedDate.startsWith(monthPrefix)) {
+        url += `&date=${selectedDate}`;
+    }
+    
     try {
-        const response = await fetch(`/api/date-availability/?year=${year}&month=${month + 1}&duration=${durationMinutes}`);
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const data = await response.json();
-        console.log('Availability data:', data);
+        const data = await fetchAvailability(url);
+        console.log('Calendar data:', data);
         
+        lastCalendar = data;
         data.dates.forEach(dateInfo => {
             const dateCell = document.querySelector(`[data-date="${dateInfo.date}"]`);
             if (dateCell && !dateCell.classList.contains('past')) {
@@ -924,15 +970,147 @@ async function checkMonthAvailability(year, month) {
                 } else {
                     dateCell.classList.add('unavailable');
                     dateCell.style.cursor = 'not-allowed';
-                    dateCell.title = 'No available slots for selected duration';
+                    dateCell.title = dateInfo.is_closed ? 'Closed' : 'No available slots for selected duration';
                 }
             }
         });
+        
+        // Show the slots that came with the month
+        if (data.slots_date) {
+            selectedDate = data.slots_date;
+            document.querySelectorAll('.calendar-date.selected').forEach(el => {
+                el.classList.remove('selected');
+            });
+            const selectedCell = document.querySelector(`[data-date="${data.slots_date}"]`);
+            if (selectedCell) {
+                selectedCell.classList.add('selected');
+            }
+            updateDateDisplay(data.slots_date);
+            renderTimeSlots(data.slots_date, data);
+        }
+        
+        // Follow bookings on this month's open dates live
+        openSlotEvents(data.dates.filter(dateInfo => !dateInfo.is_past && !dateInfo.is_closed).map(dateInfo => dateInfo.date));
     } catch (error) {
         console.error('Error checking availability:', error);
     }
 }
 
+// Live slot updates (Server-Sent Events from /api/slot-events/)
+let slotEventSource = null;
+
+function openSlotEvents(dates) {
+    if (slotEventSource) {
+        slotEventSource.close();
+        slotEventSource = null;
+    }
+    if (!window.EventSource || dates.length === 0) {
+        return;
+    }
+    
+    slotEventSource = new EventSource(`/api/slot-events/?dates=${dates.join(',')}`);
+    slotEventSource.addEventListener('slot-taken', applySlotEvent);
+    slotEventSource.addEventListener('slot-freed', applySlotEvent);
+    slotEventSource.addEventListener('resync', function(e) {
+        const event = JSON.parse(e.data);
+        if (event.date === selectedDate) {
+            loadAvailableSlots(selectedDate);
+        }
+    });
+    slotEventSource.onerror = function() {
+        // Server without ASGI answers 503: stop retrying and rely on conditional polling
+        if (slotEventSource && slotEventSource.readyState === EventSource.CLOSED) {
+            slotEventSource = null;
+        }
+    };
+}
+
+function applySlotEvent(e) {
+    const event = JSON.parse(e.data);
+    console.log('Slot event:', event);
+    
+    const duration = document.querySelector('[name="duration"]').value;
+    const durationMinutes = parseInt(duration.replace('-min', ''));
+    
+    // Calendar flag (ignores past times, like the month endpoint)
+    const dateCell = document.querySelector(`[data-date="${event.date}"]`);
+    if (dateCell && !dateCell.classList.contains('past')) {
+        const hasAvailability = slotsFromStarts(event.date, event.starts[durationMinutes] || [], durationMinutes, false).length > 0;
+        dateCell.classList.toggle('available', hasAvailability);
+        dateCell.classList.toggle('unavailable', !hasAvailability);
+        dateCell.style.cursor = hasAvailability ? 'pointer' : 'not-allowed';
+    }
+    
+    patchCachedAvailability(event);
+    
+    // Patch the visible slot list in place
+    if (event.date === selectedDate) {
+        const slots = withHeldSlot(event.date, slotsFromStarts(event.date, event.starts[durationMinutes] || [], durationMinutes, true));
+        if (selectedTime && !slots.some(slot => slot.start_time === selectedTime)) {
+            selectedTime = null;  // The chosen time was just taken
+            document.getElementById('selectedTime').value = '';
+        }
+        renderTimeSlots(event.date, { available_slots: slots });
+    }
+}
+
+// Keep the other durations' cached flags and slot lists current as well
+function patchCachedAvailability(event) {
+    const dateInfo = lastCalendar && lastCalendar.dates.find(info => info.date === event.date);
+    if (dateInfo && dateInfo.availability) {
+        Object.entries(event.starts).forEach(([minutes, starts]) => {
+            dateInfo.availability[minutes] = slotsFromStarts(event.date, starts, parseInt(minutes), false).length > 0;
+        });
+    }
+    [
+        lastCalendar && lastCalendar.slots_date === event.date ? lastCalendar : null,
+        lastSlots && lastSlots.date === event.date ? lastSlots.data : null,
+    ].forEach(data => {
+        if (data && data.slots_by_duration) {
+            Object.entries(event.starts).forEach(([minutes, starts]) => {
+                if (minutes in data.slots_by_duration) {
+                    data.slots_by_duration[minutes] = slotsFromStarts(event.date, starts, parseInt(minutes), true);
+                }
+            });
+        }
+    });
+}
+
+// Slot list for a duration from the server's bookable start minutes
+function slotsFromStarts(dateStr, starts, durationMinutes, skipPast) {
+    const now = new Date();
+    const today = now.toISOString().split('T')[0];
+    // First start not in the past (a started minute counts as past)
+    const earliest = skipPast && dateStr === today
+        ? now.getHours() * 60 + now.getMinutes() + (now.getSeconds() || now.getMilliseconds() ? 1 : 0)
+        : 0;
+    const slots = [];
+    
+    starts.forEach(start => {
+        if (start < earliest) {
+            return;
+        }
+        const end = start + durationMinutes;
+        slots.push({
+            id: `${dateStr.replace(/-/g, '')}${formatClock(start, false).replace(':', '')}`,
+            start_time: formatClock(start, false),
+            end_time: formatClock(end, false),
+            duration: String(durationMinutes),
+            display: `${formatClock(start, true)} - ${formatClock(end, true)}`
+        });
+    });
+    return slots;
+}
+
+function formatClock(minutes, twelveHour) {
+    const hours = Math.floor(minutes / 60);
+    const mins = String(minutes % 60).padStart(2, '0');
+    if (!twelveHour) {
+        return `${String(hours).padStart(2, '0')}:${mins}`;
+    }
+    return `${String(hours % 12 || 12).padStart(2, '0')}:${mins} ${hours < 12 ? 'AM' : 'PM'}`;
+}
+
 // Update selectTime function
 function selectTime(dateStr, timeStr, slotId = null) {
     console.log('Time selected:', timeStr, 'Slot ID:', slotId);
@@ -1175,12 +1353,189 @@ function selectTime(dateStr, timeStr) {
     const summary = document.getElementById('appointmentSummary');
     summary.style.display = 'block';
     summary.style.opacity = '1';
+    
+    // Keep the time reserved while the form is filled in
+    holdSlot(dateStr, timeStr);
+}
+
+// Every duration is fetched with each availability request (requested one first),
+// so switching packages re-renders from the last responses without a round trip
+const STANDARD_DURATIONS = [30, 45, 60];
+let lastCalendar = null;  // Last /api/calendar/ response
+let lastSlots = null;     // Last /api/available-slots/ response and its date
+
+function durationList(durationMinutes) {
+    const primary = parseInt(durationMinutes);
+    return [primary, ...STANDARD_DURATIONS.filter(minutes => minutes !== primary)].join(',');
+}
+
+function switchPackage(duration) {
+    const packages = JSON.parse(document.getElementById('packageDetails').textContent);
+    const details = packages[duration];
+    const durationInput = document.querySelector('[name="duration"]');
+    if (!details || durationInput.value === duration) {
+        return;
+    }
+    
+    // The held time was for the old length
+    releaseHold();
+    selectedTime = null;
+    document.getElementById('selectedTime').value = '';
+    document.getElementById('summaryTime').textContent = 'No time selected';
+    
+    // Form fields, address and package text
+    const form = document.getElementById('bookingForm');
+    durationInput.value = duration;
+    form.querySelector('[name="duration_minutes"]').value = details.duration_minutes;
+    form.querySelector('[name="price"]').value = details.price;
+    form.action = `/booking/${duration}/`;
+    history.replaceState(null, '', form.action + window.location.search);
+    
+    ['title', 'price', 'duration_minutes'].forEach(field => {
+        document.querySelectorAll(`[data-package="${field}"]`).forEach(el => {
+            el.textContent = details[field];
+        });
+    });
+    document.querySelectorAll('[data-package="features"]').forEach(list => {
+        list.innerHTML = '';
+        details.features.forEach(feature => {
+            const item = document.createElement('li');
+            item.innerHTML = '<i class="fas fa-check"></i> ';
+            item.append(feature);
+            list.appendChild(item);
+        });
+    });
+    document.querySelectorAll('.btn-select[data-duration]').forEach(link => {
+        const active = link.dataset.duration === duration;
+        link.classList.toggle('active', active);
+        link.closest('.consultation-card').classList.toggle('active', active);
+        link.innerHTML = active ? '<i class="fas fa-check-circle"></i> Currently Selected' : 'Select This Package';
+    });
+    
+    showCachedAvailability(details.duration_minutes);
+}
+
+// Re-render the calendar flags and slot list for a duration from the last responses
+function showCachedAvailability(durationMinutes) {
+    const key = String(durationMinutes);
+    if (!lastCalendar || !lastCalendar.slots_by_duration || !(key in lastCalendar.slots_by_duration)) {
+        updateCalendar();  // Nothing usable yet: fetch as usual
+        return;
+    }
+    
+    lastCalendar.dates.forEach(dateInfo => {
+        const dateCell = document.querySelector(`[data-date="${dateInfo.date}"]`);
+        if (dateCell && !dateCell.classList.contains('past')) {
+            const hasAvailability = Boolean(dateInfo.availability && dateInfo.availability[key]);
+            dateCell.classList.toggle('available', hasAvailability);
+            dateCell.classList.toggle('unavailable', !hasAvailability);
+            dateCell.style.cursor = hasAvailability ? 'pointer' : 'not-allowed';
+            dateCell.title = hasAvailability ? '' : (dateInfo.is_closed ? 'Closed' : 'No available slots for selected duration');
+        }
+    });
+    
+    if (!selectedDate) {
+        return;
+    }
+    const data = lastSlots && lastSlots.date === selectedDate ? lastSlots.data
+        : lastCalendar.slots_date === selectedDate ? lastCalendar : null;
+    if (data && data.slots_by_duration && key in data.slots_by_duration) {
+        renderTimeSlots(selectedDate, { ...data, available_slots: data.slots_by_duration[key] });
+    } else {
+        loadAvailableSlots(selectedDate);
+    }
+}
+
+// Show the month of the earliest free slot and select it
+async function jumpToFirstAvailable(button) {
+    const duration = document.querySelector('[name="duration"]').value;
+    const durationMinutes = parseInt(duration.replace('-min', ''));
+    
+    button.disabled = true;
+    try {
+        const data = await fetchAvailability(`/api/next-available/?duration=${durationMinutes}&count=1`);
+        if (!data.slots.length) {
+            alert(`No ${durationMinutes}-minute slots are free in the next ${data.days} days. Please contact us directly.`);
+            return;
+        }
+        
+        const slot = data.slots[0];
+        const [year, month] = slot.date.split('-').map(Number);
+        currentDate = new Date(year, month - 1, 1);
+        selectedDate = slot.date;
+        updateCalendar();  // Loads the month with the slot's date selected
+        selectTime(slot.date, slot.start_time);
+    } catch (error) {
+        console.error('Error finding the first available slot:', error);
+    } finally {
+        button.disabled = false;
+    }
+}
+
+// Slot hold for the selected time (released on change, consumed on submit)
+let currentHold = null;
+
+async function holdSlot(dateStr, timeStr) {
+    const duration = document.querySelector('[name="duration"]').value;
+    const body = new FormData();
+    body.append('date', dateStr);
+    body.append('time', timeStr);
+    body.append('duration', duration.replace('-min', ''));
+    
+    try {
+        // The server releases this session's previous hold itself
+        currentHold = null;
+        const response = await fetch('/api/holds/', {
+            method: 'POST',
+            body,
+            headers: {
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            }
+        });
+        const result = await response.json();
+        
+        if (response.status === 201) {
+            currentHold = result;
+        } else if (response.status === 409 && selectedTime === timeStr) {
+            const suggestions = (result.alternatives || []).map(slot => slot.display).join('\n');
+            alert(`${result.error}${suggestions ? `\n\nNearest free times:\n${suggestions}` : ''}`);
+            selectedTime = null;
+            document.getElementById('selectedTime').value = '';
+            loadAvailableSlots(dateStr);
+        }
+    } catch (error) {
+        console.error('Error holding slot:', error);
+    }
+}
+
+function releaseHold() {
+    if (!currentHold) {
+        return;
+    }
+    const body = new FormData();
+    body.append('csrfmiddlewaretoken', document.querySelector('[name=csrfmiddlewaretoken]').value);
+    navigator.sendBeacon(`/api/holds/${currentHold.hold_id}/release/`, body);
+    currentHold = null;
+}
+
+// Free the held time when the visitor leaves without booking
+window.addEventListener('pagehide', releaseHold);
+
+// Our own held slot stays selectable even though the server counts it as busy
+function withHeldSlot(dateStr, slots) {
+    const duration = document.querySelector('[name="duration"]').value.replace('-min', '');
+    if (currentHold && currentHold.date === dateStr && String(currentHold.duration) === duration
+            && !slots.some(slot => slot.start_time === currentHold.start_time)) {
+        slots.push(currentHold.slot);
+    }
+    return slots;
 }
 
 function clearSelection() {
     console.log('Clearing selection');
     selectedDate = null;
     selectedTime = null;
+    releaseHold();
     
     // Update UI
     document.querySelectorAll('.calendar-date.selected').forEach(el => {
@@ -1208,6 +1563,9 @@ function clearSelection() {
 }
 async function submitBookingForm(form) {
     const formData = new FormData(form);
+    if (currentHold) {
+        formData.append('hold_id', currentHold.hold_id);
+    }
     const submitButton = form.querySelector('.btn-submit');
     
     // Validate required fields
@@ -1232,6 +1590,8 @@ async function submitBookingForm(form) {
         console.log('Submission result:', result);
         
         if (result.success) {
+            currentHold = null;  // Consumed by the booking
+            
             // Show success modal with booking details
             showConfirmationModal(
                 result.booking_id,
@@ -1247,6 +1607,13 @@ async function submitBookingForm(form) {
             document.getElementById('charCount').textContent = '0';
             document.getElementById('fileList').innerHTML = '';
             
+        } else if (result.conflict) {
+            // Someone else took the slot: offer the nearest free times and refresh the list
+            const suggestions = (result.alternatives || []).map(slot => slot.display).join('\n');
+            alert(`${result.error}${suggestions ? `\n\nNearest free times:\n${suggestions}` : ''}`);
+            selectedTime = null;
+            document.getElementById('selectedTime').value = '';
+            loadAvailableSlots(selectedDate);
         } else {
             alert('Error: ' + result.error);
         }
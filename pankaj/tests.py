@@ -0,0 +1,772 @@
+import re
+import smtplib
+import threading
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pankaj import admin_digest, emails, ics_import, outbox, schedule_rules, scheduling
+from pankaj.models import (
+    AdminNotification, Consultant, ConsultationBooking, DayAvailability, ExternalBusy, ExternalCalendar,
+    OutboxMessage, SlotHold,
+)
+from pankaj.query_plans import query_plans
+from pankaj.schedule_rules import get_rules
+
+
+def booking_fields(index=0):
+    """Client fields for reserve_booking() (everything but date, time and length)."""
+    return {
+        'duration': '45-min',
+        'price': 0,
+        'mode': 'video',
+        'name': f'Client {index}',
+        'email': f'client{index}@example.com',
+        'phone': '0000000000',
+        'topic': 'Test booking',
+    }
+
+
+class SchedulingTestCase(TestCase):
+    """
+    Default working hours (no AvailableSlot rows) and ``CONSULTANTS`` fresh
+    consultants, with the compiled rules rebuilt for them.
+    """
+
+    CONSULTANTS = 1
+
+    def setUp(self):
+        # Rule changes rebuild on commit; run those callbacks here
+        with self.captureOnCommitCallbacks(execute=True):
+            Consultant.objects.all().delete()  # The migrations add a default consultant
+            self.consultants = [
+                Consultant.objects.create(name=f'Consultant {index}') for index in range(self.CONSULTANTS)
+            ]
+        self.day = date.today() + timedelta(days=30)
+        while get_rules().is_closed(self.day):
+            self.day += timedelta(days=1)
+        self.start = time(10, 0)
+        self.minute = scheduling.to_minutes(self.start)
+
+    def free_starts(self, duration_minutes=45):
+        return scheduling.get_free_starts(self.day, duration_minutes)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              RESERVATIONS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """Parallel submissions for one slot must produce exactly one booking."""
+
+    WORKERS = 50
+
+    def setUp(self):
+        # Capacity of one per slot (the migrations add a default consultant)
+        Consultant.objects.all().delete()
+        Consultant.objects.create(name='Only consultant')
+        self.day = date.today() + timedelta(days=60)
+        while get_rules().is_closed(self.day):
+            self.day += timedelta(days=1)
+        self.start = scheduling.to_time(scheduling.get_free_starts(self.day, 45)[0])
+
+    def test_one_of_fifty_parallel_submissions_wins(self):
+        barrier = threading.Barrier(self.WORKERS)
+        outcomes = Counter()
+        errors = []
+        lock = threading.Lock()
+
+        def submit(index):
+            try:
+                barrier.wait()  # Release every submission at once
+                booking, _ = scheduling.reserve_booking(
+                    self.day, self.start, 45,
+                    duration='45-min',
+                    price=0,
+                    mode='video',
+                    name=f'Stress {index}',
+                    email=f'stress{index}@example.com',
+                    phone='0000000000',
+                    topic='Reservation stress test',
+                )
+                outcome = 'booked' if booking is not None else 'conflict'
+            except Exception as exc:
+                outcome = 'error'
+                errors.append(f'worker {index}: {exc}')
+            finally:
+                connection.close()  # Each thread has its own connection
+            with lock:
+                outcomes[outcome] += 1
+
+        threads = [threading.Thread(target=submit, args=(index,)) for index in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(outcomes, Counter(booked=1, conflict=self.WORKERS - 1))
+        self.assertEqual(
+            ConsultationBooking.objects.filter(appointment_date=self.day, appointment_time=self.start).count(), 1
+        )
+
+
+
+class ReinstateBookingTests(SchedulingTestCase):
+    """Bulk admin actions only give a cancelled booking its time back while it is free."""
+
+    CONSULTANTS = 2
+
+    def book(self, index, consultant, start=None, status='confirmed'):
+        return ConsultationBooking.objects.create(
+            appointment_date=self.day, appointment_time=start or self.start, consultant=consultant, status=status,
+            **booking_fields(index)
+        )
+
+    def confirm(self, *bookings):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('admin:pankaj_consultationbooking_changelist'), {
+                'action': 'mark_as_confirmed', '_selected_action': [booking.pk for booking in bookings],
+            })
+        self.assertEqual(response.status_code, 302)
+        for booking in bookings:
+            booking.refresh_from_db()
+
+    def test_resold_time_is_not_double_booked(self):
+        first, second = self.consultants
+        moved = self.book(1, first, status='cancelled')
+        stuck = self.book(2, second, status='cancelled')
+        elsewhere = self.book(3, second, time(14, 0), status='cancelled')
+        self.book(4, first)  # Re-sold after the cancellations
+
+        self.confirm(moved, stuck, elsewhere)
+        self.assertEqual((moved.status, moved.consultant), ('confirmed', second))  # Its consultant was taken
+        self.assertEqual(stuck.status, 'cancelled')  # Nobody is left at that time
+        self.assertEqual((elsewhere.status, elsewhere.consultant), ('confirmed', second))
+
+        active = ConsultationBooking.objects.filter(appointment_date=self.day, appointment_time=self.start)
+        self.assertEqual(sorted(active.exclude(status='cancelled').values_list('consultant', flat=True)),
+                         sorted(consultant.pk for consultant in self.consultants))
+        self.assertNotIn(self.minute, self.free_starts())
+        self.assertIn(14 * 60, self.free_starts())  # The first consultant is still free then
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              QUERY PLANS
+# ══════════════════════════════════════════════════════════════════════════════
+
+@skipUnless(connection.vendor == 'sqlite', 'Reads SQLite EXPLAIN QUERY PLAN output')
+class HotQueryPlanTests(TestCase):
+    """Every hot ConsultationBooking query must use an index."""
+
+    def test_no_full_table_scans(self):
+        plans = query_plans()
+        self.assertTrue(plans)
+        for label, details, full_scans in plans:
+            with self.subTest(label):
+                self.assertEqual(full_scans, [], '\n'.join(details))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              SLOT HOLDS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SlotHoldTests(SchedulingTestCase):
+    """Holds block their time like bookings until they expire or are released."""
+
+    CONSULTANTS = 2
+
+    def hold(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            hold, _ = scheduling.place_hold(self.day, self.start, 45)
+        self.assertIsNotNone(hold)
+        return hold
+
+    def test_hold_removes_its_start(self):
+        self.hold()
+        self.assertIn(self.minute, self.free_starts())  # The second consultant is still free
+        self.hold()
+        self.assertNotIn(self.minute, self.free_starts())
+
+    def test_expired_hold_is_swept_on_read(self):
+        holds = [self.hold(), self.hold()]
+        summary = DayAvailability.objects.get(pk=self.day)
+        self.assertEqual(summary.hold_expires_at, min(hold.expires_at for hold in holds))
+
+        later = max(hold.expires_at for hold in holds) + timedelta(seconds=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertTrue(DayAvailability.objects.get(pk=self.day).is_stale())
+            self.assertIn(self.minute, self.free_starts())
+
+        self.assertFalse(SlotHold.objects.filter(date=self.day).exists())
+        self.assertIsNone(DayAvailability.objects.get(pk=self.day).hold_expires_at)
+
+    def test_reserve_consumes_own_hold_while_other_hold_blocks(self):
+        mine, theirs = self.hold(), self.hold()
+
+        booking, _ = scheduling.reserve_booking(self.day, self.start, 45, **booking_fields(1))
+        self.assertIsNone(booking)  # Both consultants are held
+
+        booking, _ = scheduling.reserve_booking(self.day, self.start, 45, hold_id=mine.pk, **booking_fields(2))
+        self.assertIsNotNone(booking)
+        self.assertEqual(booking.consultant_id, mine.consultant_id)
+        self.assertFalse(SlotHold.objects.filter(pk=mine.pk).exists())
+        self.assertTrue(SlotHold.objects.filter(pk=theirs.pk).exists())
+
+        booking, _ = scheduling.reserve_booking(self.day, self.start, 45, **booking_fields(3))
+        self.assertIsNone(booking)  # The other session's hold still blocks
+
+    def test_release_frees_the_time(self):
+        holds = [self.hold(), self.hold()]
+        self.assertNotIn(self.minute, self.free_starts())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(scheduling.release_hold(holds[0].pk))
+        self.assertIn(self.minute, self.free_starts())
+        self.assertFalse(scheduling.release_hold(holds[0].pk))  # Already gone
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              BLACKOUTS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class BlackoutTests(SimpleTestCase):
+    """compile_blackouts() and the closed/blocked lookups built from it."""
+
+    DAY = date(2030, 3, 12)
+
+    def rules(self, *rows):
+        return schedule_rules.compile_rules([], schedule_rules.compile_blackouts(rows))
+
+    def test_full_day_closure(self):
+        rules = self.rules((self.DAY, None, None, None, False))
+        self.assertTrue(rules.is_closed(self.DAY))
+        self.assertEqual(rules.start_mask(self.DAY, 45), 0)
+        self.assertFalse(rules.is_closed(self.DAY + timedelta(days=1)))
+        self.assertFalse(rules.is_closed(self.DAY.replace(year=2031)))  # Not yearly
+
+    def test_yearly_closure(self):
+        blackouts = schedule_rules.compile_blackouts([(date(2030, 12, 25), None, None, None, True)])
+        self.assertEqual(blackouts.closed_yearly, {(12, 25)})
+        for year in (2030, 2031, 2045):
+            self.assertTrue(blackouts.is_closed(date(year, 12, 25)))
+        self.assertFalse(blackouts.is_closed(date(2030, 12, 26)))
+
+    def test_multi_day_range(self):
+        rules = self.rules((self.DAY, self.DAY + timedelta(days=4), None, None, False))
+        for offset in range(5):
+            self.assertTrue(rules.is_closed(self.DAY + timedelta(days=offset)))
+        self.assertFalse(rules.is_closed(self.DAY - timedelta(days=1)))
+        self.assertFalse(rules.is_closed(self.DAY + timedelta(days=5)))
+
+    def test_partial_hours_trim_only_the_blocked_date(self):
+        rules = self.rules((self.DAY, None, time(12, 0), time(14, 0), False))
+        next_week = self.DAY + timedelta(days=7)
+
+        self.assertFalse(rules.is_closed(self.DAY))
+        self.assertEqual(rules.blackouts.blocked_mask(self.DAY), scheduling.interval_mask(12 * 60, 14 * 60))
+        self.assertEqual(rules.blackouts.blocked_mask(next_week), 0)
+
+        starts = scheduling.mask_to_minutes(rules.start_mask(self.DAY, 45))
+        usual = scheduling.mask_to_minutes(rules.start_mask(next_week, 45))
+        self.assertEqual(usual, list(range(9 * 60, 16 * 60 + 15 + 1, 15)))  # Same weekday, untouched
+        # Nothing may overlap 12:00-14:00: the last start before is 11:15, the first after 14:00
+        self.assertEqual(starts, [minute for minute in usual if minute + 45 <= 12 * 60 or minute >= 14 * 60])
+        self.assertIn(11 * 60 + 15, starts)
+        self.assertNotIn(11 * 60 + 30, starts)
+
+
+class RulesChangedTests(TestCase):
+    """rules_changed_on_commit() rebuilds once per commit, whatever was saved."""
+
+    def test_one_rebuild_per_commit(self):
+        with mock.patch.object(schedule_rules, 'rules_changed') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                for index in range(3):
+                    Consultant.objects.create(name=f'Consultant {index}')
+            self.assertEqual(rebuild.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Consultant.objects.create(name='Consultant 3')
+            self.assertEqual(rebuild.call_count, 2)
+
+    def test_rollback_does_not_swallow_the_next_rebuild(self):
+        with mock.patch.object(schedule_rules, 'rules_changed') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    Consultant.objects.create(name='Rolled back')
+                    raise RuntimeError
+            rebuild.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Consultant.objects.create(name='Kept')
+            rebuild.assert_called_once()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              CONSULTANT LANES
+# ══════════════════════════════════════════════════════════════════════════════
+
+class ConsultantCapacityTests(SchedulingTestCase):
+    """A time is offered while any consultant is free; the least loaded gets it."""
+
+    CONSULTANTS = 3
+
+    def book(self, index, start=None, consultant=None):
+        fields = booking_fields(index)
+        if consultant is not None:
+            return ConsultationBooking.objects.create(
+                appointment_date=self.day, appointment_time=start, consultant=consultant, **fields
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            booking, _ = scheduling.reserve_booking(self.day, start or self.start, 45, **fields)
+        return booking
+
+    def test_time_offered_until_every_consultant_is_booked(self):
+        for index in range(self.CONSULTANTS):
+            self.assertIn(self.minute, self.free_starts())
+            self.assertIsNotNone(self.book(index))
+        self.assertNotIn(self.minute, self.free_starts())
+        self.assertIsNone(self.book(99))
+
+        assigned = ConsultationBooking.objects.filter(appointment_date=self.day).values_list('consultant', flat=True)
+        self.assertEqual(sorted(assigned), [consultant.pk for consultant in self.consultants])
+
+    def test_pick_consultant_prefers_least_loaded(self):
+        first, second, third = self.consultants
+        self.book(1, time(14, 0), first)
+        self.book(2, time(15, 0), first)
+        self.book(3, time(14, 0), second)
+        # Cancelled bookings and other dates do not count towards the load
+        ConsultationBooking.objects.create(
+            appointment_date=self.day, appointment_time=time(16, 0), consultant=third, status='cancelled',
+            **booking_fields(4)
+        )
+        ConsultationBooking.objects.create(
+            appointment_date=self.day + timedelta(days=1), appointment_time=self.start, consultant=third,
+            **booking_fields(5)
+        )
+        self.assertEqual(scheduling.pick_consultant(self.day, self.minute, 45), third)
+
+        self.book(6, time(16, 30), third)
+        self.book(7, time(12, 0), third)
+        self.assertEqual(scheduling.pick_consultant(self.day, self.minute, 45), second)  # 1 vs 2 vs 2
+
+
+class LanePackingTests(SimpleTestCase):
+    """pack_lanes() and fold_lanes() round-trip per-consultant bitmaps."""
+
+    def test_pack_and_fold_round_trip(self):
+        masks = [
+            scheduling.interval_mask(9 * 60, 12 * 60),
+            0,
+            scheduling.interval_mask(13 * 60, 17 * 60),
+            scheduling.interval_mask(0, 24 * 60),
+            scheduling.interval_mask(10 * 60, 10 * 60 + 1),
+        ]
+        packed = scheduling.pack_lanes(masks)
+        lane = (1 << scheduling.LANE_BITS) - 1
+        for index, mask in enumerate(masks):
+            self.assertEqual(packed >> (index * scheduling.LANE_BITS) & lane, mask)
+
+        union = 0
+        for mask in masks:
+            union |= mask
+        self.assertEqual(scheduling.fold_lanes(packed), union)
+        self.assertEqual(scheduling.fold_lanes(scheduling.pack_lanes(masks[:1])), masks[0])
+
+    def test_erosion_never_joins_neighbouring_lanes(self):
+        # Lane 0 is free until midnight and lane 1 from midnight: no lane has 45 free minutes across it
+        packed = scheduling.pack_lanes([scheduling.interval_mask(24 * 60 - 30, 24 * 60), scheduling.interval_mask(0, 30)])
+        self.assertEqual(scheduling.erode(packed, 45), 0)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              ICS IMPORT
+# ══════════════════════════════════════════════════════════════════════════════
+
+def calendar_text(*events):
+    """An iCalendar file holding one VEVENT per block of content lines."""
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//Tests//EN']
+    for event in events:
+        lines += ['BEGIN:VEVENT', *event.strip().splitlines(), 'END:VEVENT']
+    return '\r\n'.join(lines + ['END:VCALENDAR']) + '\r\n'
+
+
+class ICSParserTests(SimpleTestCase):
+    """parse_ics(): recurrence expansion, overrides and time zones."""
+
+    WINDOW = (datetime(2030, 1, 1), datetime(2032, 1, 1))
+
+    def parse(self, *events):
+        return ics_import.parse_ics(calendar_text(*events), *self.WINDOW)
+
+    def starts(self, *events, key=('event', '')):
+        return [start for start, end in self.parse(*events)[key]['occurrences']]
+
+    def test_daily_with_count(self):
+        event = self.parse('UID:event\nDTSTART:20300311T100000\nDTEND:20300311T110000\nRRULE:FREQ=DAILY;COUNT=3')
+        self.assertEqual(event[('event', '')]['occurrences'], [
+            (datetime(2030, 3, day, 10), datetime(2030, 3, day, 11)) for day in (11, 12, 13)
+        ])
+        self.assertTrue(event[('event', '')]['recurring'])
+
+    def test_weekly_byday_until(self):
+        starts = self.starts(
+            'UID:event\nDTSTART:20300311T090000\nDURATION:PT30M\n'
+            'RRULE:FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20300325T090000'
+        )
+        self.assertEqual(starts, [datetime(2030, 3, day, 9) for day in (11, 13, 18, 20, 25)])
+
+    def test_monthly_skips_missing_days(self):
+        starts = self.starts('UID:event\nDTSTART:20300131T100000\nDURATION:PT1H\nRRULE:FREQ=MONTHLY;COUNT=3')
+        self.assertEqual(starts, [datetime(2030, 1, 31, 10), datetime(2030, 3, 31, 10), datetime(2030, 5, 31, 10)])
+
+    def test_yearly_all_day(self):
+        event = self.parse('UID:event\nDTSTART;VALUE=DATE:20300615\nRRULE:FREQ=YEARLY;COUNT=5')
+        self.assertEqual(event[('event', '')]['occurrences'], [
+            (datetime(2030, 6, 15), datetime(2030, 6, 16)),
+            (datetime(2031, 6, 15), datetime(2031, 6, 16)),  # Later years fall outside the window
+        ])
+
+    def test_exdate_removes_occurrences(self):
+        starts = self.starts(
+            'UID:event\nDTSTART:20300311T100000\nDURATION:PT1H\nRRULE:FREQ=DAILY;COUNT=5\n'
+            'EXDATE:20300312T100000,20300314T100000'
+        )
+        self.assertEqual(starts, [datetime(2030, 3, day, 10) for day in (11, 13, 15)])
+
+    def test_recurrence_id_replaces_its_occurrence(self):
+        series = 'UID:event\nDTSTART:20300311T100000\nDURATION:PT1H\nRRULE:FREQ=DAILY;COUNT=3'
+        moved = 'UID:event\nRECURRENCE-ID:20300312T100000\nDTSTART:20300312T150000\nDURATION:PT1H\nSEQUENCE:1'
+        events = self.parse(series, moved)
+
+        self.assertEqual(
+            [start for start, end in events[('event', '')]['occurrences']],
+            [datetime(2030, 3, 11, 10), datetime(2030, 3, 13, 10)],
+        )
+        override = events[('event', '2030-03-12T10:00:00')]
+        self.assertEqual(override['occurrences'], [(datetime(2030, 3, 12, 15), datetime(2030, 3, 12, 16))])
+        self.assertEqual(override['sequence'], 1)
+        self.assertFalse(override['recurring'])
+
+    def test_tzid_and_utc_become_site_local(self):
+        events = (
+            'UID:event\nDTSTART;TZID=America/New_York:20300114T090000\n'
+            'DTEND;TZID=America/New_York:20300114T100000',
+            'UID:utc\nDTSTART:20300114T100000Z\nDTEND:20300114T103000Z',
+        )
+        self.assertEqual(self.starts(*events), [datetime(2030, 1, 14, 14)])  # EST is UTC-5
+        with override_settings(TIME_ZONE='Asia/Kolkata'):
+            self.assertEqual(self.starts(*events), [datetime(2030, 1, 14, 19, 30)])
+            self.assertEqual(self.starts(*events, key=('utc', '')), [datetime(2030, 1, 14, 15, 30)])
+
+    def test_cancelled_and_transparent_events_are_free(self):
+        events = self.parse(
+            'UID:cancelled\nDTSTART:20300311T100000\nDURATION:PT1H\nSTATUS:CANCELLED',
+            'UID:free\nDTSTART:20300311T100000\nDURATION:PT1H\nTRANSP:TRANSPARENT',
+        )
+        self.assertEqual([event['occurrences'] for event in events.values()], [[], []])
+
+    def test_not_a_calendar(self):
+        with self.assertRaises(ics_import.ICSError):
+            ics_import.parse_ics('hello', *self.WINDOW)
+
+
+class ICSImportTests(TestCase):
+    """import_calendar(): incremental re-imports and the ExternalBusy rows they leave."""
+
+    TODAY = date(2030, 1, 1)
+    MEETING = 'UID:meeting\nDTSTART:20300311T100000\nDTEND:20300311T113000\nSEQUENCE:0'
+    STANDUP = 'UID:standup\nDTSTART:20300312T090000\nDURATION:PT15M\nRRULE:FREQ=DAILY;COUNT=2'
+
+    def setUp(self):
+        self.calendar = ExternalCalendar.objects.create(name='Office')
+
+    def import_events(self, *events):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ics_import.import_calendar(self.calendar, calendar_text(*events), today=self.TODAY)
+
+    def busy(self):
+        return list(ExternalBusy.objects.filter(calendar=self.calendar).values_list('date', 'start_time', 'end_time'))
+
+    def test_reimport_skips_unchanged_and_deletes_removed(self):
+        stats = self.import_events(self.MEETING, self.STANDUP)
+        self.assertEqual((stats['created'], stats['unchanged']), (2, 0))
+        self.assertEqual(stats['dates'], [date(2030, 3, 11), date(2030, 3, 12), date(2030, 3, 13)])
+        self.assertEqual(self.busy(), [
+            (date(2030, 3, 11), time(10, 0), time(11, 30)),
+            (date(2030, 3, 12), time(9, 0), time(9, 15)),
+            (date(2030, 3, 13), time(9, 0), time(9, 15)),
+        ])
+
+        stats = self.import_events(self.MEETING, self.STANDUP)
+        self.assertEqual((stats['created'], stats['updated'], stats['unchanged'], stats['deleted']), (0, 0, 2, 0))
+        self.assertEqual(stats['dates'], [])  # Nothing rebuilt
+
+        stats = self.import_events(self.STANDUP)
+        self.assertEqual((stats['unchanged'], stats['deleted']), (1, 1))
+        self.assertEqual(stats['dates'], [date(2030, 3, 11)])
+        self.assertEqual([row[0] for row in self.busy()], [date(2030, 3, 12), date(2030, 3, 13)])
+
+    def test_new_sequence_rebuilds_old_and_new_dates(self):
+        self.import_events(self.MEETING)
+        moved = 'UID:meeting\nDTSTART:20300314T140000\nDTEND:20300314T150000\nSEQUENCE:1'
+
+        stats = self.import_events(moved)
+        self.assertEqual(stats['updated'], 1)
+        self.assertEqual(stats['dates'], [date(2030, 3, 11), date(2030, 3, 14)])
+        self.assertEqual(self.busy(), [(date(2030, 3, 14), time(14, 0), time(15, 0))])
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EMAIL OUTBOX
+# ══════════════════════════════════════════════════════════════════════════════
+
+class FakeConnection:
+    """Email backend stand-in whose sends raise the queued errors in turn (None sends)."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.sent = []
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        self.sent.extend(messages)
+        return len(messages)
+
+
+class OutboxTests(TestCase):
+    """Error classification, retries, dead-lettering, replays and stale claims."""
+
+    def queue(self, count=1):
+        for index in range(count):
+            outbox.enqueue(EmailMessage(f'Message {index}', 'Body', 'from@example.com', ['to@example.com']))
+
+    def test_classify_error(self):
+        refused = smtplib.SMTPRecipientsRefused({'to@example.com': (550, b'No such user')})
+        cases = {
+            'permanent': [refused, smtplib.SMTPDataError(554, 'Rejected'), smtplib.SMTPSenderRefused(553, 'No', 'f')],
+            'transient': [smtplib.SMTPDataError(451, 'Try later'), ValueError('boom')],
+            'outage': [
+                smtplib.SMTPServerDisconnected('gone'), smtplib.SMTPConnectError(421, 'busy'),
+                smtplib.SMTPAuthenticationError(535, 'denied'), ConnectionRefusedError(), TimeoutError(),
+            ],
+        }
+        for kind, errors in cases.items():
+            for error in errors:
+                with self.subTest(error=error):
+                    self.assertEqual(outbox.classify_error(error), kind)
+
+    def test_backoff_grows_and_is_capped(self):
+        for attempts in range(1, 15):
+            delay = min(outbox.BACKOFF_MAX, outbox.BACKOFF_BASE * 2 ** (attempts - 1))
+            self.assertTrue(delay / 2 <= outbox.backoff_delay(attempts) <= delay)
+
+    def test_transient_and_permanent_failures(self):
+        self.queue(3)
+        rows = outbox.claim_batch('worker')
+        connection = FakeConnection(smtplib.SMTPDataError(451, 'Try later'), smtplib.SMTPDataError(554, 'Rejected'))
+
+        result = outbox.deliver(rows, connection)
+        self.assertEqual((result['retrying'], result['dead'], result['sent'], result['outage']), (1, 1, 1, False))
+        statuses = dict(OutboxMessage.objects.values_list('subject', 'status'))
+        self.assertEqual(statuses, {'Message 0': 'pending', 'Message 1': 'dead', 'Message 2': 'sent'})
+
+        retry = OutboxMessage.objects.get(subject='Message 0')
+        self.assertEqual(retry.attempts, 1)
+        self.assertGreater(retry.next_attempt_at, timezone.now())
+        self.assertEqual(outbox.claim_batch('worker'), [])  # Not due until its backoff passes
+
+    def test_outage_releases_the_rest_of_the_batch(self):
+        self.queue(4)
+        rows = outbox.claim_batch('worker')
+
+        result = outbox.deliver(rows, FakeConnection(None, smtplib.SMTPServerDisconnected('gone')))
+        self.assertEqual((result['sent'], result['retrying'], result['released']), (1, 1, 2))
+        self.assertTrue(result['outage'])
+
+        failed = OutboxMessage.objects.get(subject='Message 1')
+        self.assertEqual((failed.status, failed.attempts), ('pending', 1))
+        released = OutboxMessage.objects.filter(subject__in=['Message 2', 'Message 3'])
+        self.assertEqual(set(released.values_list('status', 'attempts', 'claimed_by')), {('pending', 0, '')})
+        self.assertEqual(len(outbox.claim_batch('worker')), 2)  # Due at once, attempts untouched
+
+    def test_max_attempts_dead_letters_and_replay_resets(self):
+        self.queue()
+        row = OutboxMessage.objects.get()
+        OutboxMessage.objects.filter(pk=row.pk).update(attempts=outbox.MAX_ATTEMPTS - 2)
+
+        for status in ('pending', 'dead'):
+            row.refresh_from_db()
+            self.assertEqual(outbox.record_failure(row, smtplib.SMTPDataError(451, 'Try later')), status)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('dead', outbox.MAX_ATTEMPTS))
+        self.assertIn('transient', row.last_error)
+
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:pankaj_outboxmessage_changelist'), {
+            'action': 'replay_dead_messages', '_selected_action': [row.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('pending', 0))
+        self.assertLessEqual(row.next_attempt_at, timezone.now())
+
+    def test_stale_claim_is_taken_over(self):
+        self.queue(2)
+        first, second = outbox.claim_batch('crashed')
+        self.assertEqual(outbox.claim_batch('worker'), [])
+
+        stale = timezone.now() - outbox.CLAIM_TIMEOUT - timedelta(seconds=1)
+        OutboxMessage.objects.filter(pk=first.pk).update(claimed_at=stale)
+        claimed = outbox.claim_batch('worker')
+        self.assertEqual([row.pk for row in claimed], [first.pk])
+        self.assertEqual(claimed[0].claimed_by, 'worker')
+        self.assertEqual(OutboxMessage.objects.get(pk=second.pk).claimed_by, 'crashed')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              EMAIL RENDERING
+# ══════════════════════════════════════════════════════════════════════════════
+
+class EmailRenderingTests(TestCase):
+    """Every message type renders, with the stylesheet inlined into its HTML part."""
+
+    ADMIN_TYPES = {'admin_new_booking', 'admin_booking_cancelled', 'admin_status_change', 'admin_digest'}
+
+    def setUp(self):
+        self.booking = ConsultationBooking.objects.create(
+            appointment_date=date.today() + timedelta(days=30), appointment_time=time(10, 0), **booking_fields()
+        )
+        stylesheet = (emails.TEMPLATE_DIR / emails.STYLESHEET).read_text(encoding='utf-8')
+        self.classes = {}  # Class name -> its stylesheet declarations
+        for tag, classes, _, _, declarations in emails.parse_css(stylesheet)[0]:
+            if tag is None and len(classes) == 1:
+                self.classes[next(iter(classes))] = declarations
+
+    def test_every_message_type_renders_inlined(self):
+        for name, build in emails.MESSAGE_TYPES.items():
+            with self.subTest(name):
+                message = build(self.booking)
+                self.assertTrue(message.subject)
+                self.assertNotIn('{{', message.body)
+                if name in self.ADMIN_TYPES:
+                    self.assertEqual(message.alternatives, [])  # Plain text only
+                    continue
+
+                (html, mimetype), = message.alternatives
+                self.assertEqual(mimetype, 'text/html')
+                self.assertNotIn('{{', html)
+                self.assertIn('font-family: Arial, sans-serif', re.search(r'<body[^>]*>', html).group(0))
+                tags = list(re.finditer(r'<[a-z]+\b[^>]*\sclass="([^"]*)"[^>]*>', html))
+                self.assertTrue(tags)
+                for tag in tags:
+                    style = re.search(r'\sstyle="([^"]*)"', tag.group(0))
+                    for class_name in tag.group(1).split():
+                        for prop, value in self.classes.get(class_name, []):
+                            self.assertIsNotNone(style, tag.group(0))
+                            self.assertIn(f'{prop}: ', style.group(1))
+
+    def test_element_style_wins_and_leftovers_stay_in_head(self):
+        css = '.box { color: red; padding: 4px; } p.box { color: blue; } @media (max-width: 600px) { .box { padding: 0; } }'
+        html = emails.inline_css(
+            '<html><head></head><body><p class="box" style="color: green">Hi</p><div class="box"></div></body></html>', css
+        )
+        self.assertIn('<p class="box" style="color: green; padding: 4px;">', html)
+        self.assertIn('<div class="box" style="color: red; padding: 4px;">', html)
+        self.assertIn('<style>\n@media (max-width: 600px)', html)
+
+    def test_templates_are_compiled_once(self):
+        loaded = Counter()
+        get_contents = emails.InliningLoader.get_contents
+
+        def counting(loader, origin):
+            loaded[origin.template_name] += 1
+            return get_contents(loader, origin)
+
+        with mock.patch.object(emails, '_engine', None), \
+                mock.patch.object(emails.InliningLoader, 'get_contents', counting):
+            for _ in range(3):
+                emails.status_change(self.booking, 'confirmed', 'pending')
+            self.assertIs(emails.engine(), emails.engine())
+        self.assertEqual(loaded, Counter({
+            'emails/status_change.txt': 1, 'emails/status_change.html': 1, 'emails/base.html': 1,
+        }))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#                              ADMIN DIGEST
+# ══════════════════════════════════════════════════════════════════════════════
+
+@override_settings(ADMIN_DIGEST_INTERVAL=60, ADMIN_DIGEST_URGENT_DAYS=0)
+class AdminDigestTests(TestCase):
+    """notify() buffers admin notifications; flush_due() mails them as digests."""
+
+    def booking(self, days_ahead=30, index=0):
+        return ConsultationBooking.objects.create(
+            appointment_date=timezone.localdate() + timedelta(days=days_ahead), appointment_time=time(10, 0),
+            **booking_fields(index)
+        )
+
+    def notify(self, booking):
+        return admin_digest.notify('new_booking', booking, emails.admin_new_booking(booking))
+
+    def test_notify_buffers_until_the_digest_is_due(self):
+        bookings = [self.booking(index=index) for index in range(3)]
+        self.assertEqual([self.notify(booking) for booking in bookings], [False] * 3)
+        self.assertEqual(AdminNotification.objects.count(), 3)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+        now = timezone.now()
+        self.assertEqual(admin_digest.flush_due(now), 0)  # Oldest event has not waited an interval
+        self.assertEqual(admin_digest.flush_due(now + timedelta(minutes=61)), 3)
+
+        digest = OutboxMessage.objects.get()
+        self.assertIn('3 update(s)', digest.subject)
+        for booking in bookings:
+            self.assertIn(str(booking.booking_id), digest.body)
+        self.assertEqual(set(AdminNotification.objects.values_list('digest', flat=True)), {digest.pk})
+        self.assertEqual(admin_digest.flush_due(now + timedelta(minutes=122)), 0)  # Nothing left
+
+    def test_urgent_appointments_bypass_the_digest(self):
+        self.assertTrue(self.notify(self.booking(days_ahead=0)))
+        with override_settings(ADMIN_DIGEST_URGENT_DAYS=2):
+            self.assertTrue(self.notify(self.booking(days_ahead=2, index=1)))
+            self.assertFalse(self.notify(self.booking(days_ahead=3, index=2)))
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+        self.assertEqual(AdminNotification.objects.count(), 1)
+
+    def test_disabled_digest_sends_at_once(self):
+        with override_settings(ADMIN_DIGEST_INTERVAL=0):
+            self.assertTrue(self.notify(self.booking()))
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        self.assertFalse(AdminNotification.objects.exists())
+
+    def test_max_events_splits_a_backlog(self):
+        booking = self.booking()
+        with admin_digest.batch():
+            for _ in range(7):
+                self.notify(booking)
+
+        with mock.patch.object(admin_digest, 'MAX_EVENTS', 3):
+            self.assertEqual(admin_digest.flush_due(timezone.now() + timedelta(minutes=61)), 7)
+        sizes = Counter(AdminNotification.objects.values_list('digest', flat=True))
+        self.assertEqual(sorted(sizes.values()), [1, 3, 3])
+        self.assertEqual(OutboxMessage.objects.count(), 3)
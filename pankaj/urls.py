@@ -30,6 +30,11 @@ urlpatterns = [
     # path('debug-testimonials/', views.debug_testimonials, name='debug_testimonials'),
     path('api/available-slots/', views.get_available_slots, name='available_slots'),
     path('api/date-availability/', views.check_date_availability, name='date_availability'),
+    path('api/calendar/', views.get_calendar_availability, name='calendar_availability'),
+    path('api/next-available/', views.get_next_available, name='next_available'),
+    path('api/slot-events/', views.slot_events_stream, name='slot_events'),
+    path('api/holds/', views.create_slot_hold, name='create_slot_hold'),
+    path('api/holds/<uuid:hold_id>/release/', views.release_slot_hold, name='release_slot_hold'),
     
     # Booking form submission
     path('booking/<str:duration>/submit/', views.booking, name='submit_booking'),
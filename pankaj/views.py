@@ -15,17 +15,30 @@ from django.contrib.admin.views.decorators import staff_member_required  # Restr
 from django.conf import settings  # Access Django settings
 from django.core.mail import send_mail, EmailMessage  # Email sending functionality
 from django.utils import timezone  # Timezone-aware datetime handling
-from django.http import HttpResponse, JsonResponse  # HTTP response types
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse  # HTTP response types
+from django.core.handlers.asgi import ASGIRequest  # Detect ASGI-served requests
+from django.core.exceptions import ValidationError  # Invalid date parameters
+from django.utils.cache import get_conditional_response  # ETag / If-None-Match handling
+from django.utils.http import http_date  # Last-Modified header formatting
 from django.core.cache import cache  # For caching
+from django.db import transaction  # Booking changes and their queued emails commit together
 from django.db.models import Avg  # For average calculation
 
 # Standard Library Imports
 from datetime import datetime, timedelta, date  # Date/time manipulation
 import time as time_module  # Rename time module to avoid conflict
+import uuid  # Slot hold IDs
 import logging  # Application logging
 
 # Application-Specific Imports
 from .models import BlogPost, Testimonial, ConsultationBooking, TimeSlotManager
+from . import scheduling  # Interval-based availability engine
+from . import availability_cache  # Cached availability responses
+from . import schedule_rules  # Working hours and start grids
+from . import slot_events  # Live slot updates (Server-Sent Events)
+from . import outbox  # Emails are queued, then sent by the run_outbox worker
+from . import emails  # Template-based email rendering
+from . import admin_digest  # Admin notifications are batched into digests
 # Comment out TestimonialSubmission import since we're hiding user submission
 # from .forms import TestimonialSubmissionForm  # Form for testimonial submissions
 # Application-Specific Imports
@@ -596,6 +609,7 @@ def booking(request, duration):
         'price_amount': details['price_amount'],
         'duration_minutes': details['duration_minutes'],
         'features': details['features'],
+        'packages': duration_details,  # Lets booking.js switch packages without a page load
     }
     
     return render(request, 'booking.html', context)
@@ -644,22 +658,6 @@ def handle_booking_submission(request, duration, details):
         client_email = request.POST.get('email')
         client_name = request.POST.get('name')
         
-        # Create a unique request fingerprint
-        request_fingerprint = f"{client_email}_{selected_date}_{selected_time}_{time_module.time()}"
-        
-        # Check for duplicate submission using session
-        session_key = f'booking_submission_{request_fingerprint}'
-        if request.session.get(session_key):
-            print(f"Duplicate submission detected for {client_email}")
-            return JsonResponse({
-                'success': False,
-                'error': 'Duplicate submission detected. Please wait.'
-            })
-        
-        # Mark this submission in session (expires in 30 seconds)
-        request.session[session_key] = True
-        request.session.set_expiry(30)
-        
         # Check for existing booking with same email, date, and time (last 5 minutes)
         five_minutes_ago = now - timedelta(minutes=5)
         existing_booking = ConsultationBooking.objects.filter(
@@ -680,44 +678,79 @@ def handle_booking_submission(request, duration, details):
         
         print(f"Creating NEW booking for: {client_name}")
         
-        # Create Booking Record with timezone-aware datetime
-        booking = ConsultationBooking.objects.create(
-            duration=duration,
-            price=details['price_amount'],
-            appointment_date=dt.date(),
-            appointment_time=dt.time(),
-            mode=request.POST.get('mode', 'video'),
-            name=client_name,
-            email=client_email,
-            phone=request.POST.get('phone'),
-            company=request.POST.get('company', ''),
-            designation=request.POST.get('designation', ''),
-            topic=request.POST.get('topic', ''),
-            newsletter_consent=request.POST.get('newsletter') == 'on',
-            status='pending',
-            is_paid=False,
-            payment_id=None,
-            created_at=timezone.now()  # Use timezone-aware datetime
-        )
+        # The client's own hold (if any) is ignored by the overlap check and consumed
+        hold_id = request.POST.get('hold_id') or None
+        try:
+            hold_id = uuid.UUID(hold_id) if hold_id else None
+        except ValueError:
+            hold_id = None
+        
+        # Reserve atomically: locks this date, re-checks overlap, then inserts.
+        # The confirmation emails are queued in the same transaction, so they
+        # exist exactly when the booking does.
+        with transaction.atomic():
+            booking, alternatives = scheduling.reserve_booking(
+                dt.date(), dt.time(), duration_minutes, now=now, hold_id=hold_id,
+                duration=duration,
+                price=details['price_amount'],
+                mode=request.POST.get('mode', 'video'),
+                name=client_name,
+                email=client_email,
+                phone=request.POST.get('phone'),
+                company=request.POST.get('company', ''),
+                designation=request.POST.get('designation', ''),
+                topic=request.POST.get('topic', ''),
+                newsletter_consent=request.POST.get('newsletter') == 'on',
+                status='pending',
+                is_paid=False,
+                payment_id=None,
+                created_at=timezone.now()  # Use timezone-aware datetime
+            )
+            
+            if booking is not None:
+                # Handle optional document upload
+                if 'documents' in request.FILES:
+                    booking.documents = request.FILES['documents']
+                    booking.save()
+                
+                # Queue initial booking confirmation emails
+                try:
+                    send_booking_confirmation_email(booking, details)
+                    logger.info(f"Confirmation emails queued for booking {booking.booking_id}")
+                except Exception:
+                    logger.exception(f"Error queueing booking emails for booking {booking.booking_id}")
+        
+        if booking is None:
+            # A double-submit that lost the race already has its booking
+            existing_booking = ConsultationBooking.objects.filter(
+                email=client_email,
+                appointment_date=dt.date(),
+                appointment_time=dt.time(),
+                created_at__gte=five_minutes_ago
+            ).first()
+            if existing_booking:
+                return JsonResponse({
+                    'success': True,
+                    'booking_id': str(existing_booking.booking_id),
+                    'redirect_url': f'/admin/pankaj/consultationbooking/',
+                    'message': 'Booking already exists. Redirecting to admin page.'
+                })
+            
+            logger.info(f"Slot conflict for {selected_date} {selected_time}")
+            return JsonResponse({
+                'success': False,
+                'conflict': True,
+                'error': 'This time is no longer available. Please choose another slot.',
+                'alternatives': build_slot_list(dt.date(), sorted(alternatives), duration_minutes)
+            }, status=409)
         
+        request.session.pop('slot_hold_id', None)
         print(f"Booking created: {booking.booking_id}")
         
-        # Handle optional document upload
-        if 'documents' in request.FILES:
-            booking.documents = request.FILES['documents']
-            booking.save()
-        
         print(f"=== BOOKING SUBMISSION COMPLETE ===")
         print(f"Booking ID: {booking.booking_id}")
         print(f"Status: {booking.status}")
         
-        # Send initial booking confirmation email
-        try:
-            send_booking_confirmation_email(booking, details)
-            print("Confirmation email sent")
-        except Exception as e:
-            print(f"Error sending booking emails: {e}")
-        
         # Return success - redirect to admin page
         return JsonResponse({
             'success': True,
@@ -737,7 +770,7 @@ def handle_booking_submission(request, duration, details):
 #                              EMAIL FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════════
 def send_booking_confirmation_email(booking, details):
-    """Send comprehensive booking confirmation email to both user and admin."""
+    """Queue the booking confirmation emails for both user and admin."""
     try:
         # Send to user
         send_user_booking_email(booking, details)
@@ -745,177 +778,33 @@ def send_booking_confirmation_email(booking, details):
         # Send to admin
         send_admin_booking_email(booking, details)
         
-        logger.info(f"✓ Booking confirmation emails sent for booking {booking.booking_id}")
+        logger.info(f"✓ Booking confirmation emails queued for booking {booking.booking_id}")
         return True
     except Exception as e:
-        logger.error(f"✗ Error sending booking emails: {str(e)}")
+        logger.error(f"✗ Error queueing booking emails: {str(e)}")
         return False
 
 def send_user_booking_email(booking, details):
-    """Send booking email to user with manual payment instructions."""
-    subject = f'Booking Confirmation - {booking.booking_id}'
-    
-    # Format date/time
-    appointment_date = booking.appointment_date.strftime('%A, %B %d, %Y')
-    appointment_time = booking.appointment_time.strftime('%I:%M %p')
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <body>
-        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-            <h2>Booking Confirmed!</h2>
-            <p>Dear {booking.name},</p>
-            <p>Your consultation has been booked successfully.</p>
-            
-            <div style="background: #f9f9f9; padding: 15px; margin: 15px 0;">
-                <h3>Booking Details</h3>
-                <p><strong>Booking ID:</strong> {booking.booking_id}</p>
-                <p><strong>Date:</strong> {appointment_date}</p>
-                <p><strong>Time:</strong> {appointment_time}</p>
-                <p><strong>Duration:</strong> {booking.get_duration_display()}</p>
-                <p><strong>Mode:</strong> {booking.get_mode_display()}</p>
-                <p><strong>Amount:</strong> ₹{booking.price}</p>
-                <p><strong>Status:</strong> Pending Manual Payment Confirmation</p>
-            </div>
-            
-            <p><strong>Payment Instructions:</strong></p>
-            <div style="background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 15px 0;">
-                <h4>📞 Manual Payment Process</h4>
-                <p>Our team will contact you within 24 hours to:</p>
-                <ol>
-                    <li>Confirm your booking details</li>
-                    <li>Provide payment instructions</li>
-                    <li>Answer any questions you may have</li>
-                </ol>
-                <p><strong>Payment Methods Available:</strong> Bank Transfer, UPI, Cash</p>
-            </div>
-            
-            <p><strong>Next Steps:</strong></p>
-            <ol>
-                <li>Our team will contact you for payment confirmation</li>
-                <li>Meeting details will be sent once payment is confirmed</li>
-                <li>Join 5 minutes before scheduled time</li>
-            </ol>
-            
-            <p>View your booking: <a href="http://127.0.0.1:8000/booking/{booking.booking_id}/">Booking Details</a></p>
-            
-            <p>If you have any urgent questions, please contact us at kpregtech@gmail.com</p>
-            
-            <p>Best regards,<br>
-            <strong>KP RegTech</strong></p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    email = EmailMessage(
-        subject=subject,
-        body=html_content,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[booking.email],
-    )
-    email.content_subtype = "html"
-    email.send()
+    """Queue the booking email to the user, with manual payment instructions."""
+    outbox.enqueue(emails.booking_confirmation(booking), booking=booking)
 
 
 def send_admin_booking_email(booking, details):
-    """Send booking notification to admin with manual payment note."""
-    subject = f'📅 New Booking: {booking.name} - {booking.booking_id}'
-    
-    message = f"""
-    NEW BOOKING RECEIVED - MANUAL PAYMENT REQUIRED
-    
-    Booking ID: {booking.booking_id}
-    Time: {booking.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-    
-    Client Information:
-    Name: {booking.name}
-    Email: {booking.email}
-    Phone: {booking.phone}
-    Company: {booking.company or 'N/A'}
-    
-    Appointment Details:
-    Date: {booking.appointment_date}
-    Time: {booking.appointment_time.strftime('%H:%M')}
-    Duration: {booking.get_duration_display()}
-    Mode: {booking.get_mode_display()}
-    Amount: ₹{booking.price}
-    
-    Topic: {booking.topic}
-    
-    IMPORTANT: Payment is manual
-    ----------------------------
-    Status: Pending Manual Payment
-    Payment Method: To be collected manually
-    
-    Action Required:
-    1. Contact client to confirm booking: {booking.phone}
-    2. Provide payment instructions
-    3. Collect payment manually
-    4. Update booking status in admin once payment received
-    
-    View booking: http://127.0.0.1:8000/admin/consultation/consultationbooking/
-    """
-    
-    admin_email = EmailMessage(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [settings.ADMIN_EMAIL]
-    )
-    admin_email.send()
+    """Notify admin of a new booking (at once when urgent, otherwise in the next digest)."""
+    admin_digest.notify('new_booking', booking, emails.admin_new_booking(booking))
 
 def send_admin_booking_notification(booking, details):
-    """Send detailed booking notification to admin."""
+    """Queue the new-booking notification to admin (same message as send_admin_booking_email)."""
     try:
-        subject = f'📅 New Booking: {booking.name} - {booking.booking_id}'
-        
-        message = f"""
-        NEW BOOKING RECEIVED
-        
-        Booking ID: {booking.booking_id}
-        Created: {booking.created_at}
-        
-        CLIENT:
-        Name: {booking.name}
-        Email: {booking.email}
-        Phone: {booking.phone}
-        Company: {booking.company or 'N/A'}
-        
-        APPOINTMENT:
-        Date: {booking.appointment_date}
-        Time: {booking.appointment_time}
-        Duration: {booking.get_duration_display()}
-        Mode: {booking.get_mode_display()}
-        
-        PAYMENT:
-        Amount: ₹{booking.price}
-        Status: {'Paid' if booking.is_paid else 'Pending'}
-        Method: {booking.payment.method if hasattr(booking, 'payment') else 'Not selected'}
-        
-        ADMIN ACTIONS:
-        View: https://yourdomain.com/admin/bookings/
-        Manage: https://yourdomain.com/admin/booking-management/
-        """
-        
-        # Send to admin
-        admin_email = EmailMessage(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [settings.ADMIN_EMAIL]
-        )
-        admin_email.send()
-        
+        send_admin_booking_email(booking, details)
         return True
     except Exception as e:
-        print(f"Error sending admin notification: {e}")
+        logger.error(f"✗ Error queueing admin notification: {str(e)}")
         return False
 
 def send_admin_notification_email(booking, details):
     """
-    Send booking notification email to admin.
+    Queue the new-booking notification to admin.
     
     Args:
         booking: ConsultationBooking instance
@@ -925,64 +814,17 @@ def send_admin_notification_email(booking, details):
         Boolean indicating success
     """
     try:
-        subject = f'📅 New Booking: {booking.name} - {booking.appointment_date}'
-        
-        # Calculate end time for admin reference
-        duration_minutes = int(booking.duration.replace('-min', ''))
-        start_dt = datetime.combine(booking.appointment_date, booking.appointment_time)
-        end_dt = start_dt + timedelta(minutes=duration_minutes)
-        
-        # Create detailed plain text message for admin
-        message = f"""
-        NEW CONSULTATION BOOKING
-        
-        Booking ID: {booking.booking_id}
-        Booking Time: {booking.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-        
-        CLIENT INFORMATION:
-        Name: {booking.name}
-        Email: {booking.email}
-        Phone: {booking.phone}
-        Company: {booking.company or 'N/A'}
-        Designation: {booking.designation or 'N/A'}
-        
-        APPOINTMENT DETAILS:
-        Date: {booking.appointment_date}
-        Time: {booking.appointment_time.strftime('%H:%M')} - {end_dt.strftime('%H:%M')}
-        Duration: {booking.get_duration_display()}
-        Mode: {booking.get_mode_display()}
-        Amount: ₹{booking.price}
-        
-        CONSULTATION TOPIC:
-        {booking.topic}
-        
-        ADDITIONAL NOTES:
-        Newsletter Consent: {'Yes' if booking.newsletter_consent else 'No'}
-        
-        ---
-        This is an automated notification from the booking system.
-        """
-        
-        # Send email to admin
-        admin_email = EmailMessage(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [settings.ADMIN_EMAIL]  # Use ADMIN_EMAIL from settings
-        )
-        admin_email.send()
-        
-        logger.info(f"✓ Admin notification sent for booking {booking.booking_id}")
+        send_admin_booking_email(booking, details)
+        logger.info(f"✓ Admin notification queued for booking {booking.booking_id}")
         return True
-        
     except Exception as e:
-        logger.error(f"✗ Error sending admin notification: {str(e)}")
+        logger.error(f"✗ Error queueing admin notification: {str(e)}")
         return False
 
 
 def send_cancellation_email(booking, reason=None):
     """
-    Send cancellation email to client.
+    Queue the cancellation email to the client (and notify admin).
     
     Args:
         booking: ConsultationBooking instance
@@ -992,101 +834,11 @@ def send_cancellation_email(booking, reason=None):
         Boolean indicating success
     """
     try:
-        subject = f'Consultation Booking Cancelled - {booking.booking_id}'
-        
-        # ─── Format Date/Time for Display ────────────────────────────────────
-        appointment_date = booking.appointment_date.strftime('%A, %B %d, %Y')
-        appointment_time = booking.appointment_time.strftime('%I:%M %p')
-        
-        # Calculate end time
-        duration_minutes = int(booking.duration.replace('-min', ''))
-        start_dt = datetime.combine(booking.appointment_date, booking.appointment_time)
-        end_dt = start_dt + timedelta(minutes=duration_minutes)
-        end_time = end_dt.strftime('%I:%M %p')
-        
         # Use provided reason or fall back to booking's reason
         cancellation_reason = reason or booking.cancellation_reason or "due to unforeseen circumstances"
         
-        # ─── Create HTML Email Content ────────────────────────────────────────
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #dc3545; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f9f9f9; }}
-                .details {{ background-color: white; padding: 20px; border-radius: 5px; margin: 20px 0; }}
-                .footer {{ text-align: center; padding: 20px; color: #777; font-size: 12px; }}
-                .cancellation-reason {{ background-color: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0; }}
-                .action-buttons {{ margin: 20px 0; text-align: center; }}
-                .btn {{ display: inline-block; padding: 10px 20px; background-color: #007bff; color: white; text-decoration: none; border-radius: 5px; margin: 5px; }}
-                .btn-reschedule {{ background-color: #28a745; }}
-                .btn-contact {{ background-color: #17a2b8; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Booking Cancelled</h1>
-                </div>
-                <div class="content">
-                    <p>Dear {booking.name},</p>
-                    <p>We regret to inform you that your consultation booking with KP RegTech has been cancelled.</p>
-                    
-                    <div class="details">
-                        <h3>Cancelled Appointment Details</h3>
-                        <p><strong>Booking ID:</strong> {booking.booking_id}</p>
-                        <p><strong>Original Date:</strong> {appointment_date}</p>
-                        <p><strong>Original Time:</strong> {appointment_time} - {end_time} ({duration_minutes} minutes)</p>
-                        <p><strong>Duration:</strong> {booking.get_duration_display()}</p>
-                        <p><strong>Mode:</strong> {booking.get_mode_display()}</p>
-                        <p><strong>Amount:</strong> ₹{booking.price}</p>
-                    </div>
-                    
-                    <div class="cancellation-reason">
-                        <h4>Cancellation Reason:</h4>
-                        <p>{cancellation_reason}</p>
-                    </div>
-                    
-                    <div class="action-buttons">
-                        <a href="https://anjali-bansal.com/services" class="btn btn-reschedule">Reschedule Appointment</a>
-                        <a href="mailto:kpregtech@gmail.com" class="btn btn-contact">Contact Support</a>
-                    </div>
-                    
-                    <h3>Next Steps:</h3>
-                    <ul>
-                        <li>You can book a new appointment through our <a href="https://anjali-bansal.com/services">services page</a></li>
-                        <li>If you have any questions, please contact us at <a href="mailto:kpregtech@gmail.com">kpregtech@gmail.com</a></li>
-                        <li>For refund inquiries, please email <a href="mailto:kpregtech@gmail.com">kpregtech@gmail.com</a></li>
-                        <li>We apologize for any inconvenience caused and hope to assist you in the future</li>
-                    </ul>
-                    
-                    <p>Best regards,<br>
-                    <strong>KP RegTech</strong><br>
-                    </p>
-                </div>
-                <div class="footer">
-                    <p>This is an automated email. Please do not reply to this message.</p>
-                    <p>© {datetime.now().year} KP RegTech. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # ─── Send Email to Client ─────────────────────────────────────────────
-        email_to_client = EmailMessage(
-            subject=subject,
-            body=html_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[booking.email],
-        )
-        email_to_client.content_subtype = "html"
-        email_to_client.send()
-        
-        logger.info(f"✓ Cancellation email sent to {booking.email} for booking {booking.booking_id}")
+        outbox.enqueue(emails.booking_cancelled(booking, cancellation_reason), booking=booking)
+        logger.info(f"✓ Cancellation email queued for {booking.email} for booking {booking.booking_id}")
         
         # Also notify admin about cancellation
         send_admin_cancellation_notification(booking, cancellation_reason)
@@ -1094,13 +846,13 @@ def send_cancellation_email(booking, reason=None):
         return True
         
     except Exception as e:
-        logger.error(f"✗ Error sending cancellation email for booking {booking.booking_id}: {str(e)}")
+        logger.error(f"✗ Error queueing cancellation email for booking {booking.booking_id}: {str(e)}")
         return False
 
 
 def send_admin_cancellation_notification(booking, reason):
     """
-    Send cancellation notification email to admin.
+    Notify admin of a cancellation (at once when urgent, otherwise in the next digest).
     
     Args:
         booking: ConsultationBooking instance
@@ -1110,60 +862,19 @@ def send_admin_cancellation_notification(booking, reason):
         Boolean indicating success
     """
     try:
-        subject = f'⚠️ Booking Cancelled: {booking.name} - {booking.booking_id}'
-        
-        # Create detailed message for admin
-        message = f"""
-        BOOKING CANCELLATION NOTIFICATION
-        
-        Cancelled Booking ID: {booking.booking_id}
-        Cancellation Time: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
-        
-        CLIENT INFORMATION:
-        Name: {booking.name}
-        Email: {booking.email}
-        Phone: {booking.phone}
-        Company: {booking.company or 'N/A'}
-        
-        ORIGINAL APPOINTMENT DETAILS:
-        Date: {booking.appointment_date}
-        Time: {booking.appointment_time.strftime('%H:%M')}
-        Duration: {booking.get_duration_display()}
-        Mode: {booking.get_mode_display()}
-        Amount: ₹{booking.price}
-        
-        CANCELLATION REASON:
-        {reason}
-        
-        BOOKING HISTORY:
-        Created: {booking.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-        Confirmed: {booking.confirmed_at.strftime('%Y-%m-%d %H:%M:%S') if booking.confirmed_at else 'N/A'}
-        Cancelled: {booking.cancelled_at.strftime('%Y-%m-%d %H:%M:%S') if booking.cancelled_at else 'N/A'}
-        
-        ---
-        This is an automated notification from the booking system.
-        """
-        
-        # Send email to admin
-        admin_email = EmailMessage(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [settings.ADMIN_EMAIL]
-        )
-        admin_email.send()
-        
-        logger.info(f"✓ Admin cancellation notification sent for booking {booking.booking_id}")
+        sent_now = admin_digest.notify('cancelled', booking, emails.admin_booking_cancelled(booking, reason))
+        logger.info(f"✓ Admin cancellation notification {'queued' if sent_now else 'added to the digest'} "
+                    f"for booking {booking.booking_id}")
         return True
         
     except Exception as e:
-        logger.error(f"✗ Error sending admin cancellation notification: {str(e)}")
+        logger.error(f"✗ Error queueing admin cancellation notification: {str(e)}")
         return False
 
 
 def send_status_change_email(booking, new_status, old_status=None):
     """
-    Send email notification when booking status changes.
+    Queue the status change email to the client (and notify admin).
     
     Args:
         booking: ConsultationBooking instance
@@ -1174,187 +885,8 @@ def send_status_change_email(booking, new_status, old_status=None):
         Boolean indicating success
     """
     try:
-        # Status display mapping for user-friendly text
-        status_display = {
-            'pending': 'Pending Review',
-            'confirmed': 'Confirmed',
-            'completed': 'Completed',
-            'cancelled': 'Cancelled'
-        }
-        
-        # ─── Format Date/Time for Display ────────────────────────────────────
-        appointment_date = booking.appointment_date.strftime('%A, %B %d, %Y')
-        appointment_time = booking.appointment_time.strftime('%I:%M %p')
-        
-        # Calculate end time
-        duration_minutes = int(booking.duration.replace('-min', ''))
-        start_dt = datetime.combine(booking.appointment_date, booking.appointment_time)
-        end_dt = start_dt + timedelta(minutes=duration_minutes)
-        end_time = end_dt.strftime('%I:%M %p')
-        
-        # Email subject
-        subject = f'Booking Status Update - {status_display[new_status]} - {booking.booking_id}'
-        
-        # ─── Configure Email Content Based on Status ──────────────────────────
-        # ALWAYS SEND EMAIL FOR STATUS CHANGE, REGARDLESS OF PREVIOUS STATUS
-        
-        if new_status == 'pending':
-            status_color = '#ffc107'  # Yellow
-            status_icon = '⏳'
-            title = 'Booking Under Review'
-            message = f"""Your booking is now <strong>Under Review</strong>."""
-            instructions = """
-            <p><strong>What happens next?</strong></p>
-            <ul>
-                <li>We're reviewing your booking request</li>
-                <li>You'll receive a confirmation email once approved</li>
-                <li>No action is required from you at this time</li>
-            </ul>
-            """
-            
-        elif new_status == 'confirmed':
-            status_color = '#28a745'  # Green
-            status_icon = '✅'
-            title = 'Booking Confirmed!'
-            message = f"""Your booking has been <strong>Confirmed</strong>."""
-            instructions = """
-            <p><strong>Important Notes:</strong></p>
-            <ul>
-                <li>Please join the meeting 5 minutes before the scheduled time</li>
-                <li>Have your documents ready for discussion</li>
-                
-                <li>Meeting link/details will be sent 1 hour before the appointment</li>
-                <li>Payment should be done during the meeting through given phone number or upi id</li>
-                <li>You can reschedule up to 24 hours before the appointment</li>
-            </ul>
-            """
-            
-        elif new_status == 'completed':
-            status_color = '#17a2b8'  # Teal
-            status_icon = '🏁'
-            title = 'Consultation Completed'
-            message = f"""Your consultation has been marked as <strong>Completed</strong>."""
-            instructions = """
-            <p><strong>Thank you for your consultation!</strong></p>
-            <ul>
-                <li>We hope you found the session valuable</li>
-                <li>Please don't hesitate to reach out if you have follow-up questions</li>
-                <li>Consider leaving a testimonial about your experience</li>
-            </ul>
-            """
-            # Add feedback request section
-            instructions += """
-            <div style="background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 15px 0;">
-                <h4>📝 Share Your Experience</h4>
-                <p>We value your feedback! Please consider sharing your experience:</p>
-                <a href="https://anjali-bansal.com/testimonials/submit/" 
-                   style="display: inline-block; background: #007bff; color: white; padding: 10px 20px; 
-                          text-decoration: none; border-radius: 5px; margin-top: 10px;">
-                   Submit Testimonial
-                </a>
-            </div>
-            """
-            
-        elif new_status == 'cancelled':
-            status_color = '#dc3545'  # Red
-            status_icon = '❌'
-            title = 'Booking Cancelled'
-            message = f"""Your booking has been <strong>Cancelled</strong>."""
-            cancellation_reason = booking.cancellation_reason or "due to unforeseen circumstances"
-            instructions = f"""
-            <div style="background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 20px 0;">
-                <h4>Cancellation Reason:</h4>
-                <p>{cancellation_reason}</p>
-            </div>
-            <p><strong>Next Steps:</strong></p>
-            <ul>
-                <li>You can book a new appointment through our <a href="https://anjali-bansal.com/services">services page</a></li>
-                <li>If you have any questions, please contact us</li>
-            </ul>
-            """
-        else:
-            # Default for unknown status
-            status_color = '#6c757d'  # Gray
-            status_icon = 'ℹ️'
-            title = f'Booking Status Updated'
-            message = f"""Your booking status has been updated to <strong>{status_display[new_status]}</strong>."""
-            instructions = ""
-        
-        # ─── Add Status Change Note (if old_status provided) ──────────────────
-        status_change_note = ""
-        if old_status and old_status != new_status:
-            status_change_note = f"""
-            <div style="background: #e9ecef; padding: 10px; border-radius: 5px; margin: 10px 0; font-size: 14px;">
-                <strong>Status Changed:</strong> {status_display[old_status]} → {status_display[new_status]}
-            </div>
-            """
-        
-        # ─── Create HTML Email Content ────────────────────────────────────────
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: {status_color}; color: white; padding: 20px; text-align: center; }}
-                .content {{ padding: 20px; background-color: #f9f9f9; }}
-                .details {{ background-color: white; padding: 20px; border-radius: 5px; margin: 20px 0; }}
-                .footer {{ text-align: center; padding: 20px; color: #777; font-size: 12px; }}
-                .status-badge {{ display: inline-block; background: {status_color}; color: white; 
-                                padding: 5px 10px; border-radius: 3px; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{status_icon} {title}</h1>
-                </div>
-                <div class="content">
-                    <p>Dear {booking.name},</p>
-                    <p>{message}</p>
-                    
-                    {status_change_note}
-                    
-                    <div class="details">
-                        <h3>Appointment Details</h3>
-                        <p><strong>Booking ID:</strong> {booking.booking_id}</p>
-                        <p><strong>Status:</strong> <span class="status-badge">{status_display[new_status]}</span></p>
-                        <p><strong>Date:</strong> {appointment_date}</p>
-                        <p><strong>Time:</strong> {appointment_time} - {end_time} ({duration_minutes} minutes)</p>
-                        <p><strong>Mode:</strong> {booking.get_mode_display()}</p>
-                        <p><strong>Topic:</strong> {booking.topic[:100]}{'...' if len(booking.topic) > 100 else ''}</p>
-                    </div>
-                    
-                    {instructions}
-                    
-                    <p>If you have any questions about this status change, please contact us at 
-                       <a href="mailto:kpregtech@gmail.com">kpregtech@gmail.com</a></p>
-                    
-                    <p>Best regards,<br>
-                    <strong>KP RegTech</strong><br>
-                    </p>
-                </div>
-                <div class="footer">
-                    <p>This is an automated email. Please do not reply to this message.</p>
-                    <p>© {datetime.now().year} KP RegTech. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # ─── Send Status Change Email ─────────────────────────────────────────
-        email = EmailMessage(
-            subject=subject,
-            body=html_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[booking.email],
-        )
-        email.content_subtype = "html"
-        email.send()
-        
-        logger.info(f"✓ Status change email sent to {booking.email} - Status: {old_status} → {new_status}")
+        outbox.enqueue(emails.status_change(booking, new_status, old_status), booking=booking)
+        logger.info(f"✓ Status change email queued for {booking.email} - Status: {old_status} → {new_status}")
         
         # Also notify admin about status change
         send_admin_status_notification(booking, new_status, old_status)
@@ -1362,13 +894,13 @@ def send_status_change_email(booking, new_status, old_status=None):
         return True
         
     except Exception as e:
-        logger.error(f"✗ Error sending status change email for booking {booking.booking_id}: {str(e)}")
+        logger.error(f"✗ Error queueing status change email for booking {booking.booking_id}: {str(e)}")
         return False
 
 
 def send_admin_status_notification(booking, new_status, old_status):
     """
-    Send status change notification email to admin.
+    Notify admin of a status change (at once when urgent, otherwise in the next digest).
     
     Args:
         booking: ConsultationBooking instance
@@ -1379,62 +911,14 @@ def send_admin_status_notification(booking, new_status, old_status):
         Boolean indicating success
     """
     try:
-        # Status display mapping
-        status_display = {
-            'pending': 'Pending',
-            'confirmed': 'Confirmed',
-            'completed': 'Completed',
-            'cancelled': 'Cancelled'
-        }
-        
-        subject = f'📊 Status Changed: {booking.name} - {status_display[new_status]}'
-        
-        # Create detailed message for admin
-        message = f"""
-        BOOKING STATUS CHANGE NOTIFICATION
-        
-        Booking ID: {booking.booking_id}
-        Status Changed: {status_display[old_status]} → {status_display[new_status]}
-        Change Time: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
-        
-        CLIENT INFORMATION:
-        Name: {booking.name}
-        Email: {booking.email}
-        Phone: {booking.phone}
-        Company: {booking.company or 'N/A'}
-        
-        APPOINTMENT DETAILS:
-        Date: {booking.appointment_date}
-        Time: {booking.appointment_time.strftime('%H:%M')}
-        Duration: {booking.get_duration_display()}
-        Mode: {booking.get_mode_display()}
-        Amount: ₹{booking.price}
-        
-        BOOKING HISTORY:
-        Created: {booking.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-        Pending: {booking.pending_at.strftime('%Y-%m-%d %H:%M:%S') if booking.pending_at else 'N/A'}
-        Confirmed: {booking.confirmed_at.strftime('%Y-%m-%d %H:%M:%S') if booking.confirmed_at else 'N/A'}
-        Completed: {booking.completed_at.strftime('%Y-%m-%d %H:%M:%S') if booking.completed_at else 'N/A'}
-        Cancelled: {booking.cancelled_at.strftime('%Y-%m-%d %H:%M:%S') if booking.cancelled_at else 'N/A'}
-        
-        ---
-        This is an automated notification from the booking system.
-        """
-        
-        # Send email to admin
-        admin_email = EmailMessage(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [settings.ADMIN_EMAIL]
-        )
-        admin_email.send()
-        
-        logger.info(f"✓ Admin status change notification sent for booking {booking.booking_id}")
+        sent_now = admin_digest.notify('status_change', booking,
+                                       emails.admin_status_change(booking, new_status, old_status))
+        logger.info(f"✓ Admin status change notification {'queued' if sent_now else 'added to the digest'} "
+                    f"for booking {booking.booking_id}")
         return True
         
     except Exception as e:
-        logger.error(f"✗ Error sending admin status change notification: {str(e)}")
+        logger.error(f"✗ Error queueing admin status change notification: {str(e)}")
         return False
 
 
@@ -1511,15 +995,16 @@ def admin_cancel_booking(request, booking_id):
         # Get cancellation reason from form
         reason = request.POST.get('reason', '')
         
-        # Update booking status
-        booking.status = 'cancelled'
-        booking.cancellation_reason = reason
-        booking.cancelled_at = timezone.now()
-        booking.save()
-        
-        # Send cancellation email to client
-        send_cancellation_email(booking, reason)
-        send_admin_status_notification(booking, 'cancelled', 'confirmed')
+        # Update booking status and queue the emails in one transaction
+        with transaction.atomic():
+            booking.status = 'cancelled'
+            booking.cancellation_reason = reason
+            booking.cancelled_at = timezone.now()
+            booking.save()
+            
+            # Queue cancellation email to client
+            send_cancellation_email(booking, reason)
+            send_admin_status_notification(booking, 'cancelled', 'confirmed')
         
         # Success message and redirect
         messages.success(request, f'Booking {booking_id} has been cancelled and notification sent to client.')
@@ -1549,14 +1034,15 @@ def admin_complete_booking(request, booking_id):
         # Store old status for notification
         old_status = booking.status
         
-        # Update booking status
-        booking.status = 'completed'
-        booking.completed_at = timezone.now()
-        booking.save()
-        
-        # Send completion notification to client
-        send_status_change_email(booking, 'completed', old_status)
-        send_admin_status_notification(booking, 'completed', old_status)
+        # Update booking status and queue the emails in one transaction
+        with transaction.atomic():
+            booking.status = 'completed'
+            booking.completed_at = timezone.now()
+            booking.save()
+            
+            # Queue completion notification to client
+            send_status_change_email(booking, 'completed', old_status)
+            send_admin_status_notification(booking, 'completed', old_status)
         
         # Success message and redirect
         messages.success(request, f'Booking {booking_id} has been marked as completed and notification sent to client.')
@@ -1586,14 +1072,15 @@ def admin_mark_pending(request, booking_id):
         # Store old status for notification
         old_status = booking.status
         
-        # Update booking status
-        booking.status = 'pending'
-        booking.pending_at = timezone.now()
-        booking.save()
-        
-        # Send pending notification to client
-        send_status_change_email(booking, 'pending', old_status)
-        send_admin_status_notification(booking, 'pending', old_status)
+        # Update booking status and queue the emails in one transaction
+        with transaction.atomic():
+            booking.status = 'pending'
+            booking.pending_at = timezone.now()
+            booking.save()
+            
+            # Queue pending notification to client
+            send_status_change_email(booking, 'pending', old_status)
+            send_admin_status_notification(booking, 'pending', old_status)
         
         # Success message and redirect
         messages.success(request, f'Booking {booking_id} has been marked as pending and notification sent to client.')
@@ -1614,6 +1101,10 @@ def admin_mark_pending(request, booking_id):
 def get_available_slots(request):
     """
     API endpoint to get available time slots for a specific date.
+    
+    ``duration`` may list several durations ('45,30,60'): the first one fills
+    available_slots and every one is returned under slots_by_duration, all
+    from one read of the day summary.
     """
     # ─── Parse Query Parameters ───────────────────────────────────────────────
     selected_date = request.GET.get('date')
@@ -1629,103 +1120,61 @@ def get_available_slots(request):
     except ValueError:
         return JsonResponse({'error': 'Invalid date format'}, status=400)
     
-    # Validate duration parameter
-    try:
-        duration_minutes = int(duration)
-        if duration_minutes <= 0:
-            duration_minutes = 45  # Default to 45 if invalid
-    except (ValueError, TypeError):
-        # If duration is not a number, use default
-        duration_minutes = 45
+    # Validate duration parameter (45 for anything unparseable)
+    durations = scheduling.parse_durations(duration)
+    duration_minutes = durations[0]
     
     # Check if date is in the past
     if selected_date_obj < date.today():
-        return JsonResponse({
+        response = {
             'date': selected_date,
             'duration': duration_minutes,
             'available_slots': []  # No slots for past dates
-        })
-    
-    # ... rest of the function remains the same
+        }
+        if len(durations) > 1:
+            response['slots_by_duration'] = {str(minutes): [] for minutes in durations}
+        return JsonResponse(response)
     
     # ─── Configure Time Parameters ────────────────────────────────────────────
-    # Convert duration to integer
-    duration_minutes = int(duration)
-    
-    # Define working hours (9 AM to 5 PM)
-    start_hour = 9
-    end_hour = 17
+    # Working hours come from the weekday's schedule rules
+    working_hours = schedule_rules.get_rules().hours_label(selected_date_obj)
     
-    # Get current time for checking today's availability
+    # Get current time; the horizon date's slots depend on it (lead time included)
     now = datetime.now()
-    is_today = selected_date_obj == now.date()
+    is_today = selected_date_obj == scheduling.booking_horizon(now).date()
     
-    # Get all non-cancelled bookings for the selected date
-    bookings = ConsultationBooking.objects.filter(
-        appointment_date=selected_date_obj
-    ).exclude(status='cancelled').order_by('appointment_time')
+    # ─── Conditional Request ──────────────────────────────────────────────────
+    not_modified, validator_headers = availability_validators(request, [selected_date_obj], is_today)
+    if not_modified is not None:
+        return not_modified
     
     # ─── Generate Available Slots ─────────────────────────────────────────────
-    available_slots = []
-    
-    # Start from beginning of day at 9:00 AM
-    current_time = datetime.combine(selected_date_obj, datetime.min.time())
-    current_time = current_time.replace(hour=start_hour, minute=0)
-    end_time = current_time.replace(hour=end_hour, minute=0)
-    
-    # Convert duration to timedelta for calculations
-    duration_td = timedelta(minutes=duration_minutes)
-    
-    # Generate slots every 15 minutes within working hours
-    while current_time.time() <= end_time.time():
-        slot_end = current_time + duration_td
-        
-        # Skip past time slots for today
-        if is_today and current_time.time() < now.time():
-            current_time += timedelta(minutes=15)
-            continue
-        
-        # Check if slot ends before working hours end
-        if slot_end.time() <= end_time.time():
-            # Check for overlap with existing bookings (with 15 min buffer)
-            is_available = True
-            
-            for booking in bookings:
-                booking_start = datetime.combine(selected_date_obj, booking.appointment_time)
-                booking_duration = timedelta(minutes=int(booking.duration.replace('-min', '')))
-                booking_end = booking_start + booking_duration + timedelta(minutes=15)  # Add 15 min buffer
-                
-                # Check for time overlap
-                if (current_time < booking_end and slot_end > booking_start):
-                    is_available = False
-                    break
-            
-            if is_available:
-                # Generate a unique slot ID
-                slot_id = f"{selected_date.replace('-', '')}{current_time.hour:02d}{current_time.minute:02d}"
-                
-                available_slots.append({
-                    'id': slot_id,
-                    'start_time': current_time.strftime('%H:%M'),
-                    'end_time': slot_end.strftime('%H:%M'),
-                    'duration': str(duration_minutes),
-                    'max_bookings': 1,  # Each slot is unique
-                    'available': 1,
-                    'display': f"{current_time.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
-                })
-        
-        # Move to next 15-minute interval
-        current_time += timedelta(minutes=15)
+    # Served from the availability cache per duration; the first miss computes
+    # every requested duration from one day summary read
+    free_starts = {}
+    
+    def slots_for(minutes):
+        if not free_starts:
+            free_starts.update(scheduling.get_free_starts_many(selected_date_obj, durations, now))
+        return build_slot_list(selected_date_obj, free_starts[minutes], minutes)
+    
+    slots_by_duration = {
+        minutes: availability_cache.get_day(selected_date_obj, minutes, lambda minutes=minutes: slots_for(minutes))
+        for minutes in durations
+    }
     
     # ─── Return JSON Response ─────────────────────────────────────────────────
-    return JsonResponse({
+    response = {
         'date': selected_date,
         'duration': duration,
-        'available_slots': available_slots,
-        'working_hours': f"{start_hour}:00 - {end_hour}:00",
+        'available_slots': slots_by_duration[duration_minutes],
+        'working_hours': working_hours,
         'is_today': is_today,
         'current_time': now.strftime('%H:%M') if is_today else None
-    })
+    }
+    if len(durations) > 1:
+        response['slots_by_duration'] = {str(minutes): slots for minutes, slots in slots_by_duration.items()}
+    return JsonResponse(response, headers=validator_headers)
 
 def check_date_availability(request):
     """
@@ -1734,7 +1183,9 @@ def check_date_availability(request):
     Query Parameters:
         - year: Year (default: current year)
         - month: Month (1-12, default: current month)
-        - duration: Duration in minutes (default: 45)
+        - duration: Duration in minutes (default: 45), or a comma-separated
+          list whose first entry fills has_availability and whose entries
+          are all flagged under each date's availability
     
     Returns:
         JSON response with availability for each date in the month
@@ -1744,14 +1195,10 @@ def check_date_availability(request):
     month = int(request.GET.get('month', datetime.now().month))
     duration = request.GET.get('duration', '45')
     
-    # Validate duration parameter
-    try:
-        duration_minutes = int(duration)
-        if duration_minutes <= 0:
-            duration_minutes = 45  # Default to 45 if invalid
-    except (ValueError, TypeError):
-        # If duration is not a number, use default
-        duration_minutes = 45
+    # Validate duration parameter (45 for anything unparseable)
+    durations = scheduling.parse_durations(duration)
+    duration_minutes = durations[0]
+    extra_durations = durations[1:]
     
     # ─── Calculate Month Boundaries ───────────────────────────────────────────
     start_date = date(year, month, 1)  # First day of month
@@ -1762,68 +1209,357 @@ def check_date_availability(request):
     else:
         end_date = date(year, month + 1, 1)
     
+    # ─── Conditional Request ──────────────────────────────────────────────────
+    not_modified, validator_headers = availability_validators(request, [(year, month)])
+    if not_modified is not None:
+        return not_modified
+    
     # ─── Check Availability for Each Date ─────────────────────────────────────
-    dates = []
-    current_date = start_date
-    
-    # Iterate through all dates in the month
-    while current_date < end_date:
-        # Skip past dates
-        if current_date < date.today():
-            dates.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'day': current_date.day,
-                'has_availability': False,
-                'is_past': True
-            })
-        else:
-            # Check if this date has any available slots
-            has_availability = False
-            
-            # Check every 15 minutes within working hours (9 AM to 5 PM)
-            for hour in range(9, 17):
-                for minute in [0, 15, 30, 45]:
-                    # Use datetime.time class instead of time() function
-                    from datetime import time as time_class
-                    check_time = time_class(hour, minute)
-                    
-                    # Calculate if slot fits in working hours
-                    duration_td = timedelta(minutes=duration_minutes)
-                    start_dt = datetime.combine(current_date, check_time)
-                    end_dt = start_dt + duration_td
-                    
-                    # Slot must end before 5 PM
-                    if end_dt.time() <= time_class(17, 0):
-                        # Check if time is available
-                        if is_time_available(current_date, check_time, duration_minutes):
-                            has_availability = True
-                            break  # Found one available slot, no need to check further
-                
-                if has_availability:
-                    break  # Date has availability, move to next date
-            
-            # Add date to results
-            dates.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'day': current_date.day,
-                'has_availability': has_availability,
-                'is_past': False
-            })
-        
-        # Move to next day
-        current_date += timedelta(days=1)
+    # Served from the availability cache; read from the day summaries on a miss
+    dates = availability_cache.get_month(
+        year, month, ','.join(map(str, durations)),
+        lambda: scheduling.month_availability(start_date, end_date, duration_minutes, durations=extra_durations)
+    )
     
     # ─── Return JSON Response ─────────────────────────────────────────────────
-    return JsonResponse({
+    response = {
         'year': year,
         'month': month,
         'duration': duration_minutes,
         'dates': dates
-    })
+    }
+    if extra_durations:
+        response['durations'] = durations
+    return JsonResponse(response, headers=validator_headers)
+def get_calendar_availability(request):
+    """
+    API endpoint returning a month's availability plus one day's time slots.
+    
+    Replaces the separate date-availability and available-slots round trips
+    made by booking.js on page load and month change.
+    
+    Query Parameters:
+        - year: Year (default: current year)
+        - month: Month (1-12, default: current month)
+        - duration: Duration in minutes (default: 45), or a comma-separated
+          list whose first entry drives the month and whose entries all get
+          a slot list under slots_by_duration
+        - date: Date to list slots for (default: first available date)
+    
+    Returns:
+        JSON response with per-date availability for 30/45/60 minutes and
+        the slot list for the requested or first available date
+    """
+    # ─── Parse Query Parameters ───────────────────────────────────────────────
+    now = datetime.now()
+    try:
+        year = int(request.GET.get('year', now.year))
+        month = int(request.GET.get('month', now.month))
+        date(year, month, 1)
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Invalid year or month'}, status=400)
+    
+    durations = scheduling.parse_durations(request.GET.get('duration', '45'))
+    duration_minutes = durations[0]
+    
+    selected_date_obj = None
+    if request.GET.get('date'):
+        try:
+            selected_date_obj = datetime.strptime(request.GET['date'], '%Y-%m-%d').date()
+        except ValueError:
+            return JsonResponse({'error': 'Invalid date format'}, status=400)
+    
+    # ─── Conditional Request ──────────────────────────────────────────────────
+    scopes = [(year, month)]
+    if selected_date_obj and (selected_date_obj.year, selected_date_obj.month) != (year, month):
+        scopes.append(selected_date_obj)
+    horizon = scheduling.booking_horizon(now).date()
+    time_dependent = (year, month) == (horizon.year, horizon.month) or selected_date_obj == horizon
+    not_modified, validator_headers = availability_validators(request, scopes, time_dependent)
+    if not_modified is not None:
+        return not_modified
+    
+    # ─── Compute Month + Slots From One Summary Read ──────────────────────────
+    payload = availability_cache.get_calendar(
+        year, month, ','.join(map(str, durations)), selected_date_obj,
+        lambda: build_calendar_payload(year, month, duration_minutes, selected_date_obj, now, durations[1:])
+    )
+    is_today = payload['slots_date'] == horizon.strftime('%Y-%m-%d')
+    hours_date = datetime.strptime(payload['slots_date'], '%Y-%m-%d').date() if payload['slots_date'] else horizon
+    
+    # ─── Return JSON Response ─────────────────────────────────────────────────
+    return JsonResponse({
+        'year': year,
+        'month': month,
+        'duration': duration_minutes,
+        'durations': list(scheduling.STANDARD_DURATIONS),
+        'dates': payload['dates'],
+        'slots_date': payload['slots_date'],
+        'available_slots': payload['available_slots'],
+        **({'slots_by_duration': payload['slots_by_duration']} if len(durations) > 1 else {}),
+        'working_hours': schedule_rules.get_rules().hours_label(hours_date),
+        'is_today': is_today,
+        'current_time': now.strftime('%H:%M') if is_today else None
+    }, headers=validator_headers)
+def get_next_available(request):
+    """
+    API endpoint returning the first free slots from now on.
+    
+    Lets clients on fully booked dates jump straight to the earliest opening
+    instead of stepping through the calendar month by month.
+    
+    Query Parameters:
+        - duration: Duration in minutes (default: 45)
+        - count: Number of slots to return (default: 5, at most 20)
+        - days: Days to search ahead (default: 90, at most 180)
+    
+    Returns:
+        JSON response with up to ``count`` slots in chronological order,
+        each with its date
+    """
+    # ─── Parse Query Parameters ───────────────────────────────────────────────
+    duration_minutes = scheduling.parse_duration(request.GET.get('duration', '45'))
+    try:
+        count = min(max(int(request.GET.get('count', 5)), 1), 20)
+        days = min(max(int(request.GET.get('days', 90)), 1), 180)
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Invalid count or days'}, status=400)
+    
+    # ─── Conditional Request ──────────────────────────────────────────────────
+    # Any booking change in a searched month rotates that month's token
+    now = datetime.now()
+    first = scheduling.booking_horizon(now).date()
+    last = first + timedelta(days=days - 1)
+    scopes, month = [], (first.year, first.month)
+    while month <= (last.year, last.month):
+        scopes.append(month)
+        month = (month[0] + month[1] // 12, month[1] % 12 + 1)
+    not_modified, validator_headers = availability_validators(request, scopes, time_dependent=True)
+    if not_modified is not None:
+        return not_modified
+    
+    # ─── Search Forward ───────────────────────────────────────────────────────
+    slots = []
+    for day, start_minute in scheduling.next_available(duration_minutes, count, days, now):
+        slot = build_slot_list(day, [start_minute], duration_minutes)[0]
+        slot['date'] = day.strftime('%Y-%m-%d')
+        slots.append(slot)
+    
+    # ─── Return JSON Response ─────────────────────────────────────────────────
+    return JsonResponse({
+        'duration': duration_minutes,
+        'days': days,
+        'slots': slots,
+    }, headers=validator_headers)
+
+
+async def slot_events_stream(request):
+    """
+    API endpoint streaming slot-taken / slot-freed events (Server-Sent Events).
+    
+    Needs the ASGI application (bisht.asgi); under WSGI a stream would pin a
+    worker thread forever, so the endpoint refuses and clients fall back to
+    conditional polling.
+    
+    Query Parameters:
+        - dates: Comma-separated dates being viewed (YYYY-MM-DD)
+    
+    Returns:
+        text/event-stream response; each event's data holds the date, the
+        changed [start, end) minute ranges and the date's bookable starts
+    """
+    # ─── Parse Query Parameters ───────────────────────────────────────────────
+    try:
+        dates = scheduling.as_dates(value for value in request.GET.get('dates', '').split(',') if value)
+    except ValidationError:
+        return JsonResponse({'error': 'Invalid date format'}, status=400)
+    
+    if not dates or len(dates) > slot_events.MAX_DATES:
+        return JsonResponse({'error': f'Provide 1-{slot_events.MAX_DATES} dates'}, status=400)
+    
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Live updates require the ASGI server'}, status=503)
+    
+    # ─── Open Event Stream ────────────────────────────────────────────────────
+    return StreamingHttpResponse(
+        slot_events.stream(dates),
+        content_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Disable proxy buffering (nginx)
+        }
+    )
+
+def create_slot_hold(request):
+    """
+    API endpoint holding a time slot while the client fills in the form.
+    
+    One hold per session: placing a new hold releases the previous one.
+    
+    POST Parameters:
+        - date: Date to hold (YYYY-MM-DD)
+        - time: Start time to hold (HH:MM)
+        - duration: Duration in minutes (default: 45)
+    
+    Returns:
+        201 with the hold ID, expiry and slot, or 409 with the nearest
+        free alternatives when the time is no longer available
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    
+    # ─── Parse Parameters ─────────────────────────────────────────────────────
+    try:
+        hold_date = datetime.strptime(request.POST.get('date', ''), '%Y-%m-%d').date()
+        hold_time = datetime.strptime(request.POST.get('time', ''), '%H:%M').time()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date or time format'}, status=400)
+    duration_minutes = scheduling.parse_duration(request.POST.get('duration', '45'))
+    
+    # ─── Replace This Session's Previous Hold ─────────────────────────────────
+    previous_hold = request.session.pop('slot_hold_id', None)
+    if previous_hold:
+        scheduling.release_hold(previous_hold)
+    
+    # ─── Place Hold ───────────────────────────────────────────────────────────
+    hold, alternatives = scheduling.place_hold(hold_date, hold_time, duration_minutes)
+    if hold is None:
+        return JsonResponse({
+            'error': 'This time is no longer available. Please choose another slot.',
+            'alternatives': build_slot_list(hold_date, sorted(alternatives), duration_minutes)
+        }, status=409)
+    
+    request.session['slot_hold_id'] = str(hold.hold_id)
+    return JsonResponse({
+        'hold_id': str(hold.hold_id),
+        'date': hold_date.strftime('%Y-%m-%d'),
+        'start_time': hold_time.strftime('%H:%M'),
+        'duration': duration_minutes,
+        'expires_at': hold.expires_at.isoformat(),
+        'slot': build_slot_list(hold_date, [scheduling.to_minutes(hold_time)], duration_minutes)[0]
+    }, status=201)
+
+
+def release_slot_hold(request, hold_id):
+    """
+    API endpoint releasing a slot hold (POST for navigator.sendBeacon, or DELETE).
+    
+    Returns:
+        JSON response with whether an active hold was released
+    """
+    if request.method not in ('POST', 'DELETE'):
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+    
+    if request.session.get('slot_hold_id') == str(hold_id):
+        del request.session['slot_hold_id']
+    return JsonResponse({'released': scheduling.release_hold(hold_id)})
+
 # ══════════════════════════════════════════════════════════════════════════════
 #                              HELPER FUNCTIONS
 # ══════════════════════════════════════════════════════════════════════════════
 
+def build_calendar_payload(year, month, duration_minutes, selected_date=None, now=None, slot_durations=()):
+    """
+    Cacheable part of the calendar response: month flags plus one day's slots.
+    
+    Args:
+        year: Calendar year
+        month: Calendar month (1-12)
+        duration_minutes: Requested appointment length
+        selected_date: Date to list slots for (default: first available date)
+        now: Current naive datetime (defaults to datetime.now())
+        slot_durations: Further durations to list that day's slots for
+    
+    Returns:
+        dict: 'dates', 'slots_date' (YYYY-MM-DD or None), 'available_slots'
+        and, with slot_durations, 'slots_by_duration'
+    """
+    calendar = scheduling.calendar_month(
+        year, month, duration_minutes, selected_date, now or datetime.now(), slot_durations
+    )
+    slots_date = calendar['slots_date']
+    slots_by_duration = {str(minutes): [] for minutes in (duration_minutes, *slot_durations)}
+    if slots_date:
+        slots_by_duration.update(
+            (str(minutes), build_slot_list(slots_date, starts, minutes))
+            for minutes, starts in calendar['starts_by_duration'].items()
+        )
+    payload = {
+        'dates': calendar['dates'],
+        'slots_date': slots_date.strftime('%Y-%m-%d') if slots_date else None,
+        'available_slots': slots_by_duration[str(duration_minutes)],
+    }
+    if slot_durations:
+        payload['slots_by_duration'] = slots_by_duration
+    return payload
+
+
+def build_slot_list(date_obj, starts, duration_minutes):
+    """
+    Build the slot dictionaries returned by the availability APIs.
+    
+    Args:
+        date_obj: Date the slots belong to
+        starts: Free start minutes for that date
+        duration_minutes: Appointment length in minutes
+    
+    Returns:
+        list: Slot dictionaries (id, start/end time, display text)
+    """
+    slots = []
+    for start_minute in starts:
+        slot_start, slot_end = scheduling.format_slot(date_obj, start_minute, duration_minutes)
+        slots.append({
+            'id': f"{slot_start.strftime('%Y%m%d')}{slot_start.hour:02d}{slot_start.minute:02d}",  # Unique slot ID
+            'start_time': slot_start.strftime('%H:%M'),
+            'end_time': slot_end.strftime('%H:%M'),
+            'duration': str(duration_minutes),
+            'max_bookings': 1,  # Each slot is unique
+            'available': 1,
+            'display': f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
+        })
+    return slots
+
+
+def availability_validators(request, scopes, time_dependent=False):
+    """
+    Evaluate conditional-request headers for an availability API response.
+    
+    The ETag is derived from the cache generation tokens of the dates/months
+    the response reads, so it changes exactly when a booking touching them
+    changes. Runs before any availability computation.
+    
+    Args:
+        request: Incoming GET request
+        scopes: Dates and (year, month) tuples the response is built from
+        time_dependent: Whether the body also changes with the current minute
+    
+    Returns:
+        tuple: (304 response or None, validator headers for the full response)
+    """
+    now = datetime.now().astimezone()
+    variant = [request.path, sorted(request.GET.lists()), now.date()]
+    since = now.replace(hour=0, minute=0, second=0, microsecond=0)  # Past/today flags change at midnight
+    if time_dependent:
+        variant.append(now.strftime('%H:%M'))
+        since = now.replace(second=0, microsecond=0)
+    
+    etag, last_modified = availability_cache.validators(scopes, variant, since)
+    headers = {
+        'ETag': f'"{etag}"',
+        'Last-Modified': http_date(last_modified.timestamp()),
+        'Cache-Control': 'no-cache',  # Always revalidate; 304s are cheap
+    }
+    
+    not_modified = get_conditional_response(
+        request, etag=headers['ETag'], last_modified=int(last_modified.timestamp())
+    )
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+    return not_modified, headers
+
+
 def is_time_available(date_obj, start_time, duration_minutes):
     """
     Check if a specific time slot is available.
@@ -1836,26 +1572,9 @@ def is_time_available(date_obj, start_time, duration_minutes):
     Returns:
         Boolean: True if time slot is available, False otherwise
     """
-    # Calculate requested start and end times
-    requested_start = datetime.combine(date_obj, start_time)
-    requested_end = requested_start + timedelta(minutes=duration_minutes)
-    
-    # Get all non-cancelled bookings for this date
-    bookings = ConsultationBooking.objects.filter(
-        appointment_date=date_obj
-    ).exclude(status='cancelled')
-    
-    # Check for overlap with each existing booking
-    for booking in bookings:
-        booking_start = datetime.combine(date_obj, booking.appointment_time)
-        booking_duration = timedelta(minutes=int(booking.duration.replace('-min', '')))
-        booking_end = booking_start + booking_duration + timedelta(minutes=15)  # Add 15 min buffer
-        
-        # Check if time intervals overlap
-        if (requested_start < booking_end and requested_end > booking_start):
-            return False  # Time slot is not available
-    
-    return True  # Time slot is available
+    # SQL overlap test: a booking, hold or busy time conflicts when start < :end and
+    # (buffered) end > :start; available while some consultant has no conflict
+    return scheduling.is_time_available(date_obj, start_time, duration_minutes)
 
 # ══════════════════════════════════════════════════════════════════════════════
 #                              PAYMENT VIEWS